@@ -0,0 +1,8 @@
+"""
+Benchmarks for the agent stack, run entirely against fake_bedrock.
+
+Run from the repository root:
+    python -m benchmarks                          # everything
+    python -m benchmarks --only agent_loop,a2a    # a subset
+    python -m benchmarks --json after.json --compare before.json
+"""
@@ -0,0 +1,44 @@
+"""
+Command-line entry point: python -m benchmarks [options]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import harness  # noqa: E402  (sets up sys.path for shared/)
+
+SUITES = ["agent_loop", "receptionist", "pipeline", "mcp_tools", "a2a", "startup"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agent stack benchmarks (offline, fake Bedrock).")
+    parser.add_argument("--only", help="Comma-separated subset of: " + ", ".join(SUITES))
+    parser.add_argument("--iterations", type=int, default=50, help="Timed iterations per benchmark")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Scale on simulated model latency (0 = measure pure overhead)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="p50 slowdown counted as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    suites = args.only.split(",") if args.only else SUITES
+    results = []
+    for name in suites:
+        module = __import__(name)
+        results.extend(module.run(args.iterations, args.latency_scale))
+
+    harness.print_table(results)
+    if args.json:
+        harness.write_report(results, args.json, vars(args))
+    if args.compare:
+        if harness.compare(results, args.compare, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
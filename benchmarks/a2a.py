@@ -0,0 +1,41 @@
+"""
+Lab 08 A2A server task throughput (in-process ASGI, no sockets).
+"""
+
+import asyncio
+
+from harness import load_lab_module, skipped, summarize, time_concurrent
+
+import fake_bedrock
+from fake_bedrock import FakeBedrockClient, HAIKU_LATENCY
+
+CONCURRENCY = 50
+
+
+async def _measure(app, total):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://a2a") as client:
+        async def send(i):
+            response = await client.post("/tasks", json={"message": f"task {i}"})
+            response.raise_for_status()
+
+        return await time_concurrent(send, total, CONCURRENCY)
+
+
+def run(iterations, latency_scale):
+    try:
+        import fastapi  # noqa: F401
+        import httpx  # noqa: F401
+    except ImportError:
+        return [skipped("a2a.create_task", "fastapi/httpx not installed")]
+
+    fake_bedrock.install(FakeBedrockClient(latency=HAIKU_LATENCY, time_scale=latency_scale))
+    try:
+        lab = load_lab_module("lab-08-a2a/solution/a2a_server.py", "bench_lab08_server")
+        total = iterations * 5
+        samples, wall = asyncio.run(_measure(lab.app, total))
+        return [summarize("a2a.create_task", samples, wall_seconds=wall, concurrency=CONCURRENCY)]
+    finally:
+        fake_bedrock.uninstall()
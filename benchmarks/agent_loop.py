@@ -0,0 +1,75 @@
+"""
+Per-turn overhead of the shared agent loops (converse_with_tools and friends).
+"""
+
+import asyncio
+import json
+
+from harness import summarize, time_calls
+
+import bedrock_client
+from fake_bedrock import FakeBedrockClient, HAIKU_LATENCY, tool_calls_response
+
+TOOLS = [{"toolSpec": {"name": name, "description": name, "inputSchema": {"json": {
+    "type": "object", "properties": {"query": {"type": "string"}}}}}}
+    for name in ("search_web", "search_database", "get_weather", "get_time")]
+
+DISPATCH = {
+    "search_web": lambda query: json.dumps({"results": [f"web: {query}"]}),
+    "search_database": lambda query: json.dumps({"results": [f"db: {query}"]}),
+    "get_weather": lambda query: json.dumps({"temp_c": 12}),
+    "get_time": lambda query: json.dumps({"time": "12:00"}),
+}
+
+# Two tool rounds then an answer: 3 model turns, 6 tool calls.
+TURNS = 3
+
+
+def _script():
+    return [
+        tool_calls_response([(name, {"query": "aml"}) for name in ("search_web", "search_database")]),
+        tool_calls_response([(name, {"query": "london"}) for name in ("get_weather", "get_time",
+                                                                       "search_web", "search_database")]),
+    ]
+
+
+def _fake(latency_scale):
+    # Rules rather than a script so that the fake is reusable across runs.
+    def respond(request):
+        tool_turns = sum(1 for m in request["messages"] if m["role"] == "assistant")
+        script = _script()
+        if tool_turns < len(script):
+            return script[tool_turns]
+        return {"text": "Final answer.", "stop_reason": "end_turn"}
+
+    return FakeBedrockClient(rules=[(lambda request: True, respond)], latency=HAIKU_LATENCY,
+                             time_scale=latency_scale)
+
+
+def run(iterations, latency_scale):
+    client = _fake(latency_scale)
+    results = []
+
+    def sequential():
+        bedrock_client.converse_with_tools(client, "fake-model", "system", TOOLS, DISPATCH, "go")
+
+    def parallel():
+        bedrock_client.converse_with_tools(client, "fake-model", "system", TOOLS, DISPATCH, "go",
+                                           parallel_tools=True)
+
+    def streaming():
+        for _ in bedrock_client.stream_with_tools(client, "fake-model", "system", TOOLS, DISPATCH, "go"):
+            pass
+
+    def run_async():
+        asyncio.run(bedrock_client.aconverse_with_tools(client, "fake-model", "system", TOOLS,
+                                                        DISPATCH, "go", parallel_tools=True))
+
+    for name, fn in (("agent_loop.sequential", sequential),
+                     ("agent_loop.parallel_tools", parallel),
+                     ("agent_loop.stream", streaming),
+                     ("agent_loop.async", run_async)):
+        samples = time_calls(fn, iterations)
+        per_turn = [s / TURNS for s in samples]
+        results.append(summarize(name + ".per_turn", per_turn, turns_per_run=TURNS))
+    return results
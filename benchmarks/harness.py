@@ -0,0 +1,180 @@
+"""
+Benchmark harness: timing, percentiles, lab-module loading and JSON reports.
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SHARED_DIR = REPO_ROOT / "shared"
+DATA_DIR = REPO_ROOT / "hackathon" / "data"
+
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+
+
+def percentile(sorted_samples, q):
+    """Linearly interpolated percentile (q in 0-100) of pre-sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = (len(sorted_samples) - 1) * q / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_samples[low]
+    return sorted_samples[low] + (sorted_samples[high] - sorted_samples[low]) * (rank - low)
+
+
+def summarize(name, samples, wall_seconds=None, **extra):
+    """Build a result dict from per-operation durations in seconds.
+
+    ops_per_sec is computed from wall_seconds when given (concurrent runs),
+    otherwise from the sum of the samples (serial runs).
+    """
+    ordered = sorted(samples)
+    total = wall_seconds if wall_seconds is not None else sum(ordered)
+    result = {
+        "name": name,
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "min_ms": ordered[0] * 1000 if ordered else 0.0,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+def skipped(name, reason):
+    return {"name": name, "skipped": reason}
+
+
+def time_calls(fn, iterations, warmup=3):
+    """Call fn() warmup + iterations times; return the timed durations."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_concurrent(make_call, total, concurrency):
+    """Run total awaitables, at most concurrency at once.
+
+    Returns:
+        Tuple of (per-call durations, wall-clock seconds for the whole run).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await make_call(i)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return samples, time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the labs' progress prints while timing them."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def load_lab_module(relative_path, module_name):
+    """Import a lab file by path (lab directories are not packages).
+
+    The file's directory goes on sys.path so sibling imports such as
+    `from specialists import ...` resolve.
+    """
+    path = REPO_ROOT / relative_path
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    with quiet():
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_json(name):
+    with open(DATA_DIR / name) as f:
+        return json.load(f)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(results, path, settings):
+    report = {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "cpu_count": os.cpu_count(),
+        "settings": settings,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_table(results):
+    header = f"{'benchmark':<34} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['name']:<34} skipped: {r['skipped']}")
+            continue
+        print(f"{r['name']:<34} {r['n']:>6} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+              f"{r['p99_ms']:>9.3f} {r['ops_per_sec']:>10.1f}")
+
+
+def compare(results, baseline_path, threshold=0.10):
+    """Print p50/p95 changes against a previous JSON report.
+
+    Returns:
+        List of benchmark names whose p50 regressed by more than threshold.
+    """
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"] if "skipped" not in r}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    for r in results:
+        before = baseline.get(r["name"])
+        if before is None or "skipped" in r or not before["p50_ms"]:
+            continue
+        p50_change = r["p50_ms"] / before["p50_ms"] - 1
+        p95_change = r["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        flag = "REGRESSION" if p50_change > threshold else ""
+        if flag:
+            regressions.append(r["name"])
+        print(f"  {r['name']:<34} p50 {p50_change:+7.1%}  p95 {p95_change:+7.1%}  {flag}")
+    return regressions
@@ -0,0 +1,45 @@
+"""
+MCP tool round trip: stdio client -> lab 07 server -> tool -> back.
+"""
+
+import asyncio
+import sys
+import time
+
+from harness import REPO_ROOT, skipped, summarize
+
+SERVER = REPO_ROOT / "lab-07-mcp" / "solution" / "server.py"
+
+
+async def _measure(iterations):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=[str(SERVER)])
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+
+            list_samples = []
+            call_samples = []
+            for _ in range(3):
+                await session.call_tool("get_stock_price", {"symbol": "NWG"})
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await session.list_tools()
+                list_samples.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await session.call_tool("get_stock_price", {"symbol": "NWG"})
+                call_samples.append(time.perf_counter() - start)
+    return list_samples, call_samples
+
+
+def run(iterations, latency_scale):
+    try:
+        import mcp  # noqa: F401
+    except ImportError:
+        return [skipped("mcp.call_tool", "mcp package not installed")]
+    list_samples, call_samples = asyncio.run(_measure(iterations))
+    return [summarize("mcp.list_tools", list_samples),
+            summarize("mcp.call_tool", call_samples)]
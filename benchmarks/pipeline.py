@@ -0,0 +1,36 @@
+"""
+Lab 06 research -> write -> review pipeline, end to end.
+"""
+
+from harness import load_lab_module, quiet, summarize, time_calls
+
+import fake_bedrock
+from fake_bedrock import FakeBedrockClient, HAIKU_LATENCY, SONNET_LATENCY, tool_calls_response
+from bedrock_client import CLAUDE_HAIKU, CLAUDE_SONNET
+
+
+def _is_researcher_start(request):
+    system = request.get("system") or [{}]
+    last = request["messages"][-1]
+    answering_tool = any("toolResult" in block for block in last["content"])
+    return system[0].get("text", "").startswith("You are a research specialist") and not answering_tool
+
+
+def run(iterations, latency_scale):
+    fake = FakeBedrockClient(
+        rules=[(_is_researcher_start, tool_calls_response([
+            ("search_web", {"query": "AML"}), ("search_database", {"query": "AML"})]))],
+        latency={CLAUDE_HAIKU: HAIKU_LATENCY, CLAUDE_SONNET: SONNET_LATENCY},
+        time_scale=latency_scale,
+    )
+    fake_bedrock.install(fake)
+    try:
+        lab = load_lab_module("lab-06-multi-agent/solution/main.py", "bench_lab06_main")
+
+        def pipeline():
+            with quiet():
+                lab.run_pipeline("Key AML compliance requirements for UK banking")
+
+        return [summarize("pipeline.run_pipeline", time_calls(pipeline, iterations, warmup=1))]
+    finally:
+        fake_bedrock.uninstall()
@@ -0,0 +1,85 @@
+"""
+Lab 04 receptionist: classify (Haiku) + route to a specialist, end to end.
+
+Messages that clearly match an FAQ entry are answered directly from the
+FAQ index; classify_and_route is split into those and the escalated rest.
+"""
+
+import json
+import re
+import time
+
+from harness import load_json, load_lab_module, quiet, summarize, time_calls
+
+import fake_bedrock
+from fake_bedrock import (FakeBedrockClient, HAIKU_LATENCY, SONNET_LATENCY,
+                          last_user_text, text_response)
+from bedrock_client import CLAUDE_HAIKU, CLAUDE_SONNET
+
+KEYWORD_INTENTS = [
+    (r"balance|transaction|charged|dispute|phone number", "account_query"),
+    (r"transfer|standing order|pay", "payment_help"),
+    (r"log ?in|app|password", "tech_support"),
+    (r"hours|card|rate|loan|overdraft|close|mortgage|aml|savings", "faq"),
+]
+
+
+def _is_classifier(request):
+    system = request.get("system") or [{}]
+    return system[0].get("text", "").startswith("You are an intent classifier")
+
+
+def _classify(request):
+    text = last_user_text(request).lower()
+    for pattern, intent in KEYWORD_INTENTS:
+        if re.search(pattern, text):
+            return text_response(json.dumps({"intent": intent, "confidence": 0.9, "entities": {}}))
+    return text_response(json.dumps({"intent": "general", "confidence": 0.8, "entities": {}}))
+
+
+def make_fake(latency_scale):
+    return FakeBedrockClient(
+        rules=[(_is_classifier, _classify)],
+        latency={CLAUDE_HAIKU: HAIKU_LATENCY, CLAUDE_SONNET: SONNET_LATENCY},
+        time_scale=latency_scale,
+    )
+
+
+def run(iterations, latency_scale):
+    fake_bedrock.install(make_fake(latency_scale))
+    try:
+        lab = load_lab_module("lab-04-receptionist/solution/main.py", "bench_lab04_main")
+        queries = [q["query"] for q in load_json("sample_queries.json")]
+
+        shortcut = lab.get_faq_shortcut()
+        samples = []
+        classify_samples = []
+        routed = []  # (path, seconds) per receptionist() call, warm-up included
+        position = {"i": 0}
+
+        def classify_only():
+            lab.classify_intent(queries[position["i"] % len(queries)])
+            position["i"] += 1
+
+        def full():
+            direct_before = shortcut.stats()["direct"]
+            start = time.perf_counter()
+            with quiet():
+                lab.receptionist(queries[position["i"] % len(queries)])
+            path = "direct" if shortcut.stats()["direct"] > direct_before else "escalated"
+            routed.append((path, time.perf_counter() - start))
+            position["i"] += 1
+
+        classify_samples = time_calls(classify_only, iterations)
+        samples = time_calls(full, iterations)
+        routed = routed[-iterations:]
+        by_path = {p: [seconds for path, seconds in routed if path == p] for p in ("direct", "escalated")}
+        direct_share = len(by_path["direct"]) / len(routed) if routed else 0.0
+        return [
+            summarize("receptionist.classify", classify_samples),
+            summarize("receptionist.classify_and_route", samples, served_without_sonnet=round(direct_share, 3)),
+            summarize("receptionist.faq_direct", by_path["direct"]),
+            summarize("receptionist.escalated", by_path["escalated"]),
+        ]
+    finally:
+        fake_bedrock.uninstall()
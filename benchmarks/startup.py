@@ -0,0 +1,144 @@
+"""
+Cold-start import cost of the shared modules and lab entry points.
+
+Each module is imported in a fresh interpreter, so the numbers include
+everything a short-lived process (a Lambda cold start, a CLI run) pays
+before its first request. With -X importtime the per-module breakdown
+shows which dependency dominates.
+
+As a suite (python -m benchmarks --only startup) this reports wall-clock
+import time per target. Run directly for a profile report:
+
+    python benchmarks/startup.py bedrock_client --top 15
+    python benchmarks/startup.py lab-05a-langgraph/solution/main.py --json profile.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from harness import REPO_ROOT, SHARED_DIR, skipped, summarize
+
+# Import targets: a shared module name or a lab file path relative to the repo.
+TARGETS = [
+    "bedrock_client",
+    "lab-04-receptionist/solution/main.py",
+    "lab-05a-langgraph/solution/main.py",
+    "lab-06-multi-agent/solution/main.py",
+]
+
+
+def _import_code(target):
+    """Python source that imports target the way the labs do."""
+    if target.endswith(".py"):
+        path = REPO_ROOT / target
+        return (
+            "import importlib.util, sys;"
+            f"sys.path[:0] = [{str(path.parent)!r}, {str(SHARED_DIR)!r}];"
+            f"spec = importlib.util.spec_from_file_location('startup_target', {str(path)!r});"
+            "module = importlib.util.module_from_spec(spec);"
+            "spec.loader.exec_module(module)"
+        )
+    return f"import sys; sys.path.insert(0, {str(SHARED_DIR)!r}); import {target}"
+
+
+def _run(target, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _import_code(target)]
+    start = time.perf_counter()
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=REPO_ROOT)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        last_line = (proc.stderr.strip().splitlines() or ["import failed"])[-1]
+        raise ImportError(last_line)
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into [{module, self_us, cumulative_us, depth}]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def profile(target, top=20):
+    """Import target in a fresh interpreter and report where the time went.
+
+    Returns:
+        Dict with target, wall_ms, import_ms (sum of self times), modules
+        (count) and top: the top modules by cumulative time.
+    """
+    wall, stderr = _run(target, importtime=True)
+    rows = parse_importtime(stderr)
+    ranked = sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)
+    return {
+        "target": target,
+        "wall_ms": wall * 1000,
+        "import_ms": sum(r["self_us"] for r in rows) / 1000,
+        "modules": len(rows),
+        "top": ranked[:top],
+    }
+
+
+def print_profile(report):
+    print(f"\n{report['target']}: {report['import_ms']:.1f} ms importing "
+          f"{report['modules']} modules ({report['wall_ms']:.1f} ms wall incl. interpreter)")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    for row in report["top"]:
+        print(f"  {row['cumulative_us'] / 1000:>13.1f}  {row['self_us'] / 1000:>8.1f}  "
+              f"{'  ' * row['depth']}{row['module']}")
+
+
+def run(iterations, latency_scale):
+    # Cold starts are slow; a handful of samples is enough.
+    samples_per_target = max(3, min(iterations, 10))
+    results = []
+    for target in TARGETS:
+        name = "startup." + target.split("/")[0].replace(".py", "")
+        try:
+            samples = [_run(target)[0] for _ in range(samples_per_target)]
+        except ImportError as e:
+            results.append(skipped(name, str(e)))
+            continue
+        results.append(summarize(name, samples))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profile of one module or lab file.")
+    parser.add_argument("targets", nargs="*", default=TARGETS,
+                        help="Shared module names or lab file paths (default: all)")
+    parser.add_argument("--top", type=int, default=20, help="Modules listed per target")
+    parser.add_argument("--json", help="Write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for target in args.targets:
+        try:
+            report = profile(target, args.top)
+        except ImportError as e:
+            print(f"\n{target}: skipped ({e})")
+            continue
+        print_profile(report)
+        reports.append(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
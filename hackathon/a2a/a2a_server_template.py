@@ -7,14 +7,14 @@ Adapt the SYSTEM_PROMPT and tools to match your agent's purpose.
 from fastapi import FastAPI
 from pydantic import BaseModel
 import json
+import os
 import uuid
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
-from bedrock_client import get_bedrock_client, CLAUDE_SONNET, converse_with_tools, extract_text
+from bedrock_client import get_bedrock_client, CLAUDE_SONNET, aconverse, aconverse_with_tools, extract_text
 
 app = FastAPI()
-client = get_bedrock_client()
 tasks = {}
 
 # --- Customize these for your agent ---
@@ -41,22 +41,22 @@ def get_agent_card():
 
 
 @app.post("/tasks")
-def create_task(request: TaskRequest):
+async def create_task(request: TaskRequest):
     task_id = str(uuid.uuid4())
     tasks[task_id] = {"status": "working", "result": None}
 
     try:
         if TOOLS:
-            result, _ = converse_with_tools(
-                client, CLAUDE_SONNET, SYSTEM_PROMPT, TOOLS, TOOL_DISPATCH, request.message
+            result, _ = await aconverse_with_tools(
+                get_bedrock_client(), CLAUDE_SONNET, SYSTEM_PROMPT, TOOLS, TOOL_DISPATCH, request.message
             )
         else:
-            response = client.converse(
-                modelId=CLAUDE_SONNET,
-                system=[{"text": SYSTEM_PROMPT}],
-                messages=[{"role": "user", "content": [{"text": request.message}]}],
+            message, _ = await aconverse(
+                get_bedrock_client(), CLAUDE_SONNET,
+                [{"role": "user", "content": [{"text": request.message}]}],
+                system_prompt=SYSTEM_PROMPT,
             )
-            result = extract_text(response["output"]["message"])
+            result = extract_text(message)
 
         tasks[task_id] = {"status": "completed", "result": result}
     except Exception as e:
@@ -8,16 +8,17 @@ Based on Lab 05a.
 
 from typing import TypedDict, Literal
 from langgraph.graph import StateGraph, END
-import boto3
-
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+from bedrock_client import get_bedrock_client
 
 CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
 CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
 REGION = "ap-south-1"
 
-client = boto3.client("bedrock-runtime", region_name=REGION)
-
 
 def extract_text(message):
     for block in message.get("content", []):
@@ -27,7 +28,7 @@ def extract_text(message):
 
 
 def call_bedrock(model_id, system_prompt, user_message):
-    response = client.converse(
+    response = get_bedrock_client(REGION).converse(
         modelId=model_id,
         system=[{"text": system_prompt}],
         messages=[{"role": "user", "content": [{"text": user_message}]}],
@@ -6,9 +6,13 @@ Copy this file and customize the SYSTEM_PROMPT, tools, and tool functions.
 Based on Lab 02.
 """
 
-import boto3
-
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+from bedrock_client import get_bedrock_client
+from tool_registry import ToolRegistry
 
 CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
 CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
@@ -19,31 +23,25 @@ SYSTEM_PROMPT = "You are a helpful assistant with access to tools."
 MODEL_ID = CLAUDE_SONNET
 
 # --- Define your tools ---
-EXAMPLE_TOOL = {
-    "toolSpec": {
-        "name": "example_tool",
-        "description": "An example tool. Replace with your own.",
-        "inputSchema": {
-            "json": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Input query"}
-                },
-                "required": ["query"]
-            }
-        }
-    }
-}
+# The schema is generated from the signature and docstring; parameters
+# without defaults are required. Hand-written schemas also work:
+#     registry.register(my_tool, schema=MY_TOOL_SCHEMA)
+registry = ToolRegistry()
 
 
+@registry.tool
 def example_tool(query):
-    """Replace with your tool implementation."""
+    """An example tool. Replace with your own.
+
+    Args:
+        query (str): Input query
+    """
     return json.dumps({"result": f"You searched for: {query}"})
 
 
-# Tool configuration
-TOOLS = [EXAMPLE_TOOL]
-TOOL_DISPATCH = {"example_tool": example_tool}
+# Tool configuration (built once, reused every turn)
+TOOLS = registry.tools
+TOOL_DISPATCH = registry.dispatch
 
 
 def extract_text(message):
@@ -55,7 +53,7 @@ def extract_text(message):
 
 def run_agent(user_message, messages=None):
     """Run the agent loop with a user message. Returns (response_text, messages)."""
-    client = boto3.client("bedrock-runtime", region_name=REGION)
+    client = get_bedrock_client(REGION)
 
     if messages is None:
         messages = []
@@ -66,7 +64,7 @@ def run_agent(user_message, messages=None):
             modelId=MODEL_ID,
             system=[{"text": SYSTEM_PROMPT}],
             messages=messages,
-            toolConfig={"tools": TOOLS},
+            toolConfig=registry.tool_config(),
         )
         assistant_msg = response["output"]["message"]
         messages.append(assistant_msg)
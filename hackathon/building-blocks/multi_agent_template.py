@@ -6,17 +6,18 @@ Customize the agents, their prompts, and tools.
 Based on Lab 06.
 """
 
-import boto3
-
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+from bedrock_client import get_bedrock_client
+
 CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
 CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
 REGION = "ap-south-1"
 
-client = boto3.client("bedrock-runtime", region_name=REGION)
-
 
 def extract_text(message):
     for block in message.get("content", []):
@@ -36,7 +37,7 @@ class Agent:
     def run(self, prompt):
         print(f"  [{self.name}] Running with {self.model_id}...")
         start = time.time()
-        response = client.converse(
+        response = get_bedrock_client(REGION).converse(
             modelId=self.model_id,
             system=[{"text": self.system_prompt}],
             messages=[{"role": "user", "content": [{"text": prompt}]}],
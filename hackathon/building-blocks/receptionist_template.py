@@ -6,9 +6,12 @@ Copy and customize the intents, specialists, and tools.
 Based on Lab 04.
 """
 
-import boto3
-
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+from bedrock_client import get_bedrock_client
 
 CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
 CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
@@ -33,7 +36,7 @@ CONFIDENCE_THRESHOLD = 0.7
 
 
 def get_client():
-    return boto3.client("bedrock-runtime", region_name=REGION)
+    return get_bedrock_client(REGION)
 
 
 def extract_text(message):
@@ -4,10 +4,11 @@ Uses Bedrock to analyze sentiment of text.
 """
 
 import json
+import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
-from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, extract_text
+from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, converse, extract_text
 
 TOOL_SCHEMA = {
     "toolSpec": {
@@ -38,15 +39,15 @@ def _get_client():
 def analyze_sentiment(text):
     """Analyze sentiment using Bedrock Haiku."""
     client = _get_client()
-    response = client.converse(
-        modelId=CLAUDE_HAIKU,
-        system=[{"text": 'Analyze the sentiment of the text. Return ONLY a JSON object with keys: '
-                         '"sentiment" (one of: positive, negative, neutral, mixed), '
-                         '"confidence" (0.0 to 1.0), '
-                         '"explanation" (one sentence).'}],
-        messages=[{"role": "user", "content": [{"text": text}]}],
+    message, _ = converse(
+        client, CLAUDE_HAIKU,
+        [{"role": "user", "content": [{"text": text}]}],
+        system_prompt='Analyze the sentiment of the text. Return ONLY a JSON object with keys: '
+                      '"sentiment" (one of: positive, negative, neutral, mixed), '
+                      '"confidence" (0.0 to 1.0), '
+                      '"explanation" (one sentence).',
     )
-    result_text = extract_text(response["output"]["message"])
+    result_text = extract_text(message)
     try:
         result = json.loads(result_text)
     except json.JSONDecodeError:
@@ -4,10 +4,11 @@ Uses Bedrock to summarize text.
 """
 
 import json
+import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
-from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, extract_text
+from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, converse, extract_text
 
 TOOL_SCHEMA = {
     "toolSpec": {
@@ -42,11 +43,11 @@ def _get_client():
 def summarize_text(text, max_sentences=3):
     """Summarize text using Bedrock Haiku (fast and cheap)."""
     client = _get_client()
-    response = client.converse(
-        modelId=CLAUDE_HAIKU,
-        system=[{"text": f"Summarize the following text in at most {max_sentences} sentences. "
-                         f"Be concise and preserve key information."}],
-        messages=[{"role": "user", "content": [{"text": text}]}],
+    message, _ = converse(
+        client, CLAUDE_HAIKU,
+        [{"role": "user", "content": [{"text": text}]}],
+        system_prompt=f"Summarize the following text in at most {max_sentences} sentences. "
+                      f"Be concise and preserve key information.",
     )
-    summary = extract_text(response["output"]["message"])
+    summary = extract_text(message)
     return json.dumps({"summary": summary})
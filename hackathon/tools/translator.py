@@ -4,10 +4,11 @@ Uses Bedrock to translate text between languages.
 """
 
 import json
+import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
-from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, extract_text
+from bedrock_client import get_bedrock_client, CLAUDE_HAIKU, converse, extract_text
 
 TOOL_SCHEMA = {
     "toolSpec": {
@@ -41,11 +42,11 @@ def translate_text(text, target_language, source_language="auto-detect"):
     """Translate text using Bedrock Haiku."""
     client = _get_client()
     source_note = f" from {source_language}" if source_language != "auto-detect" else ""
-    response = client.converse(
-        modelId=CLAUDE_HAIKU,
-        system=[{"text": f"Translate the following text{source_note} to {target_language}. "
-                         f"Return only the translated text, nothing else."}],
-        messages=[{"role": "user", "content": [{"text": text}]}],
+    message, _ = converse(
+        client, CLAUDE_HAIKU,
+        [{"role": "user", "content": [{"text": text}]}],
+        system_prompt=f"Translate the following text{source_note} to {target_language}. "
+                      f"Return only the translated text, nothing else.",
     )
-    translation = extract_text(response["output"]["message"])
+    translation = extract_text(message)
     return json.dumps({"original": text, "translated": translation, "target_language": target_language})
@@ -4,30 +4,20 @@ Build a tool-using agent from scratch with the Bedrock Converse API agent loop.
 """
 
 import boto3
-import os
+import sys
 from pathlib import Path
 
 import json
 from tools import ALL_TOOLS, TOOL_DISPATCH
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-REGION = "ap-south-1"
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+REGION = settings.region
 
 SYSTEM_PROMPT = """You are a helpful assistant with access to tools.
 Use the available tools to answer user questions accurately.
@@ -2,35 +2,25 @@
 Lab 03: Smart Agent (Solution)
 """
 
-import boto3
-import os
+import sys
 from pathlib import Path
 
 import json
 import time
 from datetime import datetime
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-REGION = "ap-south-1"
-
-client = boto3.client("bedrock-runtime", region_name=REGION)
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+from bedrock_client import converse_with_tools, get_bedrock_client
+from budget import Budget
+from compaction import ContextCompactor
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+REGION = settings.region
 
 WEATHER_TOOL = {"toolSpec": {"name": "get_weather", "description": "Get current weather for a city.", "inputSchema": {"json": {"type": "object", "properties": {"city": {"type": "string"}}, "required": ["city"]}}}}
 NEWS_TOOL = {"toolSpec": {"name": "search_news", "description": "Search recent news on a topic.", "inputSchema": {"json": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}}}}
@@ -74,72 +64,77 @@ Wrap your reasoning in <thought>...</thought> tags so your thinking is visible.
 Always explain your reasoning before calling a tool."""
 
 
-def run_agent(user_message, system_prompt=REACT_SYSTEM_PROMPT, messages=None):
-    """Run the agent loop with ReAct prompting and error handling."""
-    if messages is None:
-        messages = []
-    messages.append({"role": "user", "content": [{"text": user_message}]})
-
-    while True:
-        response = client.converse(
-            modelId=CLAUDE_SONNET,
-            system=[{"text": system_prompt}],
-            messages=messages,
-            toolConfig={"tools": ALL_TOOLS},
-        )
-        assistant_msg = response["output"]["message"]
-        messages.append(assistant_msg)
-
-        if response["stopReason"] == "end_turn":
-            return extract_text(assistant_msg), messages
-
-        if response["stopReason"] == "tool_use":
-            tool_results = []
-            for block in assistant_msg["content"]:
-                if "toolUse" in block:
-                    name = block["toolUse"]["name"]
-                    inp = block["toolUse"]["input"]
-                    tid = block["toolUse"]["toolUseId"]
-                    print(f"  [Tool] {name}({json.dumps(inp)})")
-
-                    try:
-                        result = TOOL_DISPATCH[name](**inp)
-                    except Exception as e:
-                        result = json.dumps({
-                            "error": str(e),
-                            "suggestion": "This tool is currently unavailable. Try answering without it or use a different approach."
-                        })
-                        print(f"  [Error] {result}")
-
-                    tool_results.append({"toolResult": {"toolUseId": tid, "content": [{"text": str(result)}]}})
-            messages.append({"role": "user", "content": tool_results})
-
-
-def summarize_history(messages, keep_recent=4):
-    """Summarize older messages to keep context manageable."""
-    if len(messages) <= 10:
-        return messages
-
-    old_messages = messages[:-keep_recent]
-    recent_messages = messages[-keep_recent:]
-
-    conversation_text = ""
-    for msg in old_messages:
-        role = msg.get("role", "unknown")
-        for block in msg.get("content", []):
-            if "text" in block:
-                conversation_text += f"{role}: {block['text'][:200]}\n"
-
-    summary_response = client.converse(
-        modelId=CLAUDE_HAIKU,
-        system=[{"text": "Summarize this conversation concisely, preserving key facts and context."}],
-        messages=[{"role": "user", "content": [{"text": conversation_text}]}],
-    )
-    summary = extract_text(summary_response["output"]["message"])
+# Default limits for one run_agent() call, so a confused model cannot loop forever.
+AGENT_BUDGET = {"max_turns": 10, "max_seconds": 120, "max_cost_usd": 0.50}
+
+
+def with_error_hint(fn):
+    """Turn a tool exception into a result the model can recover from."""
+    def call(**tool_input):
+        try:
+            return fn(**tool_input)
+        except Exception as e:
+            result = json.dumps({
+                "error": str(e),
+                "suggestion": "This tool is currently unavailable. Try answering without it or use a different approach."
+            })
+            print(f"  [Error] {result}")
+            return result
+    return call
+
+
+AGENT_TOOL_DISPATCH = {name: with_error_hint(fn) for name, fn in TOOL_DISPATCH.items()}
+
+
+def run_agent(user_message, system_prompt=REACT_SYSTEM_PROMPT, messages=None, budget=None,
+              compactor=None):
+    """Run the agent loop with ReAct prompting, error handling and a budget.
+
+    When the budget runs out the loop stops with the best partial answer.
+    With a compactor (see new_compactor), the history is kept under its
+    token budget before every model call.
+    """
+    if budget is None:
+        budget = Budget(**AGENT_BUDGET)
+    return converse_with_tools(get_bedrock_client(REGION), CLAUDE_SONNET, system_prompt, ALL_TOOLS,
+                               AGENT_TOOL_DISPATCH, user_message, messages=messages, verbose=True,
+                               compactor=compactor, budget=budget)
+
+
+# Long sessions: once the history passes a token budget, the oldest turns are
+# folded into a rolling summary written by Haiku. Only newly evicted turns are
+# summarized each time; nothing is re-summarized from scratch.
+HISTORY_MAX_TOKENS = 8000
+
+
+def new_compactor(max_tokens=HISTORY_MAX_TOKENS, keep_recent=4):
+    """A compactor for one conversation (it holds that conversation's summary)."""
+    return ContextCompactor(get_bedrock_client(REGION), max_tokens=max_tokens, keep_recent=keep_recent)
+
+
+# The lab holds one conversation at a time; its compactor (and with it the
+# rolling summary) lives here so every turn extends the same summary.
+_conversation_compactor = None
+
+
+def conversation_compactor():
+    """The compactor of the current conversation, created on first use."""
+    global _conversation_compactor
+    if _conversation_compactor is None:
+        _conversation_compactor = new_compactor()
+    return _conversation_compactor
+
+
+def summarize_history(messages, compactor=None):
+    """Summarize older messages to keep context manageable.
 
-    return [{"role": "user", "content": [{"text": f"Previous conversation summary: {summary}"}]},
-            {"role": "assistant", "content": [{"text": "Understood, I have the context from our previous conversation."}]}
-            ] + recent_messages
+    Triggered by estimated tokens rather than message count. Without a
+    compactor the conversation's shared one is used, so its summary is
+    extended rather than rebuilt; pass new_compactor() for a separate
+    conversation.
+    """
+    compactor = compactor if compactor is not None else conversation_compactor()
+    return compactor.compact(messages)
 
 
 def reflect_on_answer(question, answer):
@@ -153,7 +148,7 @@ Provide:
 1. A brief critique (what's good, what could be better)
 2. A revised answer if improvements are needed, or "No revision needed" if the answer is good."""
 
-    response = client.converse(
+    response = get_bedrock_client(REGION).converse(
         modelId=CLAUDE_SONNET,
         system=[{"text": "You are a quality reviewer. Be constructive but thorough."}],
         messages=[{"role": "user", "content": [{"text": reflection_prompt}]}],
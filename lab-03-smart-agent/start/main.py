@@ -4,32 +4,22 @@ Enhance the basic agent with ReAct prompting, error handling, and conversation s
 """
 
 import boto3
-import os
+import sys
 from pathlib import Path
 
 import json
 import time
 from datetime import datetime
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-REGION = "ap-south-1"
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+REGION = settings.region
 
 client = boto3.client("bedrock-runtime", region_name=REGION)
 
@@ -2,38 +2,27 @@
 Lab 04: Specialist agent handlers (Solution).
 """
 
-import boto3
-import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 import json
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-REGION = "ap-south-1"
-
-_client = None
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+from bedrock_client import get_bedrock_client, converse, converse_with_tools
+from faq_index import load_faq_index
+from tool_cache import ToolResultCache
+from tool_registry import ToolRegistry
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+REGION = settings.region
 
 def _get_client():
-    global _client
-    if _client is None:
-        _client = boto3.client("bedrock-runtime", region_name=REGION)
-    return _client
+    return get_bedrock_client(REGION)
 
 def _extract_text(msg):
     for b in msg.get("content", []):
@@ -41,29 +30,28 @@ def _extract_text(msg):
             return b["text"]
     return ""
 
-def _run_specialist(system_prompt, tools, tool_dispatch, user_message):
-    client = _get_client()
-    messages = [{"role": "user", "content": [{"text": user_message}]}]
-    while True:
-        kwargs = {"modelId": CLAUDE_SONNET, "system": [{"text": system_prompt}], "messages": messages}
-        if tools:
-            kwargs["toolConfig"] = {"tools": tools}
-        response = client.converse(**kwargs)
-        msg = response["output"]["message"]
-        messages.append(msg)
-        if response["stopReason"] == "end_turn":
-            return _extract_text(msg)
-        if response["stopReason"] == "tool_use":
-            results = []
-            for b in msg["content"]:
-                if "toolUse" in b:
-                    name, inp, tid = b["toolUse"]["name"], b["toolUse"]["input"], b["toolUse"]["toolUseId"]
-                    try:
-                        out = tool_dispatch[name](**inp)
-                    except Exception as e:
-                        out = json.dumps({"error": str(e)})
-                    results.append({"toolResult": {"toolUseId": tid, "content": [{"text": str(out)}]}})
-            messages.append({"role": "user", "content": results})
+# Repeat lookups are answered from memory. FAQ answers are static, so they are
+# shared process-wide; account data is per customer, so it is cached for one
+# conversation only (see new_tool_cache), briefly, and dropped after a transfer.
+TOOL_CACHE_TOOLS = {
+    "search_faq": {"ttl": 3600, "scope": "global"},
+    "check_balance": {"ttl": 30},
+    "get_transactions": {"ttl": 30},
+    "check_payment_status": {"ttl": 30},
+}
+TOOL_CACHE_INVALIDATES = {"initiate_transfer": ["check_balance", "get_transactions", "check_payment_status"]}
+
+def new_tool_cache():
+    """A tool-result cache for one conversation; create one per customer session."""
+    return ToolResultCache(tools=TOOL_CACHE_TOOLS, invalidates=TOOL_CACHE_INVALIDATES)
+
+def _run_specialist(system_prompt, registry, user_message, tool_cache=None):
+    # The registry validates the model's tool input before the tool runs.
+    # Without a conversation cache only the global (FAQ) entries are shared.
+    tool_cache = tool_cache if tool_cache is not None else new_tool_cache()
+    text, _ = converse_with_tools(_get_client(), CLAUDE_SONNET, system_prompt, registry.tools,
+                                  registry.dispatch, user_message, tool_cache=tool_cache)
+    return text
 
 
 # ═══ FAQ Specialist ═══
@@ -72,23 +60,30 @@ FAQ_SYSTEM_PROMPT = "You are an FAQ specialist for a banking service. Answer com
 
 FAQ_TOOL = {"toolSpec": {"name": "search_faq", "description": "Search the FAQ knowledge base.", "inputSchema": {"json": {"type": "object", "properties": {"question": {"type": "string"}}, "required": ["question"]}}}}
 
+# BM25 over the hackathon FAQ set. The index is persisted next to the data and
+# only entries added or edited since the last run are re-indexed at start-up.
+FAQ_DATA_PATH = Path(__file__).resolve().parent.parent.parent / "hackathon" / "data" / "faq_data.json"
+FAQ_INDEX_PATH = FAQ_DATA_PATH.with_name(".faq_index.json")
+FAQ_TOP_K = 3
+FAQ_MIN_SCORE = 2.0  # below this a match shares only an incidental word with the question
+
+@lru_cache(maxsize=1)
+def get_faq_index():
+    return load_faq_index(FAQ_DATA_PATH, index_path=FAQ_INDEX_PATH)
+
 def search_faq(question):
-    faqs = {
-        "hours": "Branches are open Monday-Friday 9am-5pm. Some offer Saturday 9am-1pm.",
-        "opening": "Branches are open Monday-Friday 9am-5pm. Some offer Saturday 9am-1pm.",
-        "card": "Report lost/stolen card: call 0800-XXX-XXXX or freeze in the mobile app.",
-        "lost": "Report lost/stolen card: call 0800-XXX-XXXX or freeze in the mobile app.",
-        "overdraft": "Standard overdraft up to 1,000. Premium accounts may get more.",
-        "savings": "We offer easy-access savings, fixed-rate ISAs, and regular saver accounts.",
-        "close": "Close your account online, by phone, or in branch. Move direct debits first.",
-    }
-    for key, answer in faqs.items():
-        if key in question.lower():
-            return json.dumps({"found": True, "answer": answer})
-    return json.dumps({"found": False, "answer": "No specific FAQ found. Contact customer service."})
-
-def handle_faq(user_message):
-    return _run_specialist(FAQ_SYSTEM_PROMPT, [FAQ_TOOL], {"search_faq": search_faq}, user_message)
+    hits = [h for h in get_faq_index().search(question, k=FAQ_TOP_K) if h["score"] >= FAQ_MIN_SCORE]
+    if not hits:
+        return json.dumps({"found": False, "answer": "No specific FAQ found. Contact customer service."})
+    matches = [{"id": h["id"], "question": h["question"], "answer": h["answer"], "score": round(h["score"], 2)}
+               for h in hits]
+    return json.dumps({"found": True, "answer": hits[0]["answer"], "matches": matches})
+
+FAQ_TOOLS = ToolRegistry()
+FAQ_TOOLS.register(search_faq, schema=FAQ_TOOL)
+
+def handle_faq(user_message, tool_cache=None):
+    return _run_specialist(FAQ_SYSTEM_PROMPT, FAQ_TOOLS, user_message, tool_cache)
 
 
 # ═══ Account Specialist ═══
@@ -111,8 +106,12 @@ def get_transactions(account_id="main", limit=5):
     ]
     return json.dumps({"transactions": txns[:limit]})
 
-def handle_account(user_message):
-    return _run_specialist(ACCOUNT_SYSTEM_PROMPT, [BALANCE_TOOL, TRANSACTIONS_TOOL], {"check_balance": check_balance, "get_transactions": get_transactions}, user_message)
+ACCOUNT_TOOLS = ToolRegistry()
+ACCOUNT_TOOLS.register(check_balance, schema=BALANCE_TOOL)
+ACCOUNT_TOOLS.register(get_transactions, schema=TRANSACTIONS_TOOL)
+
+def handle_account(user_message, tool_cache=None):
+    return _run_specialist(ACCOUNT_SYSTEM_PROMPT, ACCOUNT_TOOLS, user_message, tool_cache)
 
 
 # ═══ Payment Specialist ═══
@@ -128,17 +127,21 @@ def check_payment_status(reference="latest"):
 def initiate_transfer(to_account, amount):
     return json.dumps({"status": "initiated", "to_account": to_account, "amount": amount, "reference": "TXN-2025-0042", "estimated_arrival": "same day"})
 
-def handle_payment(user_message):
-    return _run_specialist(PAYMENT_SYSTEM_PROMPT, [PAYMENT_STATUS_TOOL, TRANSFER_TOOL], {"check_payment_status": check_payment_status, "initiate_transfer": initiate_transfer}, user_message)
+PAYMENT_TOOLS = ToolRegistry()
+PAYMENT_TOOLS.register(check_payment_status, schema=PAYMENT_STATUS_TOOL)
+PAYMENT_TOOLS.register(initiate_transfer, schema=TRANSFER_TOOL)
+
+def handle_payment(user_message, tool_cache=None):
+    return _run_specialist(PAYMENT_SYSTEM_PROMPT, PAYMENT_TOOLS, user_message, tool_cache)
 
 
 # ═══ General Specialist ═══
 
-def handle_general(user_message):
+def handle_general(user_message, tool_cache=None):
     client = _get_client()
-    response = client.converse(
-        modelId=CLAUDE_SONNET,
-        system=[{"text": "You are a friendly banking assistant. If you can't help with something, suggest the customer contact their branch."}],
-        messages=[{"role": "user", "content": [{"text": user_message}]}],
+    msg, _ = converse(
+        client, CLAUDE_SONNET,
+        [{"role": "user", "content": [{"text": user_message}]}],
+        system_prompt="You are a friendly banking assistant. If you can't help with something, suggest the customer contact their branch.",
     )
-    return _extract_text(response["output"]["message"])
+    return _extract_text(msg)
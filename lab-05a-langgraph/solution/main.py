@@ -8,40 +8,29 @@ Run:
     python main.py
 """
 
+from functools import lru_cache
 from typing import TypedDict, Literal
-from langgraph.graph import StateGraph, END
-import boto3
-import os
+import sys
 from pathlib import Path
 
 import json
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+from classification_cache import ClassificationCache
+from bedrock_client import get_bedrock_client
+
+settings = get_config()
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
-REGION = "ap-south-1"
-
-bedrock = boto3.client("bedrock-runtime", region_name=REGION)
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+LLAMA = settings.llama
+MISTRAL = settings.mistral
+REGION = settings.region
 
 # ---------------------------------------------------------------------------
 # Specialist system prompts
@@ -86,7 +75,7 @@ CLASSIFIER_SYSTEM_PROMPT = (
 # ---------------------------------------------------------------------------
 def call_bedrock(model_id: str, system_prompt: str, user_message: str) -> str:
     """Send a single-turn message to Bedrock and return the text response."""
-    response = bedrock.converse(
+    response = get_bedrock_client(REGION).converse(
         modelId=model_id,
         system=[{"text": system_prompt}],
         messages=[{"role": "user", "content": [{"text": user_message}]}],
@@ -107,10 +96,24 @@ class AgentState(TypedDict):
 # ---------------------------------------------------------------------------
 # TODO 2 — Classifier node
 # ---------------------------------------------------------------------------
+# Below this confidence a message is routed to the general agent.
+CONFIDENCE_THRESHOLD = 0.6
+
+# Repeated and near-duplicate messages ("whats my balance?", "check my
+# balance please") reuse an earlier classification instead of calling Haiku.
+# Only confident classifications are cached, so one uncertain guess is not
+# reused for every message that resembles it.
+CLASSIFICATION_CACHE = ClassificationCache(max_entries=10_000, similarity=0.5)
+
+
 def classifier_node(state: AgentState) -> dict:
     """Classify the customer's intent using Haiku."""
     latest_message = state["messages"][-1]["content"]
 
+    cached, match = CLASSIFICATION_CACHE.lookup(latest_message)
+    if match is not None:
+        return dict(cached)
+
     raw = call_bedrock(CLAUDE_HAIKU, CLASSIFIER_SYSTEM_PROMPT, latest_message)
 
     try:
@@ -120,6 +123,9 @@ def classifier_node(state: AgentState) -> dict:
     except (json.JSONDecodeError, ValueError):
         intent = "general"
         confidence = 0.0
+    else:
+        if confidence >= CONFIDENCE_THRESHOLD:
+            CLASSIFICATION_CACHE.put(latest_message, {"current_intent": intent, "confidence": confidence})
 
     return {"current_intent": intent, "confidence": confidence}
 
@@ -160,7 +166,7 @@ def general_node(state: AgentState) -> dict:
 # ---------------------------------------------------------------------------
 def route_by_intent(state: AgentState) -> str:
     """Route to the appropriate specialist node based on classified intent."""
-    if state["confidence"] < 0.6:
+    if state["confidence"] < CONFIDENCE_THRESHOLD:
         return "general"
 
     intent = state["current_intent"]
@@ -172,36 +178,55 @@ def route_by_intent(state: AgentState) -> str:
 # ---------------------------------------------------------------------------
 # TODO 5 — Build the StateGraph & add nodes
 # ---------------------------------------------------------------------------
-graph = StateGraph(AgentState)
+# The graph is built and compiled on first use rather than at import, so
+# importing this module (e.g. to reuse the nodes) does not pay for
+# langgraph's import or the compile step.
+def build_graph():
+    """Return the uncompiled receptionist StateGraph."""
+    from langgraph.graph import StateGraph, END
+
+    graph = StateGraph(AgentState)
+
+    graph.add_node("classify", classifier_node)
+    graph.add_node("faq", faq_node)
+    graph.add_node("account", account_node)
+    graph.add_node("payment", payment_node)
+    graph.add_node("general", general_node)
+
+    graph.set_entry_point("classify")
+
+    # -----------------------------------------------------------------------
+    # TODO 6 — Add edges & compile
+    # -----------------------------------------------------------------------
+    graph.add_conditional_edges(
+        "classify",
+        route_by_intent,
+        {
+            "faq": "faq",
+            "account": "account",
+            "payment": "payment",
+            "general": "general",
+        },
+    )
 
-graph.add_node("classify", classifier_node)
-graph.add_node("faq", faq_node)
-graph.add_node("account", account_node)
-graph.add_node("payment", payment_node)
-graph.add_node("general", general_node)
+    graph.add_edge("faq", END)
+    graph.add_edge("account", END)
+    graph.add_edge("payment", END)
+    graph.add_edge("general", END)
+    return graph
 
-graph.set_entry_point("classify")
 
-# ---------------------------------------------------------------------------
-# TODO 6 — Add edges & compile
-# ---------------------------------------------------------------------------
-graph.add_conditional_edges(
-    "classify",
-    route_by_intent,
-    {
-        "faq": "faq",
-        "account": "account",
-        "payment": "payment",
-        "general": "general",
-    },
-)
+@lru_cache(maxsize=None)
+def get_app():
+    """Compile the graph once and return the cached app."""
+    return build_graph().compile()
 
-graph.add_edge("faq", END)
-graph.add_edge("account", END)
-graph.add_edge("payment", END)
-graph.add_edge("general", END)
 
-app = graph.compile()
+def __getattr__(name):
+    # Keeps `main.app` working for existing callers while deferring the compile.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ---------------------------------------------------------------------------
@@ -213,7 +238,7 @@ app = graph.compile()
 #
 # from langgraph.checkpoint.memory import MemorySaver
 # memory = MemorySaver()
-# app_with_hitl = graph.compile(
+# app_with_hitl = build_graph().compile(
 #     checkpointer=memory,
 #     interrupt_before=["account", "payment"],
 # )
@@ -252,7 +277,7 @@ if __name__ == "__main__":
             "response": "",
         }
 
-        result = app.invoke(initial_state)
+        result = get_app().invoke(initial_state)
 
         print(f"Intent   : {result['current_intent']} "
               f"(confidence: {result['confidence']:.2f})")
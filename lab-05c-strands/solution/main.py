@@ -4,37 +4,26 @@ Lab 05c: Strands Agent (Solution)
 # Lab 05c (Strands):    ~40 lines for the same functionality
 """
 
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools import tool
-import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 import json
 from datetime import datetime
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
-
-
-@tool
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+LLAMA = settings.llama
+MISTRAL = settings.mistral
+
+
+# Plain functions here; get_agent() wraps them with strands' @tool, so
+# importing this module does not load strands at all.
 def get_weather(city: str) -> str:
     """Get the current weather for a city.
 
@@ -50,7 +39,6 @@ def get_weather(city: str) -> str:
     return json.dumps({"city": city, **data})
 
 
-@tool
 def search_news(query: str) -> str:
     """Search for recent news articles on a topic.
 
@@ -64,7 +52,6 @@ def search_news(query: str) -> str:
     return json.dumps({"query": query, "headlines": headlines})
 
 
-@tool
 def get_time(timezone: str) -> str:
     """Get the current time in a given timezone.
 
@@ -74,20 +61,35 @@ def get_time(timezone: str) -> str:
     return json.dumps({"timezone": timezone, "time": datetime.now().strftime("%H:%M:%S")})
 
 
-bedrock_model = BedrockModel(
-    model_id=CLAUDE_SONNET,
-    region_name="ap-south-1",
-)
-
-agent = Agent(
-    model=bedrock_model,
-    tools=[get_weather, search_news, get_time],
-    system_prompt="You are a helpful assistant with access to tools. Use them to answer questions accurately.",
-)
+# The model client and agent are created on first use, not at import, so
+# importing the tools from this module stays cheap.
+@lru_cache(maxsize=None)
+def get_agent():
+    """Create the Strands agent once and return the cached instance."""
+    from strands import Agent
+    from strands.models.bedrock import BedrockModel
+    from strands.tools import tool
+
+    bedrock_model = BedrockModel(
+        model_id=CLAUDE_SONNET,
+        region_name=get_config().region,
+    )
+    return Agent(
+        model=bedrock_model,
+        tools=[tool(fn) for fn in (get_weather, search_news, get_time)],
+        system_prompt="You are a helpful assistant with access to tools. Use them to answer questions accurately.",
+    )
+
+
+def __getattr__(name):
+    # Keeps `main.agent` working for existing callers.
+    if name == "agent":
+        return get_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     print("=== Single Query ===")
-    response = agent("What's the weather in London and any recent news about banking?")
+    response = get_agent()("What's the weather in London and any recent news about banking?")
     print(f"Agent: {response}")
 
     print("\n=== Code Comparison ===")
@@ -2,34 +2,26 @@
 Lab 06: Agent class (Solution).
 """
 
-import boto3
-import os
+import sys
 from pathlib import Path
 
 import json
 import time
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
-
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
-REGION = "ap-south-1"
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+from bedrock_client import get_bedrock_client, converse
+from logging_utils import span
+from metrics import labels
+
+settings = get_config()
+
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+LLAMA = settings.llama
+MISTRAL = settings.mistral
+REGION = settings.region
 
 
 def extract_text(message):
@@ -46,33 +38,34 @@ class Agent:
         self.system_prompt = system_prompt
         self.tools = tools or []
         self.tool_dispatch = tool_dispatch or {}
-        self.client = boto3.client("bedrock-runtime", region_name=REGION)
+
+    @property
+    def client(self):
+        # Resolved on first call, so defining agents at import stays cheap.
+        return get_bedrock_client(REGION)
 
     def run(self, prompt):
+        # Tag every Bedrock call below with this agent's name for metrics.
+        with labels(agent=self.name), span(self.name, kind="agent", model_id=self.model_id):
+            return self._run(prompt)
+
+    def _run(self, prompt):
         start = time.time()
         print(f"  [{self.name}] Running with {self.model_id.split('.')[-1].split('-')[0]}...")
 
         messages = [{"role": "user", "content": [{"text": prompt}]}]
 
         while True:
-            kwargs = {
-                "modelId": self.model_id,
-                "system": [{"text": self.system_prompt}],
-                "messages": messages,
-            }
-            if self.tools:
-                kwargs["toolConfig"] = {"tools": self.tools}
-
-            response = self.client.converse(**kwargs)
-            msg = response["output"]["message"]
+            msg, stop_reason = converse(self.client, self.model_id, messages,
+                                        self.system_prompt, self.tools)
             messages.append(msg)
 
-            if response["stopReason"] == "end_turn":
+            if stop_reason == "end_turn":
                 elapsed = time.time() - start
                 print(f"  [{self.name}] Done ({elapsed:.1f}s)")
                 return extract_text(msg)
 
-            if response["stopReason"] == "tool_use":
+            if stop_reason == "tool_use":
                 results = []
                 for block in msg["content"]:
                     if "toolUse" in block:
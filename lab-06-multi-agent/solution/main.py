@@ -2,27 +2,12 @@
 Lab 06: Multi-Agent System (Solution)
 """
 
-import os
-from pathlib import Path
 import json
 import time
+# agents puts shared/ on sys.path and loads the settings (.env, profile)
 from agents import Agent, CLAUDE_SONNET, CLAUDE_HAIKU
-
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
+from logging_utils import span
+from rate_limiter import PRIORITY_BATCH, priority
 
 SEARCH_WEB_TOOL = {"toolSpec": {"name": "search_web", "description": "Search the web.", "inputSchema": {"json": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}}}}
 SEARCH_DB_TOOL = {"toolSpec": {"name": "search_database", "description": "Search internal database.", "inputSchema": {"json": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}}}}
@@ -62,23 +47,32 @@ reviewer = Agent(
 
 
 def run_pipeline(task):
+    # Background work: yield to interactive traffic if a rate limiter is set.
+    with priority(PRIORITY_BATCH), span("run_pipeline", kind="pipeline", task=task):
+        return _run_stages(task)
+
+
+def _run_stages(task):
     print(f"\nTask: {task}")
     print("=" * 60)
     overall_start = time.time()
 
     # Step 1: Research
     print("\n--- Step 1: Research ---")
-    research = researcher.run(f"Research the following topic thoroughly: {task}")
+    with span("research", kind="stage"):
+        research = researcher.run(f"Research the following topic thoroughly: {task}")
     print(f"  Research output: {research[:200]}...\n")
 
     # Step 2: Write
     print("--- Step 2: Write ---")
-    draft = writer.run(f"Based on this research, write a clear, professional report.\n\nResearch:\n{research}\n\nOriginal task: {task}")
+    with span("write", kind="stage"):
+        draft = writer.run(f"Based on this research, write a clear, professional report.\n\nResearch:\n{research}\n\nOriginal task: {task}")
     print(f"  Draft output: {draft[:200]}...\n")
 
     # Step 3: Review
     print("--- Step 3: Review ---")
-    review = reviewer.run(f"Review this draft report and suggest improvements:\n\n{draft}")
+    with span("review", kind="stage"):
+        review = reviewer.run(f"Review this draft report and suggest improvements:\n\n{draft}")
     print(f"  Review output: {review[:200]}...\n")
 
     total = time.time() - overall_start
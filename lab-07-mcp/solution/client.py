@@ -6,42 +6,30 @@ and wires them into an Amazon Bedrock agent loop.
 """
 
 import asyncio
-import os
 from pathlib import Path
 import json
-import boto3
+import sys
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config
+from bedrock_client import aconverse, get_bedrock_client
+
+settings = get_config()
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
-REGION = "ap-south-1"
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+LLAMA = settings.llama
+MISTRAL = settings.mistral
+REGION = settings.region
 MODEL_ID = CLAUDE_HAIKU
 
-bedrock = boto3.client("bedrock-runtime", region_name=REGION)
-
 
 # ---------------------------------------------------------------------------
 # TODO 4 - Convert MCP tool schemas to Bedrock toolConfig format
@@ -90,14 +78,11 @@ async def agent_loop(session, user_message: str):
     messages = [{"role": "user", "content": [{"text": user_message}]}]
 
     while True:
-        response = bedrock.converse(
-            modelId=MODEL_ID,
-            messages=messages,
-            toolConfig=tool_config,
+        # boto3 is blocking -- aconverse runs it on the shared Bedrock thread
+        # pool so the event loop (and the MCP session) stays responsive.
+        output_message, stop_reason = await aconverse(
+            get_bedrock_client(REGION), MODEL_ID, messages, tools=tool_config["tools"],
         )
-
-        stop_reason = response["stopReason"]
-        output_message = response["output"]["message"]
         messages.append(output_message)
 
         # 3. If the model wants to use a tool, call it via MCP
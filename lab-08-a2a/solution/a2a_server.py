@@ -4,45 +4,31 @@ Lab 08 - A2A Server (Solution)
 Complete A2A server with agent card, task endpoints, and Bedrock integration.
 """
 
-import os
 from pathlib import Path
 import json
+import sys
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-import boto3
-
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
-# Load .env file if it exists (so you don't have to export every time)
-for _candidate in [
-    Path(".env"),
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-    Path(__file__).resolve().parent.parent.parent / "shared" / ".env",
-]:
-    if _candidate.exists():
-        with open(_candidate) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith("#") and "=" in _line:
-                    _key, _val = _line.split("=", 1)
-                    os.environ.setdefault(_key.strip(), _val.strip())
-        break
+# Settings (.env, BEDROCK_* overrides, deployment profile) load once per process
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from config import get_config, install_reload_handler
+from bedrock_client import aconverse, extract_text, get_bedrock_client
+
+settings = get_config()
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
-REGION = "ap-south-1"
-MODEL_ID = CLAUDE_HAIKU
-
-bedrock = boto3.client("bedrock-runtime", region_name=REGION)
+CLAUDE_SONNET = settings.claude_sonnet
+CLAUDE_HAIKU = settings.claude_haiku
+LLAMA = settings.llama
+MISTRAL = settings.mistral
+REGION = settings.region
 
 app = FastAPI(title="A2A Agent Server")
 
@@ -72,13 +58,17 @@ tasks: dict[str, TaskResponse] = {}
 # ---------------------------------------------------------------------------
 # TODO 4 - Bedrock agent processing
 # ---------------------------------------------------------------------------
-def process_task(message: str) -> str:
+async def process_task(message: str) -> str:
     """Send a message to Bedrock and return the response text."""
-    response = bedrock.converse(
-        modelId=MODEL_ID,
-        messages=[{"role": "user", "content": [{"text": message}]}],
+    # Settings are read per task, so a SIGHUP reload applies to the next one.
+    current = get_config()
+    # aconverse runs the blocking boto3 call on the shared Bedrock thread
+    # pool, sized for hundreds of concurrent tasks (async_max_concurrency).
+    response_message, _ = await aconverse(
+        get_bedrock_client(current.region), current.claude_haiku,
+        [{"role": "user", "content": [{"text": message}]}],
     )
-    return response["output"]["message"]["content"][0]["text"]
+    return extract_text(response_message)
 
 
 # ---------------------------------------------------------------------------
@@ -108,9 +98,10 @@ async def create_task(request: TaskRequest):
     )
     tasks[task_id] = task
 
-    # Process the task using Bedrock
+    # Process the task using Bedrock (one slow Bedrock call does not hold up
+    # every other request)
     try:
-        result = process_task(request.message)
+        result = await process_task(request.message)
         task.status = "completed"
         task.result = result
         task.completed_at = datetime.now(timezone.utc).isoformat()
@@ -138,4 +129,6 @@ async def get_task(task_id: str):
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
     import uvicorn
+    # `kill -HUP <pid>` re-reads .env and the BEDROCK_* settings in place.
+    install_reload_handler()
     uvicorn.run(app, host="0.0.0.0", port=8000)
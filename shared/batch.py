@@ -0,0 +1,203 @@
+"""
+Concurrent batch inference over many independent prompts.
+
+BatchRunner runs thousands of jobs on a bounded thread pool in the batch
+priority lane, so an installed rate limiter (see rate_limiter.py) paces
+them and serves interactive traffic first. Completed jobs are appended to
+a JSONL checkpoint, so an interrupted run resumes where it stopped.
+
+Usage:
+    runner = BatchRunner(max_workers=16, checkpoint_path="eval.jsonl")
+    results = runner.run([{"prompt": "What is KYC?", "model_id": CLAUDE_HAIKU}, ...])
+    print(runner.stats())
+
+    # Any callable works as the job, e.g. a lab function:
+    runner = BatchRunner(fn=lambda item: classify_intent(item["query"]))
+    for result in runner.as_completed(queries):
+        ...
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from bedrock_client import CLAUDE_HAIKU, converse, extract_text, get_bedrock_client
+from rate_limiter import PRIORITY_BATCH, priority
+
+
+def item_key(item):
+    """Stable checkpoint key: item["id"] if present, else a hash of the item."""
+    if isinstance(item, dict) and "id" in item:
+        return str(item["id"])
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def converse_job(item, client=None):
+    """Default job: one Converse call described by a prompt spec.
+
+    Args:
+        item: Dict with "prompt" (or a full "messages" list) and optional
+            "model_id" (default CLAUDE_HAIKU), "system_prompt" and "tools".
+        client: bedrock-runtime client (default: the shared client).
+
+    Returns:
+        Dict with text, stop_reason and usage.
+    """
+    messages = item.get("messages") or [{"role": "user", "content": [{"text": item["prompt"]}]}]
+    usage = {}
+    message, stop_reason = converse(
+        client or get_bedrock_client(), item.get("model_id", CLAUDE_HAIKU), messages,
+        system_prompt=item.get("system_prompt"), tools=item.get("tools"), usage=usage,
+    )
+    return {"text": extract_text(message), "stop_reason": stop_reason, "usage": usage}
+
+
+class BatchRunner:
+    """Runs independent jobs concurrently with checkpoint/resume.
+
+    Each result is a dict: index (position in the input), key, output (the
+    job's return value), error ("Type: message" or None), latency_ms and
+    resumed (True if it was loaded from the checkpoint). Failed jobs are
+    retried on resume; successful ones are not.
+
+    Args:
+        fn: Callable item -> JSON-serializable output (default converse_job).
+        max_workers: Maximum jobs in flight.
+        checkpoint_path: Optional JSONL file of completed results.
+        priority_level: Rate-limiter lane the jobs run in.
+    """
+
+    def __init__(self, fn=None, max_workers=16, checkpoint_path=None,
+                 priority_level=PRIORITY_BATCH):
+        self.fn = fn or converse_job
+        self.max_workers = max_workers
+        self.checkpoint_path = checkpoint_path
+        self.priority_level = priority_level
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def run(self, items):
+        """Run every item; returns results in input order."""
+        results = [None] * len(items)
+        for result in self.as_completed(items):
+            results[result["index"]] = result
+        return results
+
+    def as_completed(self, items):
+        """Run every item, yielding each result as soon as it is ready.
+
+        Results restored from the checkpoint are yielded first.
+        """
+        items = list(items)
+        done = self._load_checkpoint()
+        self._reset_stats(len(items))
+
+        todo = []
+        for index, item in enumerate(items):
+            key = item_key(item)
+            saved = done.get(key)
+            if saved is not None:
+                self._record(saved, resumed=True)
+                yield {**saved, "index": index, "resumed": True}
+            else:
+                todo.append((index, key, item))
+
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path else None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch")
+        try:
+            pending = set()
+            queue = iter(todo)
+            # Keep a bounded window in flight instead of submitting everything.
+            for job in queue:
+                pending.add(self._submit(executor, job))
+                if len(pending) >= self.max_workers * 2:
+                    break
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    self._record(result)
+                    if checkpoint is not None:
+                        checkpoint.write(json.dumps(result, default=str) + "\n")
+                        checkpoint.flush()
+                    job = next(queue, None)
+                    if job is not None:
+                        pending.add(self._submit(executor, job))
+                    yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if checkpoint is not None:
+                checkpoint.close()
+            self._stats["elapsed_s"] = time.perf_counter() - self._started
+
+    def _submit(self, executor, job):
+        # Copy the context so spans and metric labels follow the job.
+        return executor.submit(contextvars.copy_context().run, self._run_one, *job)
+
+    def _run_one(self, index, key, item):
+        start = time.perf_counter()
+        try:
+            with priority(self.priority_level):
+                output, error = self.fn(item), None
+        except Exception as e:
+            output, error = None, f"{type(e).__name__}: {e}"
+        return {"index": index, "key": key, "output": output, "error": error,
+                "latency_ms": (time.perf_counter() - start) * 1000, "resumed": False}
+
+    def _load_checkpoint(self):
+        done = {}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if result.get("error") is None:
+                    done[result["key"]] = result
+        return done
+
+    def _reset_stats(self, total):
+        self._started = time.perf_counter()
+        self._latencies = []
+        self._stats = {"total": total, "completed": 0, "failed": 0, "resumed": 0,
+                       "input_tokens": 0, "output_tokens": 0, "elapsed_s": 0.0}
+
+    def _record(self, result, resumed=False):
+        with self._lock:
+            if resumed:
+                self._stats["resumed"] += 1
+                return
+            if result["error"]:
+                self._stats["failed"] += 1
+                return
+            self._stats["completed"] += 1
+            self._latencies.append(result["latency_ms"])
+            output = result["output"]
+            usage = output.get("usage") if isinstance(output, dict) else None
+            if usage:
+                self._stats["input_tokens"] += usage.get("inputTokens", 0)
+                self._stats["output_tokens"] += usage.get("outputTokens", 0)
+
+    def stats(self):
+        """Throughput report for the current or most recent run."""
+        with self._lock:
+            stats = dict(self._stats)
+            ordered = sorted(self._latencies) if self._stats else []
+        if not stats:
+            return {}
+        if not stats["elapsed_s"]:
+            stats["elapsed_s"] = time.perf_counter() - self._started
+        elapsed = stats["elapsed_s"] or 1e-9
+        run = stats["completed"] + stats["failed"]
+        stats["items_per_sec"] = run / elapsed
+        stats["tokens_per_sec"] = (stats["input_tokens"] + stats["output_tokens"]) / elapsed
+        stats["p50_ms"] = ordered[len(ordered) // 2] if ordered else 0.0
+        stats["p95_ms"] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return stats
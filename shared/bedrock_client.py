@@ -2,35 +2,193 @@
 Shared Bedrock client utilities for all Agentic AI labs.
 Provides a simplified interface to the AWS Bedrock Converse API.
 
-Authentication: export AWS_BEARER_TOKEN_BEDROCK in your terminal.
-boto3 picks it up automatically.
+Authentication: export AWS_BEARER_TOKEN_BEDROCK in your terminal (or put
+it in a .env file, see config.py). boto3 picks it up automatically.
 """
 
-import boto3
+import contextvars
+import inspect
 import json
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
+
+from config import get_config, on_reload
+from logging_utils import span, traced
+from metrics import get_collector
+from rate_limiter import estimate_request_tokens
+
+# ---------------------------------------------------------------------------
+# Model ID constants — set in config.py (DEFAULTS, profiles, BEDROCK_* env).
+# These are fixed at import; read get_config() to pick up a reload.
+# ---------------------------------------------------------------------------
+_settings = get_config()
+
+CLAUDE_SONNET = _settings.claude_sonnet
+CLAUDE_HAIKU = _settings.claude_haiku
+LLAMA = _settings.llama
+MISTRAL = _settings.mistral
+
+REGION = _settings.region
+
+# Prompt-caching checkpoints understood by build_request(). Each one adds a
+# {"cachePoint": ...} block so Bedrock can reuse the processed prefix on the
+# next call. Caching only kicks in once the prefix passes the model's
+# minimum (about 1,024 tokens for Claude Sonnet), and models without prompt
+# caching reject requests that contain cache points.
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+ALL_CACHE_POINTS = ("system", "tools", "history")
+
+USAGE_FIELDS = ("inputTokens", "outputTokens", "totalTokens",
+                "cacheReadInputTokens", "cacheWriteInputTokens")
+
 
 # ---------------------------------------------------------------------------
-# Model ID constants — update these if newer model versions become available
+# Client pool tuning — one warm client per (region, settings) per process
 # ---------------------------------------------------------------------------
-CLAUDE_SONNET = "global.anthropic.claude-sonnet-4-6"
-CLAUDE_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
-LLAMA = "meta.llama3-8b-instruct-v1:0"
-MISTRAL = "mistral.ministral-3-3b-instruct"
+MAX_POOL_CONNECTIONS = _settings.max_pool_connections
+CONNECT_TIMEOUT = _settings.connect_timeout
+READ_TIMEOUT = _settings.read_timeout
+MAX_ATTEMPTS = _settings.max_attempts
+RETRY_MODE = _settings.retry_mode
 
-REGION = "ap-south-1"
+_clients = {}
+_clients_lock = threading.Lock()
+_client_override = None
 
 
-def get_bedrock_client(region=REGION):
-    """Create and return a boto3 Bedrock runtime client.
+def get_bedrock_client(region=None, max_pool_connections=None, connect_timeout=None,
+                       read_timeout=None, max_attempts=None, retry_mode=None,
+                       tcp_keepalive=True):
+    """Return the shared boto3 Bedrock runtime client for these settings.
+
+    Clients are created once per process and cached by region and
+    connection settings, so every agent in the process reuses the same
+    credential resolution and warm TLS connection pool. boto3 clients are
+    thread-safe, so the returned client can be shared freely across threads.
 
     Authentication is via the AWS_BEARER_TOKEN_BEDROCK environment variable.
     Export it in your terminal before running any lab.
+
+    Arguments left as None take the current value from get_config(), so a
+    config reload (e.g. on SIGHUP) applies to the next call.
+
+    Args:
+        region: AWS region name.
+        max_pool_connections: Size of the HTTP connection pool.
+        connect_timeout: Seconds to wait when opening a connection.
+        read_timeout: Seconds to wait for a response.
+        max_attempts: Total attempts per call, including the first.
+        retry_mode: botocore retry mode ("adaptive", "standard", "legacy").
+        tcp_keepalive: Keep idle pooled connections alive.
+
+    Returns:
+        A boto3 bedrock-runtime client.
     """
-    return boto3.client("bedrock-runtime", region_name=region)
+    if _client_override is not None:
+        return _client_override
+
+    settings = get_config()
+    if region is None:
+        region = settings.region
+    if max_pool_connections is None:
+        max_pool_connections = settings.max_pool_connections
+    if connect_timeout is None:
+        connect_timeout = settings.connect_timeout
+    if read_timeout is None:
+        read_timeout = settings.read_timeout
+    if max_attempts is None:
+        max_attempts = settings.max_attempts
+    if retry_mode is None:
+        retry_mode = settings.retry_mode
+
+    key = (region, max_pool_connections, connect_timeout, read_timeout,
+           max_attempts, retry_mode, tcp_keepalive)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # boto3 takes a few hundred ms to import; only pay for it on first use.
+            import boto3
+            from botocore.config import Config
+
+            config = Config(
+                max_pool_connections=max_pool_connections,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                retries={"max_attempts": max_attempts, "mode": retry_mode},
+                tcp_keepalive=tcp_keepalive,
+            )
+            client = boto3.client("bedrock-runtime", region_name=region, config=config)
+            _clients[key] = client
+    return client
+
+
+def reset_bedrock_clients():
+    """Drop every cached client (e.g. after rotating credentials)."""
+    with _clients_lock:
+        _clients.clear()
+
+
+@on_reload
+def _reset_clients_on_reload(old, new):
+    # A reload may carry a rotated bearer token from .env, which boto3 only
+    # reads when a client is created; in-flight calls keep their client.
+    reset_bedrock_clients()
+
+
+def set_client_override(client):
+    """Make get_bedrock_client() return client everywhere (None to undo).
+
+    Used to swap in fake_bedrock.FakeBedrockClient for offline runs.
+    """
+    global _client_override
+    _client_override = client
+
+
+# ---------------------------------------------------------------------------
+# Process-wide rate limiter (see rate_limiter.py) — off unless installed
+# ---------------------------------------------------------------------------
+_rate_limiter = None
+
+
+def set_rate_limiter(limiter):
+    """Route every Bedrock call made through this module via limiter.
+
+    Pass None to turn limiting off. When a limiter is installed it owns
+    throttling retries, so consider max_attempts=1 on the client to avoid
+    retrying twice.
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter():
+    return _rate_limiter
+
+
+# ---------------------------------------------------------------------------
+# Model router (see routing.py) — hedging and throttling fallback, off unless installed
+# ---------------------------------------------------------------------------
+_router = None
+
+
+def set_router(router):
+    """Send every non-streaming Converse call through router (None = off)."""
+    global _router
+    _router = router
+
+
+def get_router():
+    return _router
 
 
-def converse(client, model_id, messages, system_prompt=None, tools=None):
+def converse(client, model_id, messages, system_prompt=None, tools=None, cache=None,
+             cache_points=(), usage=None):
     """Simplified wrapper around client.converse().
 
     Args:
@@ -39,22 +197,140 @@ def converse(client, model_id, messages, system_prompt=None, tools=None):
         messages: List of message dicts (role + content).
         system_prompt: Optional system instruction string.
         tools: Optional list of tool schemas.
+        cache: Optional response_cache.ResponseCache. Identical requests are
+            answered from the cache instead of calling Bedrock.
+        cache_points: Where to insert prompt-caching checkpoints; any of
+            "system", "tools", "history" (see ALL_CACHE_POINTS).
+        usage: Optional dict; token counts from the response (including
+            cacheRead/cacheWrite input tokens) are added to it. A response
+            cache hit used no tokens and adds nothing.
 
     Returns:
         Tuple of (assistant_message_dict, stop_reason_string).
     """
-    kwargs = {"modelId": model_id, "messages": messages}
+    request = build_request(model_id, messages, system_prompt, tools, cache_points)
+    response, _, cached = _call_converse(client, request, cache)
+    if not cached:
+        add_usage(usage, response.get("usage"))
+    return response["output"]["message"], response["stopReason"]
+
+
+def build_request(model_id, messages, system_prompt=None, tools=None, cache_points=()):
+    """Assemble Converse request kwargs, adding prompt-cache checkpoints.
+
+    Checkpoints go after the system prompt, after the tool list and/or after
+    the latest message of the history. The caller's messages list is never
+    modified; the history checkpoint is added to a copy of the last message.
+    """
+    request = {"modelId": model_id, "messages": messages}
     if system_prompt:
-        kwargs["system"] = [{"text": system_prompt}]
+        request["system"] = [{"text": system_prompt}]
+        if "system" in cache_points:
+            request["system"].append(CACHE_POINT)
     if tools:
-        kwargs["toolConfig"] = {"tools": tools}
+        request["toolConfig"] = {"tools": list(tools) + [CACHE_POINT]
+                                 if "tools" in cache_points else tools}
+    if "history" in cache_points and len(messages) > 1:
+        last = messages[-1]
+        request["messages"] = messages[:-1] + [
+            {**last, "content": list(last["content"]) + [CACHE_POINT]}
+        ]
+    return request
 
-    response = client.converse(**kwargs)
-    return response["output"]["message"], response["stopReason"]
+
+def add_usage(totals, usage):
+    """Add one response's usage block into a running totals dict (if given)."""
+    if totals is None or not usage:
+        return
+    for field in USAGE_FIELDS:
+        if field in usage:
+            totals[field] = totals.get(field, 0) + usage[field]
+
+
+def _call_converse(client, request, cache=None):
+    """Send one Converse request, consulting the response cache if given.
+
+    Returns:
+        Tuple of (response, model_id that answered, cached). With a router
+        installed the model may be a fallback rather than request["modelId"].
+        cached is True for a response cache hit, whose stored usage was
+        already paid for by the original call.
+    """
+    if cache is not None:
+        start = time.perf_counter()
+        cached = cache.get(request)
+        if cached is not None:
+            get_collector().record(request["modelId"], cached=True,
+                                   client_latency_ms=(time.perf_counter() - start) * 1000)
+            return cached, request["modelId"], True
+    router = _router
+    if router is None:
+        response = _send(client.converse, request)
+        answered_by = request["modelId"]
+    else:
+        response, answered_by = router.send(request, lambda r: _send(client.converse, r))
+    # Never cache another model's answer under this model's request.
+    if cache is not None and answered_by == request["modelId"]:
+        cache.put(request, response)
+    return response, answered_by, False
 
 
+def _send(operation, request, operation_name="Converse"):
+    """Invoke a Converse operation, via the rate limiter if one is installed.
+
+    Every call is recorded in the metrics collector. For ConverseStream only
+    failures are recorded here; usage arrives at the end of the stream and
+    stream_with_tools() records it.
+    """
+    attempts = 0
+
+    def attempt():
+        nonlocal attempts
+        attempts += 1
+        return operation(**request)
+
+    with span(operation_name, kind="llm", model_id=request["modelId"]) as current:
+        start = time.perf_counter()
+        try:
+            limiter = _rate_limiter
+            if limiter is None:
+                response = attempt()
+            else:
+                response = limiter.call(request["modelId"], attempt,
+                                        estimated_tokens=estimate_request_tokens(request))
+        except Exception as e:
+            code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+            get_collector().record(request["modelId"], operation_name, retries=max(attempts - 1, 0),
+                                   client_latency_ms=(time.perf_counter() - start) * 1000,
+                                   error=code or type(e).__name__)
+            raise
+
+        if operation_name == "Converse":
+            usage = response.get("usage") or {}
+            current.set(input_tokens=usage.get("inputTokens"),
+                        output_tokens=usage.get("outputTokens"),
+                        stop_reason=response.get("stopReason"))
+            get_collector().record(
+                request["modelId"], operation_name,
+                usage=usage,
+                server_latency_ms=response.get("metrics", {}).get("latencyMs"),
+                client_latency_ms=(time.perf_counter() - start) * 1000,
+                retries=attempts - 1 + _sdk_retries(response),
+            )
+    return response
+
+
+def _sdk_retries(response):
+    """Retries botocore made internally before returning this response."""
+    return response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+@traced("converse_with_tools", kind="agent")
 def converse_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
-                        user_message, messages=None, verbose=False):
+                        user_message, messages=None, verbose=False,
+                        parallel_tools=False, max_workers=4, tool_timeout=None,
+                        cache=None, cache_points=(), usage=None, compactor=None,
+                        budget=None, tool_cache=None):
     """Run a complete agent loop: call LLM, dispatch tools, repeat until done.
 
     Args:
@@ -66,6 +342,30 @@ def converse_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
         user_message: The user's initial message string.
         messages: Optional existing message history (will be mutated).
         verbose: If True, print each tool call for debugging.
+        parallel_tools: If True, run the tool calls from one assistant turn
+            concurrently on a thread pool instead of one after another.
+        max_workers: Upper bound on concurrent tool calls (parallel mode only).
+        tool_timeout: Optional per-tool timeout in seconds (parallel mode
+            only). A tool that overruns gets an error result instead.
+        cache: Optional response_cache.ResponseCache. tool_use turns are
+            cached too, so a deterministic agent run replays instantly.
+            Hits add nothing to usage.
+        cache_points: Prompt-caching checkpoints, as for converse(). With
+            ALL_CACHE_POINTS every turn after the first reads the system
+            prompt, tools and prior history from Bedrock's prompt cache.
+        usage: Optional dict that accumulates token counts over all turns.
+        compactor: Optional compaction.ContextCompactor. Before each model
+            call the history is compacted in place if it exceeds the
+            compactor's token budget.
+        budget: Optional budget.Budget, checked before every model call.
+            When it runs out the loop stops with the best partial answer.
+            Calls are charged at the price of the model that answered (a
+            router may have used a fallback); a response cache hit counts
+            as a turn but costs nothing. Tools can read the time left
+            with the budget module's remaining_time() function, and in
+            parallel mode tool_timeout is capped to it.
+        tool_cache: Optional tool_cache.ToolResultCache. Repeat calls to
+            opted-in tools with the same input are answered from it.
 
     Returns:
         Tuple of (final_text_response, full_messages_list).
@@ -75,47 +375,543 @@ def converse_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
     messages.append({"role": "user", "content": [{"text": user_message}]})
 
     while True:
-        response = client.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=messages,
-            toolConfig={"tools": tools},
-        )
+        if budget is not None:
+            reason = budget.exhausted()
+            if reason is not None:
+                return _stop_for_budget(messages, reason, verbose), messages
+        if compactor is not None:
+            messages[:] = compactor.compact(messages)
+        request = build_request(model_id, messages, system_prompt, tools, cache_points)
+        response, answered_by, cached = _call_converse(client, request, cache)
+        billed = None if cached else response.get("usage")
+        add_usage(usage, billed)
+        if budget is not None:
+            budget.charge(answered_by, billed)
 
         assistant_message = response["output"]["message"]
         messages.append(assistant_message)
         stop_reason = response["stopReason"]
 
-        if stop_reason == "end_turn":
+        # end_turn, max_tokens, stop_sequence, guardrail_intervened, ...
+        if stop_reason != "tool_use":
             return extract_text(assistant_message), messages
 
-        if stop_reason == "tool_use":
-            tool_results = []
-            for block in assistant_message["content"]:
-                if "toolUse" in block:
-                    tool_name = block["toolUse"]["name"]
-                    tool_input = block["toolUse"]["input"]
-                    tool_id = block["toolUse"]["toolUseId"]
+        tool_uses = [block["toolUse"] for block in assistant_message["content"]
+                     if "toolUse" in block]
+        with _budget_scope(budget):
+            if parallel_tools and len(tool_uses) > 1:
+                tool_results = dispatch_tools_parallel(
+                    tool_uses, tool_dispatch, max_workers=max_workers,
+                    tool_timeout=budget.tool_timeout(tool_timeout) if budget else tool_timeout,
+                    verbose=verbose, tool_cache=tool_cache,
+                )
+            else:
+                tool_results = [
+                    _tool_result_block(tool_use["toolUseId"],
+                                       _call_tool(tool_dispatch, tool_use, verbose, tool_cache))
+                    for tool_use in tool_uses
+                ]
 
-                    if verbose:
-                        print(f"  -> Calling {tool_name}({json.dumps(tool_input)})")
+        messages.append({"role": "user", "content": tool_results})
+
+
+def _budget_scope(budget):
+    """Context in which tools can see the budget's remaining deadline."""
+    return budget.active() if budget is not None else nullcontext()
+
+
+def _stop_for_budget(messages, reason, verbose=False):
+    """End a loop whose budget ran out; returns the best partial answer.
+
+    The answer is appended as an assistant message so the history stays
+    valid for a follow-up call.
+    """
+    partial = ""
+    for message in reversed(messages):
+        if message.get("role") == "assistant":
+            partial = extract_text(message)
+            if partial:
+                break
+    note = f"[Stopped early: {reason}]"
+    text = f"{partial}\n\n{note}" if partial else note
+    messages.append({"role": "assistant", "content": [{"text": text}]})
+    if verbose:
+        print(f"  !! {note}")
+    return text
+
+
+def dispatch_tools_parallel(tool_uses, tool_dispatch, max_workers=4,
+                            tool_timeout=None, verbose=False, tool_cache=None):
+    """Run several toolUse requests concurrently and collect their results.
+
+    Tools run on a bounded thread pool, so a turn costs roughly as long as
+    its slowest tool. Results come back in the order the model issued the
+    toolUse blocks, matched by toolUseId, whatever order they finish in.
 
-                    try:
-                        result = tool_dispatch[tool_name](**tool_input)
-                    except Exception as e:
-                        result = json.dumps({"error": str(e)})
+    Args:
+        tool_uses: List of toolUse dicts (name, input, toolUseId).
+        tool_dispatch: Dict mapping tool name to callable.
+        max_workers: Maximum number of tools running at once.
+        tool_timeout: Optional seconds each tool may run before it is
+            abandoned and reported to the model as an error.
+        verbose: If True, print each tool call for debugging.
+        tool_cache: Optional tool_cache.ToolResultCache.
+
+    Returns:
+        List of toolResult content blocks, one per toolUse.
+    """
+    started = {}
 
+    def run(tool_use):
+        started[tool_use["toolUseId"]] = time.monotonic()
+        return _call_tool(tool_dispatch, tool_use, verbose, tool_cache)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tool_uses))))
+    try:
+        # Each tool gets its own copy of the context so its span nests under ours.
+        futures = [(tool_use, executor.submit(contextvars.copy_context().run, run, tool_use))
+                   for tool_use in tool_uses]
+        results = []
+        for tool_use, future in futures:
+            tool_id = tool_use["toolUseId"]
+            while True:
+                if tool_timeout is None:
+                    result = future.result()
+                    break
+                start = started.get(tool_id)
+                remaining = tool_timeout if start is None else start + tool_timeout - time.monotonic()
+                try:
+                    result = future.result(timeout=max(remaining, 0))
+                    break
+                except FutureTimeoutError:
+                    if start is None and not future.done():
+                        # Still queued behind other tools; its clock has not started.
+                        continue
+                    result = json.dumps({"error": f"Tool {tool_use['name']} timed out after {tool_timeout}s"})
                     if verbose:
-                        print(f"  <- {result[:200]}")
+                        print(f"  <- {result}")
+                    break
+            results.append(_tool_result_block(tool_id, result))
+        return results
+    finally:
+        # Never wait on a tool that overran its timeout.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_tool(tool_dispatch, tool_use, verbose=False, tool_cache=None):
+    """Invoke one tool, turning any exception into a JSON error string."""
+    tool_name = tool_use["name"]
+    tool_input = tool_use["input"]
+
+    if verbose:
+        print(f"  -> Calling {tool_name}({json.dumps(tool_input)})")
+
+    with span(tool_name, kind="tool", input=tool_input) as current:
+        try:
+            if tool_cache is None:
+                result = tool_dispatch[tool_name](**tool_input)
+            else:
+                result, cached = tool_cache.call(tool_name, tool_input, tool_dispatch[tool_name])
+                current.set(cached=cached)
+        except Exception as e:
+            result = json.dumps({"error": str(e)})
+        current.set(output=str(result)[:200])
 
-                    tool_results.append({
-                        "toolResult": {
-                            "toolUseId": tool_id,
-                            "content": [{"text": str(result)}],
-                        }
-                    })
+    if verbose:
+        print(f"  <- {str(result)[:200]}")
+    return result
 
+
+def _tool_result_block(tool_id, result):
+    """Wrap a tool's return value in a Converse toolResult content block."""
+    return {
+        "toolResult": {
+            "toolUseId": tool_id,
+            "content": [{"text": str(result)}],
+        }
+    }
+
+
+# ---------------------------------------------------------------------------
+# Async variants — for FastAPI / MCP callers running inside an event loop
+# ---------------------------------------------------------------------------
+# boto3 is blocking, so each Bedrock round trip runs on a dedicated thread
+# pool. The pool is sized for many concurrent conversations rather than the
+# default executor's CPU-based limit.
+ASYNC_MAX_CONCURRENCY = _settings.async_max_concurrency
+
+_async_executor = None
+
+
+def _get_async_executor():
+    global _async_executor
+    if _async_executor is None:
+        _async_executor = ThreadPoolExecutor(
+            max_workers=ASYNC_MAX_CONCURRENCY, thread_name_prefix="bedrock-async",
+        )
+    return _async_executor
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the Bedrock thread pool without blocking the loop."""
+    # asyncio adds ~90 ms to import; sync-only callers never load it.
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the rate-limiter priority) into the thread.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_async_executor(),
+                                      lambda: context.run(fn, *args, **kwargs))
+
+
+async def aconverse(client, model_id, messages, system_prompt=None, tools=None, cache=None,
+                    cache_points=(), usage=None):
+    """Async counterpart of converse(); never blocks the event loop.
+
+    Returns:
+        Tuple of (assistant_message_dict, stop_reason_string).
+    """
+    return await _run_blocking(converse, client, model_id, messages,
+                               system_prompt=system_prompt, tools=tools, cache=cache,
+                               cache_points=cache_points, usage=usage)
+
+
+@traced("aconverse_with_tools", kind="agent")
+async def aconverse_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
+                               user_message, messages=None, verbose=False,
+                               parallel_tools=False, max_workers=4, tool_timeout=None, cache=None,
+                               cache_points=(), usage=None, compactor=None, budget=None,
+                               tool_cache=None):
+    """Async counterpart of converse_with_tools().
+
+    Tool callables may be plain functions or coroutine functions. Coroutines
+    are awaited on the loop; plain functions run on the Bedrock thread pool.
+
+    Args:
+        Same as converse_with_tools(). With parallel_tools=True the tool calls
+        from one turn run concurrently, at most max_workers (and never more
+        than ASYNC_MAX_CONCURRENCY) at a time; tool_timeout applies per tool,
+        from when it starts, and with a budget is capped to the time left in
+        the session.
+
+    Returns:
+        Tuple of (final_text_response, full_messages_list).
+    """
+    if messages is None:
+        messages = []
+    messages.append({"role": "user", "content": [{"text": user_message}]})
+
+    while True:
+        if budget is not None:
+            reason = budget.exhausted()
+            if reason is not None:
+                return _stop_for_budget(messages, reason, verbose), messages
+        if compactor is not None:
+            messages[:] = await _run_blocking(compactor.compact, messages)
+        request = build_request(model_id, messages, system_prompt, tools, cache_points)
+        response, answered_by, cached = await _run_blocking(_call_converse, client, request, cache)
+        billed = None if cached else response.get("usage")
+        add_usage(usage, billed)
+        if budget is not None:
+            budget.charge(answered_by, billed)
+
+        assistant_message = response["output"]["message"]
+        messages.append(assistant_message)
+        stop_reason = response["stopReason"]
+
+        if stop_reason != "tool_use":
+            return extract_text(assistant_message), messages
+
+        tool_uses = [block["toolUse"] for block in assistant_message["content"]
+                     if "toolUse" in block]
+        timeout = budget.tool_timeout(tool_timeout) if budget else tool_timeout
+        with _budget_scope(budget):
+            calls = [_acall_tool(tool_dispatch, tool_use, verbose, timeout, tool_cache)
+                     for tool_use in tool_uses]
+            if parallel_tools:
+                results = await _gather_bounded(calls, min(max_workers, ASYNC_MAX_CONCURRENCY))
+            else:
+                results = [await call for call in calls]
+
+        messages.append({"role": "user", "content": [
+            _tool_result_block(tool_use["toolUseId"], result)
+            for tool_use, result in zip(tool_uses, results)
+        ]})
+
+
+async def _gather_bounded(calls, limit):
+    """Await coroutines concurrently, at most limit at a time, in order."""
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def bounded(call):
+        async with semaphore:
+            return await call
+
+    return await asyncio.gather(*(bounded(call) for call in calls))
+
+
+async def _acall_tool(tool_dispatch, tool_use, verbose=False, tool_timeout=None,
+                      tool_cache=None):
+    """Invoke one tool from async code, awaiting it if it is a coroutine."""
+    import asyncio
+
+    tool_name = tool_use["name"]
+    tool_input = tool_use["input"]
+
+    if verbose:
+        print(f"  -> Calling {tool_name}({json.dumps(tool_input)})")
+
+    with span(tool_name, kind="tool", input=tool_input) as current:
+        cached, result = tool_cache.lookup(tool_name, tool_input) if tool_cache else (False, None)
+        if tool_cache is not None:
+            current.set(cached=cached)
+        if not cached:
+            try:
+                fn = tool_dispatch[tool_name]
+                if inspect.iscoroutinefunction(fn):
+                    call = fn(**tool_input)
+                else:
+                    call = _run_blocking(fn, **tool_input)
+                result = await asyncio.wait_for(call, timeout=tool_timeout)
+                if inspect.isawaitable(result):
+                    result = await asyncio.wait_for(result, timeout=tool_timeout)
+                if tool_cache is not None:
+                    tool_cache.record(tool_name, tool_input, result)
+            except asyncio.TimeoutError:
+                result = json.dumps({"error": f"Tool {tool_name} timed out after {tool_timeout}s"})
+            except Exception as e:
+                result = json.dumps({"error": str(e)})
+        current.set(output=str(result)[:200])
+
+    if verbose:
+        print(f"  <- {str(result)[:200]}")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Streaming agent loop — built on converse_stream
+# ---------------------------------------------------------------------------
+def stream_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
+                      user_message, messages=None, verbose=False, max_workers=4,
+                      cache_points=(), usage=None, compactor=None, budget=None,
+                      tool_cache=None, cancel=None):
+    """Run the agent loop over converse_stream, yielding events as they arrive.
+
+    Text deltas are yielded immediately. Streamed toolUse input JSON is
+    assembled per content block, and each tool is dispatched on a thread
+    pool as soon as its block closes, while the model is still streaming.
+
+    Args:
+        Same as converse_with_tools(); max_workers bounds concurrent tools.
+        Token usage arrives in the stream's metadata event and is added to
+        usage if given. When a budget runs out, the final "done" event has
+        stop_reason "budget_exhausted" and the partial answer as its text.
+        cancel: Optional threading.Event. Once it is set the loop stops at
+            the next stream event, before waiting on tools and before the
+            next model call, without a "done" event. The response stream is
+            closed whenever the loop stops early.
+
+    Yields:
+        Event dicts, one of:
+            {"type": "text", "text": delta}
+            {"type": "tool_use", "toolUseId", "name", "input"}
+            {"type": "tool_result", "toolUseId", "name", "result"}
+            {"type": "done", "text", "stop_reason", "messages"}
+    """
+    if messages is None:
+        messages = []
+    messages.append({"role": "user", "content": [{"text": user_message}]})
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock-tool")
+    try:
+        while True:
+            if cancelled():
+                return
+            if budget is not None:
+                reason = budget.exhausted()
+                if reason is not None:
+                    yield {"type": "done", "text": _stop_for_budget(messages, reason, verbose),
+                           "stop_reason": "budget_exhausted", "messages": messages}
+                    return
+            if compactor is not None:
+                messages[:] = compactor.compact(messages)
+            request = build_request(model_id, messages, system_prompt, tools, cache_points)
+            started = time.perf_counter()
+            response = _send(client.converse_stream, request, "ConverseStream")
+
+            blocks = {}   # contentBlockIndex -> partial block
+            pending = []  # (toolUse dict, Future) in the order blocks closed
+            stop_reason = None
+
+            stream = response["stream"]
+            try:
+                for event in stream:
+                    if cancelled():
+                        return
+                    if "contentBlockStart" in event:
+                        start = event["contentBlockStart"]["start"]
+                        if "toolUse" in start:
+                            index = event["contentBlockStart"]["contentBlockIndex"]
+                            blocks[index] = {"toolUse": dict(start["toolUse"]), "parts": []}
+
+                    elif "contentBlockDelta" in event:
+                        index = event["contentBlockDelta"]["contentBlockIndex"]
+                        delta = event["contentBlockDelta"]["delta"]
+                        if "text" in delta:
+                            blocks.setdefault(index, {"text": []})["text"].append(delta["text"])
+                            yield {"type": "text", "text": delta["text"]}
+                        elif "toolUse" in delta:
+                            blocks[index]["parts"].append(delta["toolUse"].get("input", ""))
+
+                    elif "contentBlockStop" in event:
+                        block = blocks.get(event["contentBlockStop"]["contentBlockIndex"])
+                        if block and "toolUse" in block:
+                            tool_use = block["toolUse"]
+                            future = _submit_streamed_tool(executor, tool_dispatch, tool_use,
+                                                           "".join(block["parts"]), verbose, budget,
+                                                           tool_cache)
+                            pending.append((tool_use, future))
+                            yield {"type": "tool_use", "toolUseId": tool_use["toolUseId"],
+                                   "name": tool_use["name"], "input": tool_use["input"]}
+
+                    elif "messageStop" in event:
+                        stop_reason = event["messageStop"]["stopReason"]
+
+                    elif "metadata" in event:
+                        add_usage(usage, event["metadata"].get("usage"))
+                        if budget is not None:
+                            budget.charge(model_id, event["metadata"].get("usage"))
+                        get_collector().record(
+                            model_id, "ConverseStream",
+                            usage=event["metadata"].get("usage"),
+                            server_latency_ms=event["metadata"].get("metrics", {}).get("latencyMs"),
+                            client_latency_ms=(time.perf_counter() - started) * 1000,
+                            retries=_sdk_retries(response),
+                        )
+            finally:
+                # A no-op once the stream is exhausted; stops the download otherwise.
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+
+            content = []
+            for index in sorted(blocks):
+                block = blocks[index]
+                if "toolUse" in block:
+                    content.append({"toolUse": block["toolUse"]})
+                else:
+                    content.append({"text": "".join(block["text"])})
+            assistant_message = {"role": "assistant", "content": content}
+            messages.append(assistant_message)
+
+            if stop_reason != "tool_use":
+                yield {"type": "done", "text": extract_text(assistant_message),
+                       "stop_reason": stop_reason, "messages": messages}
+                return
+
+            tool_results = []
+            for tool_use, future in pending:
+                if cancelled():
+                    return
+                try:
+                    result = future.result(timeout=budget.remaining_seconds() if budget else None)
+                except FutureTimeoutError:
+                    result = json.dumps({"error": f"Tool {tool_use['name']} ran past the session deadline"})
+                yield {"type": "tool_result", "toolUseId": tool_use["toolUseId"],
+                       "name": tool_use["name"], "result": result}
+                tool_results.append(_tool_result_block(tool_use["toolUseId"], result))
             messages.append({"role": "user", "content": tool_results})
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_streamed_tool(executor, tool_dispatch, tool_use, raw_input, verbose=False,
+                         budget=None, tool_cache=None):
+    """Parse a streamed toolUse input and start the tool on the executor."""
+    try:
+        tool_use["input"] = json.loads(raw_input) if raw_input else {}
+    except json.JSONDecodeError as e:
+        tool_use["input"] = {}
+        future = Future()
+        future.set_result(json.dumps({"error": f"Malformed tool input: {e}"}))
+        return future
+
+    def run():
+        with _budget_scope(budget):
+            return _call_tool(tool_dispatch, tool_use, verbose, tool_cache)
+    return executor.submit(contextvars.copy_context().run, run)
+
+
+async def astream_with_tools(client, model_id, system_prompt, tools, tool_dispatch,
+                             user_message, messages=None, verbose=False, max_workers=4,
+                             cache_points=(), usage=None, compactor=None, budget=None,
+                             tool_cache=None):
+    """Async-generator counterpart of stream_with_tools().
+
+    The blocking stream is consumed on the Bedrock thread pool and events are
+    handed to the event loop as they arrive. Coroutine-function tools are
+    scheduled back onto the calling loop. If the consumer stops early (break,
+    aclose() or cancellation), the worker stops at its next stream event and
+    makes no further model or tool calls.
+
+    Yields:
+        The same event dicts as stream_with_tools().
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+    cancel = threading.Event()
+
+    def wrap(fn):
+        if not inspect.iscoroutinefunction(fn):
+            return fn
+        return lambda **kwargs: asyncio.run_coroutine_threadsafe(fn(**kwargs), loop).result()
+
+    dispatch = {name: wrap(fn) for name, fn in tool_dispatch.items()}
+
+    def post(item):
+        if cancel.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # the consumer's loop has already closed
+
+    def pump():
+        events = stream_with_tools(client, model_id, system_prompt, tools, dispatch,
+                                   user_message, messages=messages, verbose=verbose,
+                                   max_workers=max_workers, cache_points=cache_points,
+                                   usage=usage, compactor=compactor, budget=budget,
+                                   tool_cache=tool_cache, cancel=cancel)
+        try:
+            for event in events:
+                post(event)
+        except Exception as e:
+            post(e)
+        finally:
+            events.close()
+            post(finished)
+
+    worker = asyncio.ensure_future(_run_blocking(pump))
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                await worker
+                raise item
+            yield item
+        await worker
+    finally:
+        cancel.set()
 
 
 def extract_text(message):
@@ -0,0 +1,156 @@
+"""
+Per-session turn, token, time and spend budgets for agent loops.
+
+A Budget is passed to converse_with_tools() (or its async/streaming
+variants) and is checked before every model call. When any limit is hit
+the loop stops gracefully and returns the best partial answer so far,
+instead of letting a confused model loop for minutes.
+
+Usage:
+    budget = Budget(max_turns=8, max_seconds=60, max_cost_usd=0.25)
+    text, messages = converse_with_tools(..., budget=budget)
+    print(budget.stats())
+
+Tools can read the time left in the session with remaining_time().
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from bedrock_client import CLAUDE_HAIKU, CLAUDE_SONNET, LLAMA, MISTRAL
+
+# USD per million tokens. Ballpark on-demand prices; check the Bedrock
+# pricing page for your region before relying on them for billing.
+PRICES = {
+    CLAUDE_SONNET: {"input": 3.00, "output": 15.00, "cache_read": 0.30, "cache_write": 3.75},
+    CLAUDE_HAIKU: {"input": 0.25, "output": 1.25, "cache_read": 0.03, "cache_write": 0.30},
+    LLAMA: {"input": 0.30, "output": 0.60},
+    MISTRAL: {"input": 0.04, "output": 0.04},
+}
+
+_current_budget = contextvars.ContextVar("agent_budget", default=None)
+
+
+def cost_usd(model_id, usage, prices=PRICES):
+    """Dollar cost of one Converse usage block (0.0 for unknown models)."""
+    price = prices.get(model_id)
+    if not price or not usage:
+        return 0.0
+    return (usage.get("inputTokens", 0) * price["input"]
+            + usage.get("outputTokens", 0) * price["output"]
+            + usage.get("cacheReadInputTokens", 0) * price.get("cache_read", price["input"])
+            + usage.get("cacheWriteInputTokens", 0) * price.get("cache_write", price["input"])
+            ) / 1_000_000
+
+
+def remaining_time():
+    """Seconds left in the active budget's deadline, or None if unbounded.
+
+    Tools called from inside a budgeted agent loop can use this to size
+    their own timeouts.
+    """
+    budget = _current_budget.get()
+    return budget.remaining_seconds() if budget is not None else None
+
+
+class Budget:
+    """Limits for one agent session; any limit may be None (unlimited).
+
+    The wall-clock deadline starts on first use, so one Budget can span
+    several converse_with_tools() calls in the same session. Safe to share
+    between threads.
+
+    Args:
+        max_turns: Maximum number of model calls.
+        max_input_tokens: Maximum total input tokens (cache reads included).
+        max_output_tokens: Maximum total output tokens.
+        max_seconds: Wall-clock allowance for the session.
+        max_cost_usd: Maximum spend, priced with prices.
+        prices: Model ID -> USD per million tokens (see PRICES).
+    """
+
+    def __init__(self, max_turns=None, max_input_tokens=None, max_output_tokens=None,
+                 max_seconds=None, max_cost_usd=None, prices=PRICES):
+        self.max_turns = max_turns
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_seconds = max_seconds
+        self.max_cost_usd = max_cost_usd
+        self.prices = prices
+        self.turns = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.stop_reason = None
+        self._deadline = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the wall-clock deadline (no-op if already started)."""
+        if self._deadline is None and self.max_seconds is not None:
+            self._deadline = time.monotonic() + self.max_seconds
+        return self
+
+    def remaining_seconds(self):
+        if self.max_seconds is None:
+            return None
+        self.start()
+        return max(0.0, self._deadline - time.monotonic())
+
+    def charge(self, model_id, usage):
+        """Record one model call and its usage block."""
+        usage = usage or {}
+        with self._lock:
+            self.turns += 1
+            self.input_tokens += (usage.get("inputTokens", 0)
+                                  + usage.get("cacheReadInputTokens", 0)
+                                  + usage.get("cacheWriteInputTokens", 0))
+            self.output_tokens += usage.get("outputTokens", 0)
+            self.cost_usd += cost_usd(model_id, usage, self.prices)
+
+    def exhausted(self):
+        """Return why the budget is used up, or None if another call may run."""
+        if self.max_turns is not None and self.turns >= self.max_turns:
+            reason = f"turn limit of {self.max_turns} reached"
+        elif self.max_input_tokens is not None and self.input_tokens >= self.max_input_tokens:
+            reason = f"input token budget of {self.max_input_tokens} used"
+        elif self.max_output_tokens is not None and self.output_tokens >= self.max_output_tokens:
+            reason = f"output token budget of {self.max_output_tokens} used"
+        elif self.max_cost_usd is not None and self.cost_usd >= self.max_cost_usd:
+            reason = f"spend limit of ${self.max_cost_usd:g} reached"
+        elif self.max_seconds is not None and self.remaining_seconds() <= 0:
+            reason = f"deadline of {self.max_seconds}s passed"
+        else:
+            return None
+        self.stop_reason = reason
+        return reason
+
+    def tool_timeout(self, tool_timeout=None):
+        """The tighter of tool_timeout and the time left before the deadline."""
+        remaining = self.remaining_seconds()
+        if remaining is None:
+            return tool_timeout
+        if tool_timeout is None:
+            return remaining
+        return min(tool_timeout, remaining)
+
+    @contextmanager
+    def active(self):
+        """Make this budget visible to remaining_time() inside the block."""
+        token = _current_budget.set(self)
+        try:
+            yield self
+        finally:
+            _current_budget.reset(token)
+
+    def stats(self):
+        return {
+            "turns": self.turns,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "remaining_seconds": self.remaining_seconds(),
+            "stop_reason": self.stop_reason,
+        }
@@ -0,0 +1,193 @@
+"""
+Classification cache with normalization and near-duplicate matching.
+
+Customer messages repeat heavily ("what's my balance", "whats my balance?",
+"check my balance please"). A ClassificationCache maps each message to a
+normalized form (lower case, no punctuation or stop words) and finds:
+
+- exact repeats of the normalized form with a dict lookup, in O(1);
+- near-duplicates through a MinHash locality-sensitive-hashing index over
+  character shingles. Candidates that share an LSH band are confirmed by
+  their actual Jaccard similarity before a cached value is returned.
+
+The cache is bounded, evicts the least recently used entry and counts
+exact hits, near hits and misses.
+
+Usage:
+    cache = ClassificationCache(max_entries=10_000, similarity=0.5)
+
+    result, match = cache.lookup(message)      # match: "exact", "near" or None
+    if match is None:
+        result = classify_with_llm(message)
+        cache.put(message, result)
+    print(cache.stats())
+"""
+
+import random
+import re
+import threading
+from collections import OrderedDict
+
+STOP_WORDS = frozenset("""
+    a am an and are at be been can check could did do does for from get have hello
+    hey hi how i im in is it its just know like me my need of on or our please see
+    show tell the there this to us want was we what whats when where which would
+    you your
+""".split())
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text, stop_words=STOP_WORDS):
+    """Lower-case, drop punctuation and stop words, collapse whitespace.
+
+    "What's my balance?" and "whats my BALANCE" both become "balance".
+    Falls back to the words without stop-word removal if nothing is left.
+    """
+    words = _NON_WORD.sub(" ", text.lower().replace("'", "")).split()
+    kept = [w for w in words if w not in stop_words]
+    return " ".join(kept or words)
+
+
+def shingles(normalized, size=3):
+    """Character shingles of the normalized text (the whole text if shorter)."""
+    padded = f" {normalized} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ClassificationCache:
+    """Bounded LRU cache keyed by normalized text, with LSH near-duplicate lookup.
+
+    Args:
+        max_entries: Entries kept; the least recently used go first.
+        similarity: Minimum Jaccard similarity of shingle sets for a
+            near-duplicate hit. None disables near-duplicate matching.
+        num_perm: MinHash signature length.
+        bands: LSH bands; num_perm must divide evenly. With 64/16 (4 rows
+            per band), pairs at 0.5 similarity usually share a band and
+            dissimilar ones rarely do; candidates are then checked exactly.
+        shingle_size: Characters per shingle.
+        stop_words: Words dropped by normalize().
+        seed: Seed for the MinHash permutations.
+    """
+
+    def __init__(self, max_entries=10_000, similarity=0.5, num_perm=64, bands=16,
+                 shingle_size=3, stop_words=STOP_WORDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.stop_words = stop_words
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._entries = OrderedDict()  # normalized -> (value, shingles, band keys)
+        self._buckets = [{} for _ in range(bands)]  # band -> {band key: set(normalized)}
+        self._lock = threading.Lock()
+        self._counters = {"exact_hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+
+    def _signature(self, shingle_set):
+        # hash() of a str is stable within a process, which is all an
+        # in-memory index needs. XOR with random masks stands in for
+        # independent permutations: a few times cheaper than universal
+        # hashing, and candidates are verified exactly anyway.
+        hashes = [hash(s) for s in shingle_set]
+        return [min([h ^ mask for h in hashes]) for mask in self._masks]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [tuple(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def lookup(self, text):
+        """Return (value, match) where match is "exact", "near" or None on a miss."""
+        key = normalize(text, self.stop_words)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["exact_hits"] += 1
+                return entry[0], "exact"
+        if self.similarity is None:
+            return self._miss()
+
+        query = shingles(key, self.shingle_size)
+        band_keys = self._band_keys(self._signature(query))
+        with self._lock:
+            candidates = set()
+            for bucket, band_key in zip(self._buckets, band_keys):
+                candidates |= bucket.get(band_key, set())
+            best, best_score = None, self.similarity
+            for candidate in candidates:
+                score = jaccard(query, self._entries[candidate][1])
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                self._entries.move_to_end(best)
+                self._counters["near_hits"] += 1
+                return self._entries[best][0], "near"
+        return self._miss()
+
+    def _miss(self):
+        with self._lock:
+            self._counters["misses"] += 1
+        return None, None
+
+    def put(self, text, value):
+        """Cache value for text (and, through LSH, for its near-duplicates)."""
+        key = normalize(text, self.stop_words)
+        shingle_set = shingles(key, self.shingle_size)
+        band_keys = self._band_keys(self._signature(shingle_set)) if self.similarity is not None else []
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, shingle_set, band_keys)
+            for bucket, band_key in zip(self._buckets, band_keys):
+                bucket.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def _remove(self, key):
+        _, _, band_keys = self._entries.pop(key)
+        for bucket, band_key in zip(self._buckets, band_keys):
+            members = bucket[band_key]
+            members.discard(key)
+            if not members:
+                del bucket[band_key]
+
+    def get_or_compute(self, text, compute):
+        """Return (value, match), calling compute(text) and caching it on a miss."""
+        value, match = self.lookup(text)
+        if match is None:
+            value = compute(text)
+            self.put(text, value)
+        return value, match
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        hits = stats["exact_hits"] + stats["near_hits"]
+        stats["entries"] = len(self._entries)
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
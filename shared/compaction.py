@@ -0,0 +1,219 @@
+"""
+Token-budget-aware context compaction for agent loops.
+Keeps a conversation under a token budget by folding the oldest turns into
+a rolling summary, so long sessions stop getting slower every turn.
+
+Usage:
+    compactor = ContextCompactor(client, max_tokens=8000)
+    converse_with_tools(client, CLAUDE_SONNET, prompt, tools, dispatch,
+                        user_message, messages=history, compactor=compactor)
+"""
+
+import json
+import sys
+
+from bedrock_client import CLAUDE_HAIKU, converse, extract_text
+
+# Rough English average for Claude tokenizers; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+# Fixed per-message overhead (role markers, block framing).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "AI assistant that uses tools. Merge the new turns into the existing "
+    "summary. Preserve key facts, decisions, tool results, open questions "
+    "and user preferences. Reply with the updated summary only."
+)
+
+SUMMARY_PREFIX = "Previous conversation summary: "
+SUMMARY_ACK = "Understood, I have the context from our previous conversation."
+
+
+def estimate_tokens(message):
+    """Approximate the token count of one Converse message."""
+    chars = 0
+    for block in message.get("content", []):
+        if "text" in block:
+            chars += len(block["text"])
+        elif "toolUse" in block:
+            chars += len(block["toolUse"].get("name", ""))
+            chars += len(json.dumps(block["toolUse"].get("input", {})))
+        elif "toolResult" in block:
+            for part in block["toolResult"].get("content", []):
+                if "text" in part:
+                    chars += len(part["text"])
+                elif "json" in part:
+                    chars += len(json.dumps(part["json"]))
+    return MESSAGE_OVERHEAD_TOKENS + chars // CHARS_PER_TOKEN
+
+
+def _is_turn_start(message):
+    """True if a conversation may begin at this message.
+
+    It must be a user message that is not answering a toolUse, so a toolUse
+    is never separated from its toolResult.
+    """
+    if message.get("role") != "user":
+        return False
+    return not any("toolResult" in block for block in message.get("content", []))
+
+
+def _render(messages, max_chars):
+    lines = []
+    for msg in messages:
+        role = msg.get("role", "unknown")
+        for block in msg.get("content", []):
+            if "text" in block:
+                lines.append(f"{role}: {block['text'][:max_chars]}")
+            elif "toolUse" in block:
+                call = json.dumps(block["toolUse"].get("input", {}))[:max_chars]
+                lines.append(f"{role} called {block['toolUse'].get('name')}({call})")
+            elif "toolResult" in block:
+                for part in block["toolResult"].get("content", []):
+                    if "text" in part:
+                        lines.append(f"tool result: {part['text'][:max_chars]}")
+    return "\n".join(lines)
+
+
+class ContextCompactor:
+    """Keeps a message history under a token budget with a rolling summary.
+
+    When the estimated size of the history exceeds max_tokens, the oldest
+    whole turns are evicted until it fits in target_tokens. Only the newly
+    evicted turns are summarized; they are merged into the existing summary
+    rather than re-summarizing the whole conversation.
+
+    If the keep_recent messages alone exceed max_tokens the budget cannot be
+    met. This is reported once on stderr (and budget_unreachable is set),
+    and summary calls are made only once the evictable turns themselves
+    exceed max_tokens, instead of on every turn.
+
+    Args:
+        client: boto3 bedrock-runtime client used for summarization.
+        max_tokens: Budget that triggers compaction.
+        target_tokens: Size to compact down to (default 60% of max_tokens).
+        keep_recent: Minimum number of most recent messages never evicted.
+        model_id: Model used to write the summary (fast/cheap by default).
+        max_chars_per_block: Truncation applied to each evicted block before
+            it is sent to the summarizer.
+    """
+
+    def __init__(self, client, max_tokens=8000, target_tokens=None, keep_recent=4,
+                 model_id=CLAUDE_HAIKU, max_chars_per_block=1000):
+        self.client = client
+        self.max_tokens = max_tokens
+        self.target_tokens = target_tokens or int(max_tokens * 0.6)
+        self.keep_recent = keep_recent
+        self.model_id = model_id
+        self.max_chars_per_block = max_chars_per_block
+        self.summary = ""
+        self.compactions = 0
+        self.summarized_messages = 0
+        self.budget_unreachable = False
+        self._summary_pair = None
+        self._counted = []  # (message, tokens) for the prefix already measured
+
+    def token_counts(self, messages):
+        """Return per-message token estimates, measuring only new messages."""
+        counted = self._counted
+        if counted and (len(counted) > len(messages)
+                        or counted[0][0] is not messages[0]
+                        or counted[-1][0] is not messages[len(counted) - 1]):
+            counted = []  # a different or rewritten history; start over
+        for message in messages[len(counted):]:
+            counted.append((message, estimate_tokens(message)))
+        self._counted = counted
+        return [tokens for _, tokens in counted]
+
+    def total_tokens(self, messages):
+        return sum(self.token_counts(messages))
+
+    def compact(self, messages):
+        """Return messages, compacted if they exceed the token budget.
+
+        The input list is not modified. If no compaction is needed (or no
+        safe split point exists) the same list object is returned.
+        """
+        counts = self.token_counts(messages)
+        if sum(counts) <= self.max_tokens:
+            return messages
+
+        preamble = 2 if self._has_summary(messages) else 0
+        split = self._choose_split(messages, counts, preamble)
+        if split is None:
+            return messages
+
+        remaining = sum(counts[:preamble]) + sum(counts[split:])
+        if remaining > self.max_tokens:
+            self._report_unreachable(remaining)
+            if sum(counts[preamble:split]) <= self.max_tokens:
+                return messages  # too little to evict to be worth a summary call
+
+        evicted = messages[preamble:split]
+        self._update_summary(evicted)
+        self._summary_pair = (
+            {"role": "user", "content": [{"text": SUMMARY_PREFIX + self.summary}]},
+            {"role": "assistant", "content": [{"text": SUMMARY_ACK}]},
+        )
+        self.compactions += 1
+        self.summarized_messages += len(evicted)
+        return list(self._summary_pair) + messages[split:]
+
+    def _has_summary(self, messages):
+        """True if messages starts with a summary pair (ours, or a copy of one).
+
+        Histories that were copied or serialized between turns no longer
+        hold our pair objects, so the pair is also recognized by its text;
+        otherwise it would be evicted and summarized again every time.
+        """
+        pair = self._summary_pair
+        if pair is not None and len(messages) >= 2 and messages[0] is pair[0]:
+            return True
+        if len(messages) < 2 or messages[0].get("role") != "user":
+            return False
+        first = messages[0].get("content") or [{}]
+        second = messages[1].get("content") or [{}]
+        text = first[0].get("text", "")
+        if not (text.startswith(SUMMARY_PREFIX) and second[0].get("text") == SUMMARY_ACK):
+            return False
+        if not self.summary:
+            self.summary = text[len(SUMMARY_PREFIX):]  # carry on from the copied summary
+        return True
+
+    def _report_unreachable(self, remaining):
+        if not self.budget_unreachable:
+            self.budget_unreachable = True
+            print(f"[compaction] the {self.keep_recent} most recent messages are ~{remaining} tokens, "
+                  f"over max_tokens={self.max_tokens}; compacting only when more than "
+                  f"{self.max_tokens} tokens can be evicted", file=sys.stderr)
+
+    def _choose_split(self, messages, counts, preamble):
+        """Pick the earliest turn boundary whose suffix fits target_tokens."""
+        latest = len(messages) - self.keep_recent
+        candidates = [i for i in range(preamble + 1, latest + 1) if _is_turn_start(messages[i])]
+        if not candidates:
+            return None
+
+        suffix = sum(counts[candidates[0]:])
+        position = candidates[0]
+        for i in candidates:
+            suffix -= sum(counts[position:i])
+            position = i
+            if suffix <= self.target_tokens:
+                return i
+        return candidates[-1]
+
+    def _update_summary(self, evicted):
+        transcript = _render(evicted, self.max_chars_per_block)
+        if self.summary:
+            prompt = f"Existing summary:\n{self.summary}\n\nNew turns:\n{transcript}"
+        else:
+            prompt = f"Conversation:\n{transcript}"
+        message, _ = converse(
+            self.client, self.model_id,
+            [{"role": "user", "content": [{"text": prompt}]}],
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+        )
+        self.summary = extract_text(message)
@@ -0,0 +1,349 @@
+"""
+Process-wide settings: .env loading, deployment profiles and hot reload.
+
+Every lab used to probe for .env files and re-declare the model IDs and
+region at import. get_config() does that once per process and caches the
+result. Values are resolved in this order (later wins):
+
+1. DEFAULTS below.
+2. The deployment profile named by BEDROCK_PROFILE (built-in PROFILES,
+   or a JSON file of profiles named by BEDROCK_PROFILES_FILE).
+3. Environment overrides: BEDROCK_<SETTING>, e.g. BEDROCK_REGION or
+   BEDROCK_READ_TIMEOUT=60.
+
+The first .env file found is loaded into os.environ first, so it can set
+both credentials (AWS_BEARER_TOKEN_BEDROCK) and the variables above.
+Real environment variables always take precedence over .env entries.
+
+Usage:
+    from config import get_config
+
+    settings = get_config()
+    client = get_bedrock_client(settings.region)
+
+    # Long-running servers: re-read .env and profiles on `kill -HUP <pid>`
+    install_reload_handler()
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+
+SHARED_DIR = Path(__file__).resolve().parent
+
+DEFAULTS = {
+    "region": "ap-south-1",
+    "claude_sonnet": "global.anthropic.claude-sonnet-4-6",
+    "claude_haiku": "anthropic.claude-3-haiku-20240307-v1:0",
+    "llama": "meta.llama3-8b-instruct-v1:0",
+    "mistral": "mistral.ministral-3-3b-instruct",
+    # Client pool tuning (see bedrock_client.get_bedrock_client)
+    "max_pool_connections": 50,
+    "connect_timeout": 5,
+    "read_timeout": 120,
+    "max_attempts": 5,
+    "retry_mode": "adaptive",
+    "async_max_concurrency": 256,
+}
+
+# Built-in deployment profiles: overrides applied on top of DEFAULTS.
+PROFILES = {
+    "default": {},
+    # Interactive servers: fail fast and let the caller retry or fall back.
+    "server": {"max_pool_connections": 100, "read_timeout": 60, "max_attempts": 3},
+    # Offline batch jobs: fewer connections, patient retries.
+    "batch": {"max_pool_connections": 32, "read_timeout": 300, "max_attempts": 8},
+}
+
+ENV_PREFIX = "BEDROCK_"
+
+
+class Settings:
+    """An immutable snapshot of the resolved settings.
+
+    Settings are read as attributes (settings.region); as_dict() returns
+    a plain copy. profile is the profile name and env_file the .env file
+    that was loaded (or None).
+    """
+
+    __slots__ = ("_values", "profile", "env_file")
+
+    def __init__(self, values, profile="default", env_file=None):
+        object.__setattr__(self, "_values", dict(values))
+        object.__setattr__(self, "profile", profile)
+        object.__setattr__(self, "env_file", env_file)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"unknown setting '{name}'") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only; change the environment and reload()")
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def as_dict(self):
+        return dict(self._values)
+
+    def __eq__(self, other):
+        return isinstance(other, Settings) and self._values == other._values
+
+    def __hash__(self):
+        return hash(tuple(sorted(self._values.items())))
+
+    def __repr__(self):
+        return f"Settings(profile={self.profile!r}, {self._values!r})"
+
+
+# ---------------------------------------------------------------------------
+# .env loading
+# ---------------------------------------------------------------------------
+# Keys this module put into os.environ, so a reload can update them without
+# clobbering variables exported in the real environment.
+_dotenv_keys = {}
+
+
+def env_file_candidates():
+    """Where .env is looked for, in order; the first file that exists wins.
+
+    BEDROCK_ENV_FILE, the working directory, the running script's directory
+    and its parent (e.g. lab-02-first-agent/solution/ and lab-02-first-agent/),
+    then shared/.env.
+    """
+    candidates = []
+    if os.environ.get("BEDROCK_ENV_FILE"):
+        candidates.append(Path(os.environ["BEDROCK_ENV_FILE"]))
+    candidates.append(Path(".env"))
+    script = getattr(sys.modules.get("__main__"), "__file__", None)
+    if script:
+        script_dir = Path(script).resolve().parent
+        candidates += [script_dir / ".env", script_dir.parent / ".env"]
+    candidates.append(SHARED_DIR / ".env")
+    return candidates
+
+
+def parse_env_file(path):
+    """Parse KEY=VALUE lines; blank lines and # comments are skipped."""
+    values = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                values[key.strip()] = value.strip().strip("\"'")
+    return values
+
+
+def find_env_file():
+    """Return the first .env file in env_file_candidates(), or None."""
+    for candidate in env_file_candidates():
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _dotenv_changes(values):
+    """Work out how os.environ must change to match the .env values.
+
+    Variables set in the real environment are left alone. Keys loaded
+    earlier but missing from values are removed, unless the real
+    environment has since changed them.
+
+    Returns:
+        Tuple of (updates dict, list of keys to remove).
+    """
+    updates = {key: value for key, value in values.items()
+               if key not in os.environ or _dotenv_keys.get(key) == os.environ[key]}
+    removed = [key for key, value in _dotenv_keys.items()
+               if key not in values and os.environ.get(key) == value]
+    return updates, removed
+
+
+def _apply_dotenv(updates, removed):
+    for key in removed:
+        os.environ.pop(key, None)
+        del _dotenv_keys[key]
+    for key, value in updates.items():
+        os.environ[key] = value
+        _dotenv_keys[key] = value
+
+
+def load_env_file():
+    """Load the first .env file found into os.environ.
+
+    Variables already set in the real environment are left alone, and
+    keys an earlier load set but the file no longer has are unset.
+
+    Returns:
+        Path of the file loaded, or None.
+    """
+    env_file = find_env_file()
+    _apply_dotenv(*_dotenv_changes(parse_env_file(env_file) if env_file else {}))
+    return env_file
+
+
+# ---------------------------------------------------------------------------
+# Resolution
+# ---------------------------------------------------------------------------
+def _coerce(raw, default):
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def load_profiles(environ=None):
+    """Built-in PROFILES merged with the JSON file named by BEDROCK_PROFILES_FILE."""
+    environ = os.environ if environ is None else environ
+    profiles = {name: dict(values) for name, values in PROFILES.items()}
+    path = environ.get(ENV_PREFIX + "PROFILES_FILE")
+    if path:
+        with open(path) as f:
+            for name, values in json.load(f).items():
+                profiles.setdefault(name, {}).update(values)
+    return profiles
+
+
+def resolve(environ=None):
+    """Build Settings from DEFAULTS, the active profile and environ.
+
+    Raises:
+        ValueError: On an unknown profile, setting or unparseable value.
+    """
+    environ = os.environ if environ is None else environ
+    profile_name = environ.get(ENV_PREFIX + "PROFILE", "default")
+    profiles = load_profiles(environ)
+    if profile_name not in profiles:
+        raise ValueError(f"unknown BEDROCK_PROFILE '{profile_name}' "
+                         f"(choose from {', '.join(sorted(profiles))})")
+
+    values = dict(DEFAULTS)
+    for name, value in profiles[profile_name].items():
+        if name not in DEFAULTS:
+            raise ValueError(f"profile '{profile_name}' sets unknown setting '{name}'")
+        values[name] = value
+    for name, default in DEFAULTS.items():
+        raw = environ.get(ENV_PREFIX + name.upper())
+        if raw is None:
+            continue
+        try:
+            values[name] = _coerce(raw, default)
+        except ValueError:
+            raise ValueError(f"{ENV_PREFIX}{name.upper()}={raw!r} is not a valid "
+                             f"{type(default).__name__}") from None
+    return Settings(values, profile_name)
+
+
+# ---------------------------------------------------------------------------
+# Cached access and reload
+# ---------------------------------------------------------------------------
+_settings = None
+_lock = threading.Lock()
+_listeners = []
+
+
+def get_config():
+    """Return the process-wide Settings, loading them on first call."""
+    settings = _settings
+    if settings is None:
+        with _lock:
+            if _settings is None:
+                _load()
+            settings = _settings
+    return settings
+
+
+def _load():
+    global _settings
+    env_file = find_env_file()
+    updates, removed = _dotenv_changes(parse_env_file(env_file) if env_file else {})
+    environ = {key: value for key, value in os.environ.items() if key not in removed}
+    environ.update(updates)
+    # Validate against the would-be environment first, so a bad .env
+    # leaves both os.environ and the current settings untouched.
+    resolved = resolve(environ)
+    _apply_dotenv(updates, removed)
+    _settings = Settings(resolved.as_dict(), resolved.profile, env_file)
+    return _settings
+
+
+def reload():
+    """Re-read .env and the profiles, then notify on_reload() listeners.
+
+    If the new settings are invalid the old ones (and os.environ) stay in
+    place and the error is raised.
+
+    Returns:
+        The new Settings.
+    """
+    with _lock:
+        old = _settings
+        new = _load()  # raises before replacing _settings if invalid
+    if old is not None:
+        for listener in list(_listeners):
+            listener(old, new)
+    return new
+
+
+def on_reload(listener):
+    """Call listener(old_settings, new_settings) after every reload().
+
+    Returns listener, so this also works as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+_reload_requested = threading.Event()
+_reload_thread = None
+
+
+def _reload_worker():
+    while True:
+        _reload_requested.wait()
+        _reload_requested.clear()
+        try:
+            settings = reload()
+        except Exception as e:
+            print(f"[config] reload failed, keeping previous settings: {e}", file=sys.stderr)
+        else:
+            print(f"[config] reloaded (profile={settings.profile})", file=sys.stderr)
+
+
+def install_reload_handler(signum=None):
+    """Reload the settings when the process receives SIGHUP (or signum).
+
+    The reload runs on a background thread. Must be called from the main
+    thread. Does nothing on platforms without SIGHUP (Windows) unless
+    signum is given.
+
+    Returns:
+        True if the handler was installed.
+    """
+    global _reload_thread
+    signum = signum if signum is not None else getattr(signal, "SIGHUP", None)
+    if signum is None:
+        return False
+
+    def handle(received, frame):
+        # Signal handlers run on the main thread between bytecodes, possibly
+        # while it holds _lock, so reloading here could deadlock.
+        _reload_requested.set()
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:  # not the main thread
+        return False
+    if _reload_thread is None or not _reload_thread.is_alive():
+        _reload_thread = threading.Thread(target=_reload_worker, name="config-reload", daemon=True)
+        _reload_thread.start()
+    return True
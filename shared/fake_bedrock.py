@@ -0,0 +1,343 @@
+"""
+Offline stand-in for the Bedrock runtime, for tests and load benchmarks.
+
+FakeBedrockClient is a drop-in replacement for the boto3 bedrock-runtime
+client (converse and converse_stream). It replays scripted or rule-based
+responses, including tool_use turns, reports realistic usage/metrics, and
+can inject latency, throttling and errors. No AWS credentials or network
+access needed.
+
+Usage:
+    fake = FakeBedrockClient(rules=[
+        (r"weather", tool_use_response("get_weather", {"city": "London"})),
+    ], latency=HAIKU_LATENCY)
+    install(fake)        # every get_bedrock_client() now returns the fake
+
+Local HTTP endpoint (Converse only, no streaming):
+    serve(fake, port=8765)
+    export AWS_ENDPOINT_URL_BEDROCK_RUNTIME=http://127.0.0.1:8765
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from botocore.exceptions import ClientError
+
+import bedrock_client
+
+
+# ---------------------------------------------------------------------------
+# Response specs
+# ---------------------------------------------------------------------------
+def text_response(text, stop_reason="end_turn"):
+    """A plain assistant text turn."""
+    return {"text": text, "stop_reason": stop_reason}
+
+
+def tool_use_response(name, tool_input=None, text=None):
+    """An assistant turn that calls one tool (see tool_calls_response)."""
+    return tool_calls_response([(name, tool_input or {})], text=text)
+
+
+def tool_calls_response(calls, text=None):
+    """An assistant turn that calls several tools at once.
+
+    Args:
+        calls: List of (tool_name, input_dict) tuples.
+        text: Optional text block emitted before the tool calls.
+    """
+    return {"text": text, "tool_calls": [{"name": n, "input": i} for n, i in calls],
+            "stop_reason": "tool_use"}
+
+
+def last_user_text(request):
+    """Text of the most recent user text block in a Converse request."""
+    for message in reversed(request.get("messages", [])):
+        if message.get("role") != "user":
+            continue
+        for block in message.get("content", []):
+            if "text" in block:
+                return block["text"]
+    return ""
+
+
+def _answers_tool(request):
+    messages = request.get("messages", [])
+    if not messages:
+        return False
+    return any("toolResult" in block for block in messages[-1].get("content", []))
+
+
+def _default_responder(request):
+    """Finish tool loops by echoing results; otherwise echo the user text."""
+    if _answers_tool(request):
+        results = []
+        for block in request["messages"][-1]["content"]:
+            for part in block.get("toolResult", {}).get("content", []):
+                if "text" in part:
+                    results.append(part["text"])
+        return text_response("Based on the tools: " + " | ".join(results))
+    return text_response(f"[fake] {last_user_text(request)[:200]}")
+
+
+# ---------------------------------------------------------------------------
+# Latency models
+# ---------------------------------------------------------------------------
+class LatencyModel:
+    """Time-to-first-token plus per-output-token time, with lognormal jitter.
+
+    Args:
+        first_token_ms: Median time to first token.
+        per_token_ms: Median time per generated token.
+        sigma: Lognormal shape; 0 gives fixed latencies.
+    """
+
+    def __init__(self, first_token_ms=300.0, per_token_ms=10.0, sigma=0.25):
+        self.first_token_ms = first_token_ms
+        self.per_token_ms = per_token_ms
+        self.sigma = sigma
+
+    def _jitter(self, rng):
+        return rng.lognormvariate(0.0, self.sigma) if self.sigma else 1.0
+
+    def first_token(self, rng):
+        return self.first_token_ms * self._jitter(rng) / 1000.0
+
+    def per_token(self, rng):
+        return self.per_token_ms * self._jitter(rng) / 1000.0
+
+    def total(self, output_tokens, rng):
+        return self.first_token(rng) + output_tokens * self.per_token_ms / 1000.0
+
+
+NO_LATENCY = LatencyModel(0.0, 0.0, sigma=0.0)
+# Ballpark figures from lab 01's compare_models runs.
+HAIKU_LATENCY = LatencyModel(first_token_ms=350, per_token_ms=6, sigma=0.3)
+SONNET_LATENCY = LatencyModel(first_token_ms=1200, per_token_ms=18, sigma=0.35)
+
+
+# ---------------------------------------------------------------------------
+# Fake client
+# ---------------------------------------------------------------------------
+class FakeBedrockClient:
+    """Drop-in fake for boto3's bedrock-runtime client.
+
+    Responses are chosen in this order: the next entry of script (if any
+    remain), the first matching rule, then the default responder (which
+    answers a toolResult turn with end_turn so agent loops terminate).
+
+    Args:
+        script: List of response specs (or callables request -> spec) served
+            in order, one per call.
+        rules: List of (pattern, response) pairs. pattern is a regex searched
+            in the latest user text (skipped on toolResult turns), or a
+            callable request -> bool; response is a spec or a callable
+            request -> spec.
+        latency: A LatencyModel, or a dict of model ID -> LatencyModel.
+        throttle_rate: Probability that a call raises ThrottlingException.
+        error_rate: Probability that a call raises error_code.
+        error_code: botocore error code used for injected errors.
+        time_scale: Multiplier on all injected delays (0 disables sleeping).
+        seed: Seed for the random generator, for reproducible runs.
+    """
+
+    def __init__(self, script=None, rules=None, latency=NO_LATENCY, throttle_rate=0.0,
+                 error_rate=0.0, error_code="InternalServerException", time_scale=1.0,
+                 seed=None):
+        self.script = list(script or [])
+        self.rules = [(re.compile(p, re.I) if isinstance(p, str) else p, r)
+                      for p, r in (rules or [])]
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.time_scale = time_scale
+        self.requests = deque(maxlen=1000)  # most recent requests, for assertions
+        self.counters = {"calls": 0, "throttled": 0, "errors": 0, "streams": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    # -- boto3 surface -----------------------------------------------------
+
+    def converse(self, **request):
+        spec, latency, rng = self._begin(request, "Converse")
+        response = self._build_response(request, spec)
+        output_tokens = response["usage"]["outputTokens"]
+        delay = latency.total(output_tokens, rng)
+        self._sleep(delay)
+        response["metrics"] = {"latencyMs": int(delay * 1000)}
+        return response
+
+    def converse_stream(self, **request):
+        spec, latency, rng = self._begin(request, "ConverseStream")
+        with self._lock:
+            self.counters["streams"] += 1
+        response = self._build_response(request, spec)
+        return {"stream": self._stream_events(response, latency, rng)}
+
+    # -- internals -----------------------------------------------------------
+
+    def _begin(self, request, operation):
+        with self._lock:
+            self.requests.append(request)
+            self.counters["calls"] += 1
+            roll = self._rng.random()
+            rng = random.Random(self._rng.random())
+            if self.script:
+                spec = self.script.pop(0)
+            else:
+                spec = None
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(request.get("modelId"), NO_LATENCY)
+
+        if roll < self.throttle_rate:
+            with self._lock:
+                self.counters["throttled"] += 1
+            self._sleep(latency.first_token(rng) / 4)
+            raise ClientError({"Error": {"Code": "ThrottlingException",
+                                         "Message": "Too many requests, please wait."}}, operation)
+        if roll < self.throttle_rate + self.error_rate:
+            with self._lock:
+                self.counters["errors"] += 1
+            raise ClientError({"Error": {"Code": self.error_code,
+                                         "Message": "Injected fake error."}}, operation)
+
+        if spec is None:
+            spec = self._match_rule(request)
+        if callable(spec):
+            spec = spec(request)
+        return spec, latency, rng
+
+    def _match_rule(self, request):
+        text = last_user_text(request)
+        for pattern, response in self.rules:
+            if callable(pattern):
+                matched = pattern(request)
+            else:
+                matched = not _answers_tool(request) and pattern.search(text)
+            if matched:
+                return response
+        return _default_responder
+
+    def _build_response(self, request, spec):
+        content = []
+        if spec.get("text"):
+            content.append({"text": spec["text"]})
+        for call in spec.get("tool_calls", []):
+            content.append({"toolUse": {
+                "toolUseId": f"tooluse_{next(self._ids)}_{uuid.uuid4().hex[:8]}",
+                "name": call["name"],
+                "input": call.get("input", {}),
+            }})
+
+        input_tokens = sum(len(json.dumps(request.get(field, ""), default=str))
+                           for field in ("system", "messages", "toolConfig")) // 4
+        output_tokens = max(1, len(json.dumps(content)) // 4)
+        return {
+            "output": {"message": {"role": "assistant", "content": content}},
+            "stopReason": spec.get("stop_reason", "end_turn"),
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+        }
+
+    def _stream_events(self, response, latency, rng):
+        started = time.monotonic()
+        self._sleep(latency.first_token(rng))
+        yield {"messageStart": {"role": "assistant"}}
+        for index, block in enumerate(response["output"]["message"]["content"]):
+            if "text" in block:
+                for chunk in re.findall(r"\S+\s*|\s+", block["text"]):
+                    self._sleep(latency.per_token(rng))
+                    yield {"contentBlockDelta": {"contentBlockIndex": index,
+                                                 "delta": {"text": chunk}}}
+            else:
+                tool_use = block["toolUse"]
+                yield {"contentBlockStart": {"contentBlockIndex": index, "start": {
+                    "toolUse": {"toolUseId": tool_use["toolUseId"], "name": tool_use["name"]}}}}
+                raw = json.dumps(tool_use["input"])
+                for start in range(0, len(raw), 16):
+                    self._sleep(latency.per_token(rng))
+                    yield {"contentBlockDelta": {"contentBlockIndex": index,
+                                                 "delta": {"toolUse": {"input": raw[start:start + 16]}}}}
+            yield {"contentBlockStop": {"contentBlockIndex": index}}
+        yield {"messageStop": {"stopReason": response["stopReason"]}}
+        yield {"metadata": {"usage": response["usage"], "metrics": {
+            "latencyMs": int((time.monotonic() - started) * 1000)}}}
+
+    def _sleep(self, seconds):
+        if self.time_scale and seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+
+def install(fake):
+    """Make every get_bedrock_client() call in this process return fake."""
+    bedrock_client.set_client_override(fake)
+    return fake
+
+
+def uninstall():
+    bedrock_client.set_client_override(None)
+
+
+# ---------------------------------------------------------------------------
+# Local HTTP endpoint — speaks the Converse REST protocol for boto3
+# ---------------------------------------------------------------------------
+_CONVERSE_PATH = re.compile(r"^/model/(?P<model>[^/]+)/converse$")
+
+
+def serve(fake, host="127.0.0.1", port=8765, background=True):
+    """Expose a FakeBedrockClient as a local Converse HTTP endpoint.
+
+    Point boto3 at it with endpoint_url (or AWS_ENDPOINT_URL_BEDROCK_RUNTIME)
+    and any dummy credentials. Only the non-streaming Converse operation is
+    served.
+
+    Returns:
+        The ThreadingHTTPServer (call shutdown() to stop it).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            match = _CONVERSE_PATH.match(self.path.split("?", 1)[0])
+            if not match:
+                self._reply(404, {"message": f"Unsupported path {self.path}"}, "UnknownOperationException")
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            body["modelId"] = unquote(match.group("model"))
+            try:
+                self._reply(200, fake.converse(**body))
+            except ClientError as e:
+                error = e.response["Error"]
+                status = 429 if error["Code"] == "ThrottlingException" else 500
+                self._reply(status, {"message": error["Message"]}, error["Code"])
+
+        def _reply(self, status, payload, error_type=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if error_type:
+                self.send_header("x-amzn-ErrorType", error_type)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
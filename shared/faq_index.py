@@ -0,0 +1,413 @@
+"""
+BM25 retrieval over an FAQ corpus, with an inverted index persisted to disk.
+
+FAQIndex tokenizes each entry's question and answer into an inverted index
+(term -> {document: term frequency}) and ranks queries with Okapi BM25.
+A query touches only the postings of its own terms. Per-term BM25 weights
+are computed once and reused until the corpus changes, so lookups stay
+well under a millisecond for corpora of tens of thousands of entries.
+
+The index can be saved as JSON and loaded at start-up instead of
+re-tokenizing the corpus. load_faq_index() keeps a saved index in step with
+its source file, re-indexing only entries that were added, changed or
+removed.
+
+FAQShortCircuit answers clear FAQ matches with the stored answer and sends
+everything else to the usual agent, so canned answers cost no model calls.
+
+Usage:
+    index = load_faq_index("hackathon/data/faq_data.json", index_path=".faq_index.json")
+    for hit in index.search("when are you open on saturday", k=3):
+        print(hit["score"], hit["question"])
+
+    shortcut = FAQShortCircuit(index, fallback=run_agent, min_score=5.0)
+    answer, hit = shortcut.answer(message)    # hit is None when escalated
+    print(shortcut.stats())                   # direct rate, mean latency per path
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+
+INDEX_VERSION = 1
+
+STOP_WORDS = frozenset("""
+    a am an and are as at be been but by can could did do does for from had has
+    have how i if im in into is it its me my of on or our so than that the their
+    them then there these they this to us was we were what when where which who
+    why will with would you your
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word):
+    """Light suffix stripping so "accounts"/"account", "charges"/"charge" match."""
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lower-case, split on non-alphanumerics, drop stop words, stem."""
+    return [_stem(w) for w in _TOKEN.findall(text.lower().replace("'", ""))
+            if w not in STOP_WORDS]
+
+
+def _bm25_idf(n_docs, df):
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def entry_id(entry):
+    """An entry's "id", or a hash of its question when it has none."""
+    if "id" in entry:
+        return str(entry["id"])
+    return hashlib.sha1(entry["question"].encode("utf-8")).hexdigest()[:16]
+
+
+def entry_digest(entry):
+    canonical = json.dumps(entry, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class FAQIndex:
+    """Inverted index with BM25 ranking over FAQ entries.
+
+    Entries are dicts with "question" and "answer" (any other keys are
+    returned with the hit). Safe to search from many threads.
+
+    Args:
+        k1: BM25 term-frequency saturation.
+        b: BM25 document-length normalization.
+        question_weight: How many times question terms count relative to
+            answer terms.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, question_weight=2):
+        self.k1 = k1
+        self.b = b
+        self.question_weight = question_weight
+        self._docs = {}         # id -> entry
+        self._digests = {}      # id -> entry_digest(entry)
+        self._doc_len = {}      # id -> weighted length
+        self._postings = {}     # term -> {id: weighted tf}
+        self._total_len = 0
+        self._weights = {}      # term -> [(id, bm25 weight)], rebuilt lazily
+        self._idf = {}          # corpus term -> idf, rebuilt whenever the corpus changes
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return str(doc_id) in self._docs
+
+    def _terms(self, entry):
+        counts = {}
+        for term in tokenize(entry.get("question", "")):
+            counts[term] = counts.get(term, 0) + self.question_weight
+        for term in tokenize(entry.get("answer", "")):
+            counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def add(self, entries):
+        """Index entries, replacing any already indexed under the same id.
+
+        Returns:
+            Number of entries added or replaced.
+        """
+        changed = 0
+        with self._lock:
+            for entry in entries:
+                doc_id = entry_id(entry)
+                digest = entry_digest(entry)
+                if self._digests.get(doc_id) == digest:
+                    continue
+                if doc_id in self._docs:
+                    self._remove(doc_id)
+                terms = self._terms(entry)
+                self._docs[doc_id] = entry
+                self._digests[doc_id] = digest
+                length = sum(terms.values())
+                self._doc_len[doc_id] = length
+                self._total_len += length
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                changed += 1
+            if changed:
+                self._rebuild_idf()  # N and average length changed
+        return changed
+
+    def remove(self, doc_ids):
+        """Drop entries by id; returns how many were indexed."""
+        removed = 0
+        with self._lock:
+            for doc_id in doc_ids:
+                if str(doc_id) in self._docs:
+                    self._remove(str(doc_id))
+                    removed += 1
+            if removed:
+                self._rebuild_idf()
+        return removed
+
+    def _remove(self, doc_id):
+        # Re-tokenizing the stored entry yields exactly the terms it was indexed under.
+        for term in self._terms(self._docs[doc_id]):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+        del self._digests[doc_id]
+
+    def _rebuild_idf(self):
+        # Only corpus terms are stored, so the table is bounded by the
+        # vocabulary rather than by whatever terms queries bring in.
+        n_docs = len(self._docs)
+        self._weights = {}
+        self._idf = {term: _bm25_idf(n_docs, len(postings))
+                     for term, postings in self._postings.items()}
+
+    def idf(self, term):
+        """BM25 inverse document frequency; highest for terms the index lacks."""
+        idf = self._idf.get(term)
+        if idf is None:
+            idf = _bm25_idf(len(self._docs), 0)
+        return idf
+
+    def _term_weights(self, term):
+        weights = self._weights.get(term)
+        if weights is not None:
+            return weights
+        with self._lock:
+            postings = self._postings.get(term)
+            if not postings:
+                return ()
+            avg_len = self._total_len / len(self._docs)
+            idf = self.idf(term)
+            k1, b = self.k1, self.b
+            weights = [(doc_id, idf * tf * (k1 + 1)
+                        / (tf + k1 * (1 - b + b * self._doc_len[doc_id] / avg_len)))
+                       for doc_id, tf in postings.items()]
+            self._weights[term] = weights
+        return weights
+
+    def search(self, query, k=5):
+        """Return up to k best matches, highest score first.
+
+        Each hit is the stored entry plus "id", "score" (BM25, unbounded)
+        and "coverage": the IDF-weighted share of the query's terms that
+        occur in the entry, in [0, 1]. A high score with low coverage means
+        one rare word matched and the rest of the question did not. Entries
+        sharing no term with the query are never returned.
+        """
+        terms = set(tokenize(query))
+        scores = {}
+        for term in terms:
+            for doc_id, weight in self._term_weights(term):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+        total_idf = sum(self.idf(term) for term in terms)
+        hits = []
+        for doc_id, score in best:
+            entry = self._docs.get(doc_id)
+            if entry is None:
+                continue  # removed by another thread mid-query
+            matched = sum(self.idf(term) for term in terms if doc_id in self._postings.get(term, ()))
+            hits.append({**entry, "id": entry.get("id", doc_id), "score": score,
+                         "coverage": matched / total_idf if total_idf else 0.0})
+        return hits
+
+    # -----------------------------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------------------------
+    def save(self, path):
+        """Write the index as JSON (atomically, via a temporary file)."""
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "params": {"k1": self.k1, "b": self.b, "question_weight": self.question_weight},
+                "docs": self._docs,
+                "digests": self._digests,
+                "doc_len": self._doc_len,
+                # Parallel id/tf lists load several times faster than nested dicts.
+                "postings": {term: [list(postings), list(postings.values())]
+                             for term, postings in self._postings.items()},
+            }
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save(), without re-tokenizing any entry.
+
+        Raises:
+            ValueError: If the file was written by an incompatible version.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path}: index version {data.get('version')} != {INDEX_VERSION}")
+        index = cls(**data["params"])
+        index._docs = data["docs"]
+        index._digests = data["digests"]
+        index._doc_len = data["doc_len"]
+        index._total_len = sum(index._doc_len.values())
+        index._postings = {term: dict(zip(ids, tfs)) for term, (ids, tfs) in data["postings"].items()}
+        index._rebuild_idf()
+        return index
+
+    def sync(self, entries):
+        """Make the index match entries exactly, re-indexing only what changed.
+
+        Returns:
+            Tuple of (added or changed, removed) counts.
+        """
+        entries = list(entries)
+        current = {entry_id(e) for e in entries}
+        with self._lock:
+            removed = self.remove([doc_id for doc_id in list(self._docs) if doc_id not in current])
+            changed = self.add(entries)
+        return changed, removed
+
+
+def load_faq_index(faq_path, index_path=None, **params):
+    """Load the FAQ entries in faq_path (a JSON list) into an FAQIndex.
+
+    With index_path, a previously saved index is loaded and synced with
+    the current file: new and edited entries are indexed, deleted ones
+    dropped, and the index is saved again only if something changed. A
+    saved index built with different params is rebuilt.
+
+    Args:
+        faq_path: JSON file with a list of {"question", "answer", ...}.
+        index_path: Optional file to persist the index in.
+        **params: FAQIndex parameters (k1, b, question_weight).
+    """
+    with open(faq_path) as f:
+        entries = json.load(f)
+
+    index = None
+    if index_path and os.path.exists(index_path):
+        try:
+            index = FAQIndex.load(index_path)
+        except (ValueError, KeyError, json.JSONDecodeError):
+            index = None  # stale or corrupt: rebuild below
+    rebuilt = index is None or any(getattr(index, name) != value for name, value in params.items())
+    if rebuilt:
+        index = FAQIndex(**params)
+
+    changed, removed = index.sync(entries)
+    if index_path and (rebuilt or changed or removed):
+        index.save(index_path)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Direct answers
+# ---------------------------------------------------------------------------
+PATH_DIRECT = "direct"
+PATH_ESCALATED = "escalated"
+
+
+class FAQShortCircuit:
+    """Return the stored FAQ answer when retrieval is unambiguous, else escalate.
+
+    A message is answered directly only if its best match clears every
+    check: BM25 score, query coverage, a clear lead over the runner-up and
+    the optional guard. The defaults are deliberately strict; a wrong
+    canned answer is worse than a slower right one.
+
+    Args:
+        index: An FAQIndex.
+        fallback: Callable text -> answer for everything not answered directly.
+        min_score: Minimum BM25 score of the best match.
+        min_coverage: Minimum share of the query (IDF-weighted) the best
+            match must contain.
+        max_runner_up: The second match must score at most this fraction
+            of the best, so near-ties between entries escalate.
+        guard: Optional callable (text, hit) -> bool, e.g. an intent check.
+        rephrase: Optional callable (text, hit) -> answer, e.g. a cheap
+            model adapting the stored answer to the question.
+    """
+
+    def __init__(self, index, fallback, min_score=5.0, min_coverage=0.5, max_runner_up=0.7,
+                 guard=None, rephrase=None):
+        self.index = index
+        self.fallback = fallback
+        self.min_score = min_score
+        self.min_coverage = min_coverage
+        self.max_runner_up = max_runner_up
+        self.guard = guard
+        self.rephrase = rephrase
+        self._lock = threading.Lock()
+        self._counts = {PATH_DIRECT: 0, PATH_ESCALATED: 0}
+        self._seconds = {PATH_DIRECT: 0.0, PATH_ESCALATED: 0.0}
+
+    def match(self, text):
+        """The FAQ entry to answer text with directly, or None."""
+        hits = self.index.search(text, k=2)
+        if not hits:
+            return None
+        best = hits[0]
+        if best["score"] < self.min_score or best["coverage"] < self.min_coverage:
+            return None
+        if len(hits) > 1 and hits[1]["score"] > self.max_runner_up * best["score"]:
+            return None
+        if self.guard is not None and not self.guard(text, best):
+            return None
+        return best
+
+    def answer(self, text, **fallback_kwargs):
+        """Return (answer, hit); hit is None if the fallback answered.
+
+        fallback_kwargs are passed on to fallback(text, ...), e.g. the
+        conversation's state.
+        """
+        start = time.perf_counter()
+        hit = self.match(text)
+        if hit is None:
+            answer = self.fallback(text, **fallback_kwargs)
+            self._record(PATH_ESCALATED, start)
+            return answer, None
+
+        answer = self.rephrase(text, hit) if self.rephrase is not None else hit["answer"]
+        self._record(PATH_DIRECT, start)
+        return answer, hit
+
+    def _record(self, path, start):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._counts[path] += 1
+            self._seconds[path] += elapsed
+
+    def stats(self):
+        """Calls per path, direct rate and mean latency per path."""
+        with self._lock:
+            counts = dict(self._counts)
+            seconds = dict(self._seconds)
+        calls = sum(counts.values())
+        direct, escalated = counts[PATH_DIRECT], counts[PATH_ESCALATED]
+        return {
+            "calls": calls,
+            "direct": direct,
+            "escalated": escalated,
+            "direct_rate": direct / calls if calls else 0.0,
+            "direct_mean_ms": seconds[PATH_DIRECT] / direct * 1000 if direct else 0.0,
+            "escalated_mean_ms": seconds[PATH_ESCALATED] / escalated * 1000 if escalated else 0.0,
+        }
@@ -0,0 +1,188 @@
+"""
+Local fast-path text classifier, used ahead of an LLM classifier.
+
+Most receptionist messages ("What are your opening hours?") are easy to
+classify. A FastPathClassifier answers those in well under a millisecond
+with a small local model, and only calls the LLM classifier when the local
+model is not confident.
+
+The local model is nearest-centroid over hashed, TF-IDF-weighted features:
+word unigrams and bigrams plus character trigrams, which tolerate typos.
+Features are hashed with crc32 into a fixed-size space, so no vocabulary
+is stored and results are the same in every process.
+
+Usage:
+    model = LocalIntentClassifier().fit([
+        ("What are your opening hours?", "faq"),
+        ("What's my balance?", "account_query"),
+        ...
+    ])
+    classifier = FastPathClassifier(model, fallback=classify_with_llm, threshold=0.8)
+    result = classifier.classify("whats my balance")   # {"intent", "confidence", "entities", "tier"}
+    print(classifier.stats())                          # fallback rate, per-tier counts and latency
+"""
+
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+TIER_LOCAL = "local"
+TIER_FALLBACK = "llm"
+
+
+def tokenize(text):
+    """Lower-case word tokens; apostrophes are dropped ("what's" -> "whats")."""
+    return _TOKEN.findall(text.lower().replace("'", ""))
+
+
+def extract_features(text):
+    """Feature strings for text: words, word bigrams and character trigrams."""
+    words = tokenize(text)
+    features = ["w:" + w for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += ["c:" + padded[i:i + 3] for i in range(len(padded) - 2)]
+    return features
+
+
+class LocalIntentClassifier:
+    """Nearest-centroid classifier over hashed TF-IDF n-gram features.
+
+    Args:
+        n_features: Size of the hashed feature space.
+        temperature: Softmax temperature applied to the cosine scores when
+            computing confidence; lower is more decisive.
+    """
+
+    def __init__(self, n_features=2 ** 18, temperature=0.05):
+        self.n_features = n_features
+        self.temperature = temperature
+        self.labels = []
+        self._idf = {}
+        self._default_idf = 1.0
+        self._centroids = {}
+
+    def _hash(self, features):
+        return Counter(zlib.crc32(f.encode("utf-8")) % self.n_features for f in features)
+
+    def _vector(self, text):
+        vector = {}
+        for index, count in self._hash(extract_features(text)).items():
+            vector[index] = (1.0 + math.log(count)) * self._idf.get(index, self._default_idf)
+        return _normalized(vector)
+
+    def fit(self, examples):
+        """Train on (text, label) pairs, replacing any previous training.
+
+        Returns:
+            self.
+        """
+        examples = list(examples)
+        if not examples:
+            raise ValueError("need at least one labelled example")
+        hashed = [(self._hash(extract_features(text)), label) for text, label in examples]
+
+        document_freq = Counter()
+        for counts, _ in hashed:
+            document_freq.update(counts.keys())
+        n_docs = len(hashed)
+        self._idf = {i: math.log((1 + n_docs) / (1 + df)) + 1.0 for i, df in document_freq.items()}
+        self._default_idf = math.log(1 + n_docs) + 1.0
+
+        sums = {}
+        for counts, label in hashed:
+            vector = _normalized({i: (1.0 + math.log(c)) * self._idf[i] for i, c in counts.items()})
+            total = sums.setdefault(label, {})
+            for index, weight in vector.items():
+                total[index] = total.get(index, 0.0) + weight
+        self._centroids = {label: _normalized(total) for label, total in sums.items()}
+        self.labels = sorted(self._centroids)
+        return self
+
+    def scores(self, text):
+        """Cosine similarity of text to each label's centroid."""
+        vector = self._vector(text)
+        return {label: sum(weight * centroid.get(index, 0.0) for index, weight in vector.items())
+                for label, centroid in self._centroids.items()}
+
+    def predict(self, text):
+        """Return (label, confidence) with confidence in [0, 1]."""
+        if not self._centroids:
+            raise RuntimeError("classifier has not been fitted")
+        scores = self.scores(text)
+        best = max(scores, key=scores.get)
+        if scores[best] <= 0.0:
+            return best, 0.0  # nothing in common with any training example
+        top = scores[best]
+        total = sum(math.exp((s - top) / self.temperature) for s in scores.values())
+        return best, 1.0 / total
+
+
+def _normalized(vector):
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if not norm:
+        return vector
+    return {i: w / norm for i, w in vector.items()}
+
+
+class FastPathClassifier:
+    """Local model first, LLM fallback below a confidence threshold.
+
+    Results are dicts shaped like the LLM classifier's ({"intent",
+    "confidence", "entities"}) plus "tier": "local" or "llm". The local
+    tier does not extract entities.
+
+    Args:
+        model: A fitted LocalIntentClassifier.
+        fallback: Callable text -> classification dict (the LLM classifier).
+        threshold: Minimum local confidence to skip the fallback.
+    """
+
+    def __init__(self, model, fallback, threshold=0.8):
+        self.model = model
+        self.fallback = fallback
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counts = {TIER_LOCAL: 0, TIER_FALLBACK: 0}
+        self._seconds = {TIER_LOCAL: 0.0, TIER_FALLBACK: 0.0}
+
+    def classify(self, text, prediction=None):
+        """Classify text; prediction is model.predict(text) if already computed."""
+        start = time.perf_counter()
+        intent, confidence = prediction if prediction is not None else self.model.predict(text)
+        if confidence >= self.threshold:
+            self._record(TIER_LOCAL, start)
+            return {"intent": intent, "confidence": confidence, "entities": {}, "tier": TIER_LOCAL}
+
+        result = dict(self.fallback(text))
+        result["tier"] = TIER_FALLBACK
+        self._record(TIER_FALLBACK, start)
+        return result
+
+    def _record(self, tier, start):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._counts[tier] += 1
+            self._seconds[tier] += elapsed
+
+    def stats(self):
+        """Calls per tier, fallback rate and mean latency per tier."""
+        with self._lock:
+            counts = dict(self._counts)
+            seconds = dict(self._seconds)
+        calls = sum(counts.values())
+        return {
+            "calls": calls,
+            "local": counts[TIER_LOCAL],
+            "fallback": counts[TIER_FALLBACK],
+            "fallback_rate": counts[TIER_FALLBACK] / calls if calls else 0.0,
+            "local_mean_ms": seconds[TIER_LOCAL] / counts[TIER_LOCAL] * 1000 if counts[TIER_LOCAL] else 0.0,
+            "fallback_mean_ms": (seconds[TIER_FALLBACK] / counts[TIER_FALLBACK] * 1000
+                                 if counts[TIER_FALLBACK] else 0.0),
+        }
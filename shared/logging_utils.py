@@ -1,10 +1,30 @@
 """
 Agent execution trace logging utilities.
-Provides pretty-printing of tool calls, LLM interactions, and timing.
+Provides pretty-printing of tool calls, LLM interactions, and timing, plus
+a low-overhead span tracer that records nested LLM/tool/agent steps.
+
+Usage:
+    with span("run_pipeline", kind="stage"):
+        ...                       # bedrock_client calls nest automatically
+    print_agent_trace()           # pretty-print the most recent trace
+    get_tracer().export_chrome_trace("trace.json")   # open in Perfetto
+
+Persistent traces (background writer, gzip JSONL with rotation):
+    install_trace_sink(JsonlTraceSink("traces/"))
 """
 
-import time
+import atexit
+import contextvars
+import gzip
+import inspect
+import itertools
 import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
 
 
 def log_tool_call(tool_name, tool_input, tool_output, duration_ms=None):
@@ -16,6 +36,11 @@ def log_tool_call(tool_name, tool_input, tool_output, duration_ms=None):
         tool_output: The tool's return value (string or dict).
         duration_ms: Optional execution time in milliseconds.
     """
+    if _trace_sink is not None:
+        _trace_sink.emit({"type": "tool", "timestamp": time.time(), "tool_name": tool_name,
+                          "input": tool_input, "output": tool_output, "duration_ms": duration_ms})
+        if not _echo:
+            return
     duration_str = f" ({duration_ms:.0f}ms)" if duration_ms else ""
     print(f"  [TOOL] {tool_name}{duration_str}")
     print(f"    Input:  {json.dumps(tool_input, indent=2)[:200]}")
@@ -32,6 +57,12 @@ def log_llm_call(model_id, input_tokens=None, output_tokens=None, latency_ms=Non
         output_tokens: Number of output tokens (if available).
         latency_ms: Response latency in milliseconds.
     """
+    if _trace_sink is not None:
+        _trace_sink.emit({"type": "llm", "timestamp": time.time(), "model_id": model_id,
+                          "input_tokens": input_tokens, "output_tokens": output_tokens,
+                          "duration_ms": latency_ms})
+        if not _echo:
+            return
     parts = [f"[LLM] {model_id}"]
     if input_tokens is not None:
         parts.append(f"in={input_tokens}")
@@ -42,7 +73,32 @@ def log_llm_call(model_id, input_tokens=None, output_tokens=None, latency_ms=Non
     print(f"  {' | '.join(parts)}")
 
 
-def print_agent_trace(steps):
+def log_call_record(record):
+    """Print one call captured by metrics.UsageCollector.
+
+    Args:
+        record: A record dict from get_collector().records().
+    """
+    log_llm_call(
+        record["model_id"],
+        record["input_tokens"],
+        record["output_tokens"],
+        record["client_latency_ms"],
+    )
+    extras = []
+    if record.get("cache_read_tokens"):
+        extras.append(f"cache_read={record['cache_read_tokens']}")
+    if record.get("server_latency_ms") is not None:
+        extras.append(f"server={record['server_latency_ms']:.0f}ms")
+    if record.get("retries"):
+        extras.append(f"retries={record['retries']}")
+    if record.get("cached"):
+        extras.append("response-cache hit")
+    if extras:
+        print(f"    {' | '.join(extras)}")
+
+
+def print_agent_trace(steps=None):
     """Pretty-print a full agent execution trace.
 
     Args:
@@ -51,7 +107,10 @@ def print_agent_trace(steps):
             - model_id / tool_name
             - input / output
             - duration_ms
+            If omitted, the steps of the tracer's most recent trace are used.
     """
+    if steps is None:
+        steps = spans_to_steps(get_tracer().last_trace())
     print("\n" + "=" * 60)
     print("AGENT EXECUTION TRACE")
     print("=" * 60)
@@ -79,8 +138,417 @@ def print_agent_trace(steps):
                 step.get("output", ""),
                 step.get("duration_ms"),
             )
+            if step.get("cached"):
+                print("    (served from tool cache)")
 
     print("\n" + "=" * 60)
+    saved = sum(1 for s in steps if s.get("cached"))
+    if saved:
+        print(f"Tool calls served from cache: {saved}")
     total_ms = sum(s.get("duration_ms", 0) for s in steps if s.get("duration_ms"))
     print(f"Total steps: {len(steps)} | Total time: {total_ms:.0f}ms")
     print("=" * 60)
+
+
+# ---------------------------------------------------------------------------
+# Span tracer
+# ---------------------------------------------------------------------------
+class Span:
+    """One timed step. Times are perf_counter_ns() values."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id",
+                 "start_ns", "end_ns", "thread_id", "attrs")
+
+    def __init__(self, name, kind, trace_id, span_id, parent_id, start_ns, attrs):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.thread_id = threading.get_ident()
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Add attributes (tokens, result sizes, ...) to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self):
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "name": self.name, "kind": self.kind, "trace_id": self.trace_id,
+            "span_id": self.span_id, "parent_id": self.parent_id,
+            "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms, "thread_id": self.thread_id,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Records nested spans into a bounded ring buffer.
+
+    Nesting follows context variables, so spans opened in worker threads
+    started with a copied context, or in asyncio tasks, attach to the
+    right parent.
+
+    Args:
+        capacity: Finished spans kept; the oldest are overwritten.
+    """
+
+    def __init__(self, capacity=10_000):
+        self.enabled = True
+        self._spans = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._sinks = ()
+
+    def add_sink(self, sink):
+        """Also hand every finished span to sink.emit(span)."""
+        self._sinks = self._sinks + (sink,)
+
+    def remove_sink(self, sink):
+        self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    @contextmanager
+    def span(self, name, kind="internal", **attrs):
+        """Time the enclosed block as a child of the current span."""
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        parent = _current_span.get()
+        span_id = next(self._ids)
+        current = Span(name, kind,
+                       parent.trace_id if parent is not None else span_id,
+                       span_id,
+                       parent.span_id if parent is not None else None,
+                       time.perf_counter_ns(), attrs)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            current.end_ns = time.perf_counter_ns()
+            _current_span.reset(token)
+            self._spans.append(current)
+            for sink in self._sinks:
+                sink.emit(current)
+
+    def spans(self):
+        return list(self._spans)
+
+    def last_trace(self):
+        """Spans of the most recently finished root span, in start order."""
+        spans = self.spans()
+        for candidate in reversed(spans):
+            if candidate.parent_id is None:
+                trace = [s for s in spans if s.trace_id == candidate.trace_id]
+                return sorted(trace, key=lambda s: s.start_ns)
+        return []
+
+    def clear(self):
+        self._spans.clear()
+
+    def export_jsonl(self, path):
+        """Write finished spans as JSON Lines; returns the count."""
+        spans = self.spans()
+        with open(path, "w") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+        return len(spans)
+
+    def export_chrome_trace(self, path):
+        """Write Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [{
+            "name": s.name, "cat": s.kind, "ph": "X", "pid": pid, "tid": s.thread_id,
+            "ts": s.start_ns / 1000, "dur": (s.end_ns - s.start_ns) / 1000,
+            "args": {"span_id": s.span_id, "parent_id": s.parent_id, **s.attrs},
+        } for s in self.spans()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return len(events)
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    """The process-wide tracer used by bedrock_client and the labs."""
+    return _tracer
+
+
+def span(name, kind="internal", **attrs):
+    """Shortcut for get_tracer().span(...)."""
+    return _tracer.span(name, kind, **attrs)
+
+
+def traced(name=None, kind="internal"):
+    """Decorator form of span(); the span is named after the function by default.
+
+    Works on plain functions and coroutine functions.
+    """
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def spans_to_steps(spans):
+    """Convert llm/tool spans into the step dicts print_agent_trace() expects."""
+    steps = []
+    for s in spans:
+        if s.kind == "llm":
+            steps.append({"type": "llm", "model_id": s.attrs.get("model_id", s.name),
+                          "input_tokens": s.attrs.get("input_tokens"),
+                          "output_tokens": s.attrs.get("output_tokens"),
+                          "duration_ms": s.duration_ms})
+        elif s.kind == "tool":
+            steps.append({"type": "tool", "tool_name": s.name,
+                          "input": s.attrs.get("input", {}),
+                          "output": s.attrs.get("output", ""),
+                          "duration_ms": s.duration_ms,
+                          "cached": s.attrs.get("cached", False)})
+    return steps
+
+
+# ---------------------------------------------------------------------------
+# Background JSONL sink
+# ---------------------------------------------------------------------------
+class JsonlTraceSink:
+    """Writes trace records to rotating (optionally gzipped) JSONL files.
+
+    emit() only appends to an in-memory queue and never blocks: when the
+    queue is full the record is dropped and counted. A daemon thread
+    serializes records in batches, so spans are converted to dicts off the
+    agent's thread.
+
+    Files are named <prefix>-<YYYYmmdd-HHMMSS>-<n>.jsonl[.gz] and rotate
+    when they reach max_bytes (on disk, i.e. compressed) or are older than
+    rotate_seconds. The stream is flushed on rotation, on close and every
+    sync_interval seconds rather than after each batch: a gzip flush ends
+    the current deflate block, so flushing often costs compression ratio.
+    A crash loses at most sync_interval seconds of records.
+
+    Args:
+        directory: Where trace files are written (created if missing).
+        prefix: File name prefix.
+        compress: Write gzip-compressed files.
+        max_queue: Records buffered before emit() starts dropping.
+        batch_size: Records per write; a full batch wakes the writer early.
+        flush_interval: Seconds between writes when traffic is light.
+        max_bytes: Size at which the current file is rotated.
+        rotate_seconds: Age at which the current file is rotated (None = never).
+        max_files: Oldest files beyond this many are deleted (None = keep all).
+        sync_interval: Seconds between flushes of the open file to disk.
+    """
+
+    def __init__(self, directory, prefix="trace", compress=True, max_queue=100_000,
+                 batch_size=500, flush_interval=1.0, max_bytes=64 * 1024 * 1024,
+                 rotate_seconds=3600, max_files=None, sync_interval=5.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.compress = compress
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.max_files = max_files
+        self.sync_interval = sync_interval
+        self.counters = {"emitted": 0, "dropped": 0, "written": 0, "batches": 0,
+                         "files": 0, "write_errors": 0}
+        # deque.append/popleft are atomic, so producers never take a lock.
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._file_seq = itertools.count(1)
+        self._raw = None
+        self._out = None
+        self._opened_at = 0.0
+        self._synced_at = 0.0
+        self._unsynced = False
+        self.path = None
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="trace-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, record):
+        """Queue a record (dict or Span). Returns False if it was dropped."""
+        queue = self._queue
+        if len(queue) >= self.max_queue or self._stop.is_set():
+            self.counters["dropped"] += 1
+            return False
+        queue.append(record)
+        self.counters["emitted"] += 1
+        if len(queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.005)
+        return not self._queue
+
+    def close(self):
+        """Drain the queue, close the current file and stop the writer."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self):
+        return {**self.counters, "queued": len(self._queue), "path": self.path}
+
+    # -- writer thread -------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        self._close_file()
+
+    def _drain(self):
+        queue = self._queue
+        while queue:
+            batch = []
+            while queue and len(batch) < self.batch_size:
+                batch.append(queue.popleft())
+            self._write_batch(batch)
+        if self._out is not None and self._should_rotate():
+            self._close_file()
+        elif self._unsynced and time.monotonic() - self._synced_at >= self.sync_interval:
+            self._sync()
+
+    def _write_batch(self, batch):
+        lines = []
+        for record in batch:
+            if isinstance(record, Span):
+                record = record.to_dict()
+            lines.append(json.dumps(record, default=str))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            if self._out is None or self._should_rotate():
+                self._open_file()
+            self._out.write(data)
+        except OSError:
+            self.counters["write_errors"] += 1
+            self.counters["dropped"] += len(batch)
+            return
+        self._unsynced = True
+        self.counters["written"] += len(batch)
+        self.counters["batches"] += 1
+
+    def _sync(self):
+        try:
+            self._out.flush()
+        except OSError:
+            self.counters["write_errors"] += 1
+        self._synced_at = time.monotonic()
+        self._unsynced = False
+
+    def _should_rotate(self):
+        if self._raw.tell() >= self.max_bytes:
+            return True
+        return (self.rotate_seconds is not None
+                and time.monotonic() - self._opened_at >= self.rotate_seconds)
+
+    def _open_file(self):
+        self._close_file()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        self.path = os.path.join(self.directory,
+                                 f"{self.prefix}-{stamp}-{next(self._file_seq)}{suffix}")
+        self._raw = open(self.path, "wb")
+        self._out = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+        self._opened_at = self._synced_at = time.monotonic()
+        self.counters["files"] += 1
+        self._prune()
+
+    def _close_file(self):
+        if self._out is None:
+            return
+        self._out.close()
+        if self._out is not self._raw:
+            self._raw.close()
+        self._out = self._raw = None
+        self._unsynced = False
+
+    def _prune(self):
+        if not self.max_files:
+            return
+        names = sorted(
+            (n for n in os.listdir(self.directory)
+             if n.startswith(self.prefix + "-") and ".jsonl" in n),
+            key=lambda n: os.path.getmtime(os.path.join(self.directory, n)),
+        )
+        for name in names[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+_trace_sink = None
+_echo = True
+
+
+def install_trace_sink(sink, echo=False, spans=True):
+    """Route log_tool_call/log_llm_call (and finished spans) to sink.
+
+    Args:
+        sink: A JsonlTraceSink (or anything with emit(record)).
+        echo: Keep printing log_* entries to stdout as well.
+        spans: Also forward every finished tracer span.
+    """
+    global _trace_sink, _echo
+    uninstall_trace_sink()
+    _trace_sink = sink
+    _echo = echo
+    if spans:
+        _tracer.add_sink(sink)
+    return sink
+
+
+def uninstall_trace_sink():
+    """Detach the installed sink (it is not closed) and resume printing."""
+    global _trace_sink, _echo
+    if _trace_sink is not None:
+        _tracer.remove_sink(_trace_sink)
+    _trace_sink = None
+    _echo = True
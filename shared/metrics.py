@@ -0,0 +1,192 @@
+"""
+In-process collector for per-call Bedrock usage and latency.
+
+Every call made through bedrock_client is recorded here: model ID, token
+counts (including prompt-cache reads/writes), server latency, client
+latency and retries. Calls are tagged with whatever labels are active
+(agent, intent, session, ...) so spend and latency can be attributed.
+
+Usage:
+    with labels(agent="Researcher", session=session_id):
+        converse_with_tools(...)
+
+    collector = get_collector()
+    print(collector.summary(group_by=("agent",)))
+    collector.export_jsonl("calls.jsonl")
+"""
+
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+RECORD_FIELDS = (
+    "timestamp", "model_id", "operation", "input_tokens", "output_tokens",
+    "cache_read_tokens", "cache_write_tokens", "server_latency_ms",
+    "client_latency_ms", "retries", "cached", "error", "labels",
+)
+
+_current_labels = contextvars.ContextVar("bedrock_labels", default={})
+_current_captures = contextvars.ContextVar("bedrock_captures", default=())
+
+
+@contextmanager
+def labels(**values):
+    """Attach labels (e.g. agent=, intent=, session=) to calls in this block.
+
+    Nested blocks add to, and may override, the outer labels.
+    """
+    token = _current_labels.set({**_current_labels.get(), **values})
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+def current_labels():
+    return _current_labels.get()
+
+
+@contextmanager
+def capture(records=None):
+    """Also append the records of calls made in this block to a list.
+
+    Threads that run a copy of this context (parallel tools, speculation)
+    are captured too. Reading the list is O(calls in the block), unlike
+    filtering the whole collector.
+
+    Args:
+        records: List to append to (a new one by default).
+
+    Yields:
+        The list.
+    """
+    records = [] if records is None else records
+    token = _current_captures.set(_current_captures.get() + (records,))
+    try:
+        yield records
+    finally:
+        _current_captures.reset(token)
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class UsageCollector:
+    """Bounded, thread-safe store of per-call records.
+
+    Recording is a dict build plus a deque append, so it is cheap enough
+    to leave on for every call.
+
+    Args:
+        max_records: Oldest records are dropped beyond this many.
+    """
+
+    def __init__(self, max_records=100_000):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def record(self, model_id, operation="Converse", usage=None, server_latency_ms=None,
+               client_latency_ms=None, retries=0, cached=False, error=None):
+        if not self.enabled:
+            return None
+        usage = usage or {}
+        record = {
+            "timestamp": time.time(),
+            "model_id": model_id,
+            "operation": operation,
+            "input_tokens": usage.get("inputTokens", 0),
+            "output_tokens": usage.get("outputTokens", 0),
+            "cache_read_tokens": usage.get("cacheReadInputTokens", 0),
+            "cache_write_tokens": usage.get("cacheWriteInputTokens", 0),
+            "server_latency_ms": server_latency_ms,
+            "client_latency_ms": client_latency_ms,
+            "retries": retries,
+            "cached": cached,
+            "error": error,
+            "labels": current_labels(),
+        }
+        self._records.append(record)
+        for captured in _current_captures.get():
+            captured.append(record)
+        return record
+
+    def records(self, **filters):
+        """Return records matching every filter.
+
+        Filters match record fields first, then labels, e.g.
+        records(model_id=CLAUDE_HAIKU, agent="Researcher").
+        """
+        with self._lock:
+            snapshot = list(self._records)
+        if not filters:
+            return snapshot
+        return [r for r in snapshot
+                if all(r.get(k, r["labels"].get(k)) == v for k, v in filters.items())]
+
+    def summary(self, group_by=("model_id",), **filters):
+        """Aggregate tokens and latency percentiles per group.
+
+        Args:
+            group_by: Record fields and/or label names to group on.
+            **filters: Same as records().
+
+        Returns:
+            Dict of group tuple -> aggregate dict.
+        """
+        groups = {}
+        for r in self.records(**filters):
+            key = tuple(r.get(g, r["labels"].get(g)) for g in group_by)
+            groups.setdefault(key, []).append(r)
+
+        summary = {}
+        for key, rows in groups.items():
+            client = sorted(r["client_latency_ms"] for r in rows if r["client_latency_ms"] is not None)
+            server = sorted(r["server_latency_ms"] for r in rows if r["server_latency_ms"] is not None)
+            summary[key] = {
+                "calls": len(rows),
+                "errors": sum(1 for r in rows if r["error"]),
+                "cached": sum(1 for r in rows if r["cached"]),
+                "retries": sum(r["retries"] for r in rows),
+                "input_tokens": sum(r["input_tokens"] for r in rows),
+                "output_tokens": sum(r["output_tokens"] for r in rows),
+                "cache_read_tokens": sum(r["cache_read_tokens"] for r in rows),
+                "cache_write_tokens": sum(r["cache_write_tokens"] for r in rows),
+                "client_p50_ms": _percentile(client, 50),
+                "client_p95_ms": _percentile(client, 95),
+                "server_p50_ms": _percentile(server, 50),
+                "server_p95_ms": _percentile(server, 95),
+            }
+        return summary
+
+    def export_jsonl(self, path, **filters):
+        """Write matching records to a JSON Lines file; returns the count."""
+        rows = self.records(**filters)
+        with open(path, "w") as f:
+            for r in rows:
+                f.write(json.dumps(r, default=str) + "\n")
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
+
+
+_collector = UsageCollector()
+
+
+def get_collector():
+    """The process-wide collector used by bedrock_client."""
+    return _collector
@@ -0,0 +1,287 @@
+"""
+Process-wide rate limiting and throttling-aware retries for Bedrock calls.
+
+One RateLimiter is shared by every caller in the process. Per model ID it
+keeps token buckets for requests/minute and tokens/minute, queues callers
+by priority (interactive traffic goes before batch traffic), and when
+Bedrock throttles, pauses that model for everyone with exponential backoff
+plus jitter instead of letting each caller retry on its own.
+
+Usage:
+    limiter = RateLimiter(limits={CLAUDE_SONNET: {"requests_per_minute": 50,
+                                                  "tokens_per_minute": 200_000}})
+    set_rate_limiter(limiter)            # from bedrock_client
+
+    with priority(PRIORITY_INTERACTIVE):
+        converse(client, CLAUDE_SONNET, messages)
+
+    print(limiter.stats())
+"""
+
+import contextvars
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Lower value = served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BATCH = 10
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BATCH: "batch",
+}
+
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+_current_priority = contextvars.ContextVar("bedrock_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def priority(level):
+    """Run the enclosed Bedrock calls in the given priority lane."""
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority():
+    return _current_priority.get()
+
+
+def is_throttle_error(exc):
+    """True if exc is a botocore ClientError signalling throttling/overload."""
+    response = getattr(exc, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+
+
+def estimate_request_tokens(request):
+    """Cheap input-token estimate for a Converse request (about 4 chars/token)."""
+    size = 0
+    for field in ("system", "messages", "toolConfig"):
+        if field in request:
+            size += len(json.dumps(request[field], default=str))
+    return size // 4
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at per_minute / 60 per second."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount tokens are available (0 if available now)."""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount):
+        # May go negative: a large request borrows against future refills.
+        self.tokens -= amount
+
+
+class _ModelState:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.cond = threading.Condition()
+        self.queue = []  # heap of (priority, seq)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.blocked_until = 0.0
+
+    def delay(self, estimated_tokens, now):
+        delay = self.blocked_until - now
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(estimated_tokens, now))
+        return delay
+
+
+class RateLimiter:
+    """Shared per-model token-bucket limiter with priority lanes and backoff.
+
+    Args:
+        limits: Dict of model ID -> {"requests_per_minute": n,
+            "tokens_per_minute": n}. Either key may be omitted or None.
+        default_limits: Limits for model IDs not listed in limits.
+        max_retries: Retries after a throttling error before giving up.
+        base_delay: First backoff step in seconds.
+        max_delay: Cap on a single backoff step in seconds.
+    """
+
+    def __init__(self, limits=None, default_limits=None, max_retries=6,
+                 base_delay=0.5, max_delay=20.0):
+        self.limits = dict(limits or {})
+        self.default_limits = dict(default_limits or {})
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._models = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._stats_lock = threading.Lock()
+        self._waits = {}  # priority -> [count, total_seconds, max_seconds]
+        self._counters = {"calls": 0, "throttles": 0, "retries": 0, "failures": 0}
+
+    def _state(self, model_id):
+        state = self._models.get(model_id)
+        if state is None:
+            with self._lock:
+                state = self._models.get(model_id)
+                if state is None:
+                    limits = self.limits.get(model_id, self.default_limits)
+                    state = _ModelState(limits.get("requests_per_minute"),
+                                        limits.get("tokens_per_minute"))
+                    self._models[model_id] = state
+        return state
+
+    def acquire(self, model_id, estimated_tokens=0, priority=None):
+        """Block until this caller may send one request to model_id.
+
+        Callers are admitted strictly in (priority, arrival) order per model.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        if priority is None:
+            priority = current_priority()
+        state = self._state(model_id)
+        ticket = (priority, next(self._seq))
+        start = time.monotonic()
+        with state.cond:
+            heapq.heappush(state.queue, ticket)
+            try:
+                while True:
+                    if state.queue[0] == ticket:
+                        delay = state.delay(estimated_tokens, time.monotonic())
+                        if delay <= 0:
+                            heapq.heappop(state.queue)
+                            if state.requests is not None:
+                                state.requests.take(1)
+                            if state.tokens is not None:
+                                state.tokens.take(estimated_tokens)
+                            break
+                        state.cond.wait(delay)
+                    else:
+                        state.cond.wait()
+            except BaseException:
+                state.queue.remove(ticket)
+                heapq.heapify(state.queue)
+                raise
+            finally:
+                state.cond.notify_all()
+
+        waited = time.monotonic() - start
+        self._record_wait(priority, waited)
+        return waited
+
+    def record_usage(self, model_id, actual_tokens, estimated_tokens=0):
+        """Charge the tokens/minute bucket for the difference from the estimate."""
+        state = self._state(model_id)
+        if state.tokens is None:
+            return
+        with state.cond:
+            state.tokens.take(actual_tokens - estimated_tokens)
+
+    def throttled(self, model_id, attempt):
+        """Pause model_id for every caller after a throttling error.
+
+        Returns:
+            The backoff applied, in seconds (full jitter, capped).
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        state = self._state(model_id)
+        with state.cond:
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            state.cond.notify_all()
+        with self._stats_lock:
+            self._counters["throttles"] += 1
+        return delay
+
+    def call(self, model_id, fn, estimated_tokens=0, priority=None):
+        """Run fn() under the limiter, retrying on throttling errors.
+
+        If the result carries a Converse "usage" block, the tokens/minute
+        bucket is corrected with the real token count.
+        """
+        if priority is None:
+            priority = current_priority()
+        attempt = 0
+        while True:
+            self.acquire(model_id, estimated_tokens, priority)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_throttle_error(e) or attempt >= self.max_retries:
+                    with self._stats_lock:
+                        self._counters["failures"] += 1
+                    raise
+                self.throttled(model_id, attempt)
+                attempt += 1
+                with self._stats_lock:
+                    self._counters["retries"] += 1
+                continue
+
+            with self._stats_lock:
+                self._counters["calls"] += 1
+            usage = result.get("usage") if isinstance(result, dict) else None
+            if usage:
+                actual = usage.get("inputTokens", 0) + usage.get("outputTokens", 0)
+                self.record_usage(model_id, actual, estimated_tokens)
+            return result
+
+    def _record_wait(self, priority, waited):
+        with self._stats_lock:
+            entry = self._waits.setdefault(priority, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += waited
+            entry[2] = max(entry[2], waited)
+
+    def stats(self):
+        """Return queue depth and wait-time statistics per lane and model."""
+        queued = {}
+        models = {}
+        with self._lock:
+            states = dict(self._models)
+        for model_id, state in states.items():
+            with state.cond:
+                depth = len(state.queue)
+                for lane, _ in state.queue:
+                    queued[lane] = queued.get(lane, 0) + 1
+                blocked = max(0.0, state.blocked_until - time.monotonic())
+            models[model_id] = {"queue_depth": depth, "blocked_for_s": round(blocked, 3)}
+
+        with self._stats_lock:
+            lanes = {}
+            for lane in sorted(set(self._waits) | set(queued)):
+                count, total, longest = self._waits.get(lane, [0, 0.0, 0.0])
+                lanes[PRIORITY_NAMES.get(lane, str(lane))] = {
+                    "queue_depth": queued.get(lane, 0),
+                    "admitted": count,
+                    "avg_wait_ms": round(total / count * 1000, 2) if count else 0.0,
+                    "max_wait_ms": round(longest * 1000, 2),
+                }
+            return {**self._counters, "lanes": lanes, "models": models}
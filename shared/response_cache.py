@@ -0,0 +1,197 @@
+"""
+Content-addressed response cache for Bedrock Converse calls.
+Keys are a canonical hash of the request (model, system, messages, tools),
+so identical requests are answered without a Bedrock round trip.
+
+Two tiers:
+    - an in-process LRU (fast, lost on restart)
+    - an optional SQLite file (persistent, shared between processes)
+
+Usage:
+    cache = ResponseCache(sqlite_path="converse_cache.db", ttl=3600)
+    message, stop_reason = converse(client, model_id, messages, cache=cache)
+    print(cache.stats())
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Only these parts of a Converse request change the model's answer.
+KEY_FIELDS = ("modelId", "system", "messages", "toolConfig", "inferenceConfig")
+
+# Only these parts of a Converse response are worth replaying.
+RESPONSE_FIELDS = ("output", "stopReason", "usage", "metrics")
+
+
+def request_key(request):
+    """Return a stable SHA-256 hex digest for a Converse request dict."""
+    payload = {field: request[field] for field in KEY_FIELDS if field in request}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache of Converse responses.
+
+    Args:
+        max_entries: Maximum responses kept in the in-process LRU.
+        sqlite_path: Optional path to a SQLite file for the persistent tier.
+        max_bytes: Size cap for the SQLite tier; least recently used rows
+            are evicted once the stored payloads exceed it. The size is
+            tracked in memory and only recounted from the table when it
+            crosses the cap, so other processes' writes are caught late.
+        ttl: Optional time-to-live in seconds for both tiers.
+    """
+
+    def __init__(self, max_entries=1024, sqlite_path=None, max_bytes=256 * 1024 * 1024,
+                 ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (created_at, payload_json)
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_bytes = 0  # running SUM(size) of the SQLite tier
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                          "stores": 0, "evictions": 0, "expired": 0}
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+            )
+            self._db.commit()
+            self._disk_bytes = self._disk_size()
+
+    def get(self, request):
+        """Return the cached response for a request dict, or None on a miss."""
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if self._expired(created_at, now):
+                    del self._memory[key]
+                    self._counters["expired"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return json.loads(payload)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, created_at, size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    payload, created_at, size = row
+                    if self._expired(created_at, now):
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._db.commit()
+                        self._disk_bytes -= size
+                        self._counters["expired"] += 1
+                    else:
+                        self._db.execute(
+                            "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, created_at, payload)
+                        self._counters["disk_hits"] += 1
+                        return json.loads(payload)
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, request, response):
+        """Store the replayable parts of a Converse response."""
+        key = request_key(request)
+        stored = {field: response[field] for field in RESPONSE_FIELDS if field in response}
+        payload = json.dumps(stored, separators=(",", ":"), ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, payload)
+            self._counters["stores"] += 1
+            if self._db is not None:
+                old = self._db.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, now, now, len(payload)),
+                )
+                self._disk_bytes += len(payload) - (old[0] if old else 0)
+                if self._disk_bytes > self.max_bytes:
+                    self._evict_disk()
+                self._db.commit()
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and the current tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        return stats
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # -- internals (caller holds self._lock) --------------------------------
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key, created_at, payload):
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_size(self):
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return total
+
+    def _evict_disk(self):
+        # Recount before evicting: other processes sharing the file may
+        # have added or evicted rows since the running total was taken.
+        total = self._disk_size()
+        doomed = []
+        if total > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC")
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._disk_bytes = total
+        self._counters["evictions"] += len(doomed)
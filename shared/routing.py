@@ -0,0 +1,247 @@
+"""
+Latency-aware model routing: hedged requests and throttling fallback.
+
+Lab 01's compare_models shows Haiku answering several times faster than
+Sonnet. A HedgingRouter installed in bedrock_client uses that at runtime:
+
+- It tracks rolling client latency per model.
+- For calls flagged latency-sensitive, if a Sonnet call has not returned
+  by Sonnet's rolling p95, the same request is also sent to Haiku (a
+  "hedge") and whichever answers first wins.
+- When a model is throttled, calls go straight to its fallback model for
+  a cool-down period.
+
+boto3 calls cannot be interrupted: a losing request that has already
+started runs to completion in the background and its result is dropped.
+Only non-streaming Converse calls are routed.
+
+Usage:
+    set_router(HedgingRouter())          # from bedrock_client
+
+    with latency_sensitive():
+        converse(client, CLAUDE_SONNET, messages)
+
+    print(get_router().stats())
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from bedrock_client import CACHE_POINT, CLAUDE_HAIKU, CLAUDE_SONNET
+from rate_limiter import is_throttle_error
+
+DEFAULT_FALLBACKS = {CLAUDE_SONNET: CLAUDE_HAIKU}
+
+_latency_sensitive = contextvars.ContextVar("latency_sensitive", default=False)
+
+
+@contextmanager
+def latency_sensitive(enabled=True):
+    """Allow hedged requests for the Bedrock calls in this block."""
+    token = _latency_sensitive.set(enabled)
+    try:
+        yield
+    finally:
+        _latency_sensitive.reset(token)
+
+
+def is_latency_sensitive():
+    return _latency_sensitive.get()
+
+
+def reroute(request, model_id):
+    """Copy a Converse request for another model.
+
+    Prompt-cache checkpoints are removed, since models without prompt
+    caching (e.g. Claude 3 Haiku) reject requests that contain them.
+    """
+    def strip(blocks):
+        return [b for b in blocks if b != CACHE_POINT]
+
+    rerouted = dict(request, modelId=model_id)
+    if "system" in request:
+        rerouted["system"] = strip(request["system"])
+    if "toolConfig" in request:
+        rerouted["toolConfig"] = dict(request["toolConfig"],
+                                      tools=strip(request["toolConfig"]["tools"]))
+    rerouted["messages"] = [dict(m, content=strip(m["content"])) for m in request["messages"]]
+    return rerouted
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies (seconds) per model.
+
+    Args:
+        window: Most recent samples kept per model.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model_id, seconds):
+        with self._lock:
+            samples = self._samples.get(model_id)
+            if samples is None:
+                samples = self._samples[model_id] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, model_id):
+        return len(self._samples.get(model_id, ()))
+
+    def percentile(self, model_id, q):
+        """Nearest-rank percentile (q in 0-100), or None with no samples."""
+        with self._lock:
+            ordered = sorted(self._samples.get(model_id, ()))
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def snapshot(self):
+        return {model_id: {"samples": self.count(model_id),
+                           "p50_ms": round(self.percentile(model_id, 50) * 1000, 1),
+                           "p95_ms": round(self.percentile(model_id, 95) * 1000, 1)}
+                for model_id in list(self._samples)}
+
+
+class HedgingRouter:
+    """Hedges slow latency-sensitive calls and falls back when throttled.
+
+    Args:
+        fallbacks: Dict of model ID -> faster/cheaper model to hedge or
+            fall back to. Models not listed are sent unchanged.
+        hedge_percentile: Rolling latency percentile after which a hedge
+            is sent.
+        min_samples: Samples needed before the percentile is trusted.
+        hedge_after: Seconds to wait before hedging until min_samples have
+            been seen (None = do not hedge until then).
+        throttle_cooldown: Seconds a throttled model is skipped in favour
+            of its fallback.
+        window: Latency samples kept per model.
+        max_workers: Threads available for in-flight primary/hedge calls.
+    """
+
+    def __init__(self, fallbacks=None, hedge_percentile=95, min_samples=20, hedge_after=None,
+                 throttle_cooldown=10.0, window=200, max_workers=64):
+        self.fallbacks = dict(DEFAULT_FALLBACKS if fallbacks is None else fallbacks)
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.hedge_after = hedge_after
+        self.throttle_cooldown = throttle_cooldown
+        self.tracker = LatencyTracker(window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="bedrock-hedge")
+        self._throttled_until = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "hedged": 0, "hedge_wins": 0,
+                          "throttle_fallbacks": 0, "abandoned": 0}
+
+    def hedge_delay(self, model_id):
+        """Seconds to wait on model_id before hedging, or None for no hedge."""
+        if self.tracker.count(model_id) < self.min_samples:
+            return self.hedge_after
+        return self.tracker.percentile(model_id, self.hedge_percentile)
+
+    def send(self, request, send):
+        """Route one Converse request.
+
+        Args:
+            request: Converse request kwargs.
+            send: Callable request -> response that performs the call.
+
+        Returns:
+            Tuple of (response, model ID that produced it).
+        """
+        model_id = request["modelId"]
+        fallback = self.fallbacks.get(model_id)
+        self._count("calls")
+        if fallback is None:
+            return self._timed(send, request), model_id
+
+        if self._is_throttled(model_id):
+            self._count("throttle_fallbacks")
+            return self._timed(send, reroute(request, fallback)), fallback
+
+        if is_latency_sensitive():
+            return self._hedged(request, fallback, send)
+
+        try:
+            return self._timed(send, request), model_id
+        except Exception as e:
+            if not is_throttle_error(e):
+                raise
+            return self._fall_back(request, fallback, send)
+
+    def _hedged(self, request, fallback, send):
+        model_id = request["modelId"]
+        primary = self._submit(send, request)
+        delay = self.hedge_delay(model_id)
+        wait([primary], timeout=delay)
+        if primary.done():
+            try:
+                return primary.result(), model_id
+            except Exception as e:
+                if not is_throttle_error(e):
+                    raise
+                return self._fall_back(request, fallback, send)
+
+        self._count("hedged")
+        hedge = self._submit(send, reroute(request, fallback))
+        models = {primary: model_id, hedge: fallback}
+        pending = set(models)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                e = future.exception()
+                if e is None:
+                    for loser in pending:
+                        if not loser.cancel():
+                            self._count("abandoned")
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    return future.result(), models[future]
+                if is_throttle_error(e):
+                    self._mark_throttled(models[future])
+                if error is None or future is primary:
+                    error = e
+        raise error
+
+    def _fall_back(self, request, fallback, send):
+        self._mark_throttled(request["modelId"])
+        self._count("throttle_fallbacks")
+        return self._timed(send, reroute(request, fallback)), fallback
+
+    def _submit(self, send, request):
+        # Copy the context so spans, labels and priority follow the call.
+        return self._executor.submit(contextvars.copy_context().run,
+                                     self._timed, send, request)
+
+    def _timed(self, send, request):
+        start = time.perf_counter()
+        response = send(request)
+        # Late losers are recorded too, so the percentile is not biased low.
+        self.tracker.observe(request["modelId"], time.perf_counter() - start)
+        return response
+
+    def _is_throttled(self, model_id):
+        return self._throttled_until.get(model_id, 0.0) > time.monotonic()
+
+    def _mark_throttled(self, model_id):
+        with self._lock:
+            self._throttled_until[model_id] = time.monotonic() + self.throttle_cooldown
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        throttled = [m for m in list(self._throttled_until) if self._is_throttled(m)]
+        return {**counters, "throttled_models": throttled, "latency": self.tracker.snapshot()}
@@ -0,0 +1,177 @@
+"""
+Speculative execution of a likely branch while the routing decision runs.
+
+In a classify-then-route agent the user waits for the classifier and then
+for the specialist. A Speculator starts the most likely branch (from a
+cheap guess, e.g. the local intent model) at the same time as the real
+decision. If the decision agrees, the already running result is used. If
+not, the guess is discarded and the right branch runs as usual.
+
+boto3 calls cannot be interrupted, so a discarded branch runs to
+completion in the background. Its tokens are counted as wasted, which,
+along with the hit rate, shows whether speculation pays for itself. Only
+speculate on branches without side effects.
+
+Usage:
+    speculator = Speculator(min_confidence=0.4)
+    decision, result = speculator.run(
+        decide=lambda: classify_intent(message),
+        execute=lambda intent: HANDLERS[intent](message),
+        guess=guess, confidence=guess_confidence,
+        branch_of=lambda decision: decision["intent"],
+    )
+    print(speculator.stats())
+"""
+
+import contextvars
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from budget import cost_usd
+from logging_utils import span
+from metrics import capture, labels
+
+
+class Speculator:
+    """Runs a guessed branch concurrently with the decision that selects it.
+
+    Args:
+        min_confidence: Guesses below this confidence are not speculated.
+        branches: Optional collection of branches that are safe to run
+            speculatively (no side effects); None allows any branch.
+        max_workers: Speculative branches in flight at once. When all are
+            busy, no new speculation is started.
+    """
+
+    def __init__(self, min_confidence=0.5, branches=None, max_workers=8):
+        self.min_confidence = min_confidence
+        self.branches = frozenset(branches) if branches is not None else None
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="speculation")
+        self._ids = itertools.count(1)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._counters = {"decisions": 0, "speculated": 0, "hits": 0, "misses": 0, "errors": 0,
+                          "wasted_input_tokens": 0, "wasted_output_tokens": 0,
+                          "wasted_cost_usd": 0.0, "saved_ms": 0.0}
+
+    def should_speculate(self, guess, confidence):
+        if guess is None or confidence < self.min_confidence:
+            return False
+        return self.branches is None or guess in self.branches
+
+    def run(self, decide, execute, guess=None, confidence=1.0, branch_of=None):
+        """Decide and execute, running execute(guess) speculatively meanwhile.
+
+        Args:
+            decide: Callable () -> decision.
+            execute: Callable branch -> result.
+            guess: The branch expected to be chosen.
+            confidence: Confidence in guess, compared with min_confidence.
+            branch_of: Callable decision -> branch (default: the decision
+                itself). A branch of None means nothing is executed.
+
+        Returns:
+            Tuple of (decision, result); result is None if the branch is None.
+            If the speculated branch was chosen but raised, it is executed
+            again, so speculation never surfaces an error of its own.
+        """
+        branch_of = branch_of or (lambda decision: decision)
+        future = None
+        if self.should_speculate(guess, confidence):
+            future = self._start(execute, guess)
+
+        started = time.perf_counter()
+        try:
+            decision = decide()
+        except BaseException:
+            if future is not None:
+                self._discard(future)
+            raise
+        decide_ms = (time.perf_counter() - started) * 1000
+        branch = branch_of(decision)
+        self._count("decisions")
+
+        if future is not None:
+            if branch == guess:
+                try:
+                    result = future.result()
+                except Exception:
+                    self._count("errors")
+                    self._charge_waste(future.calls)
+                else:
+                    self._count("hits", saved_ms=decide_ms)
+                    return decision, result
+            else:
+                self._count("misses")
+                self._discard(future)
+        return decision, execute(branch) if branch is not None else None
+
+    def _start(self, execute, guess):
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None  # never queue speculation behind other speculation
+            self._in_flight += 1
+            self._counters["speculated"] += 1
+        speculation_id = next(self._ids)
+        calls = []  # usage records of this branch only, for waste accounting
+
+        def job():
+            try:
+                with labels(speculation=speculation_id), capture(calls), \
+                        span("speculate", kind="speculation", branch=guess):
+                    return execute(guess)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+        # Copy the context so spans, labels and priority follow the branch.
+        future = self._executor.submit(contextvars.copy_context().run, job)
+        future.speculation_id = speculation_id
+        future.calls = calls
+        return future
+
+    def _discard(self, future):
+        if future.cancel():
+            with self._lock:
+                self._in_flight -= 1
+            return
+        # Already running: count its tokens as wasted once it finishes.
+        future.add_done_callback(lambda f: self._charge_waste(f.calls))
+
+    def _charge_waste(self, records):
+        input_tokens = sum(r["input_tokens"] + r["cache_read_tokens"] + r["cache_write_tokens"]
+                           for r in records)
+        output_tokens = sum(r["output_tokens"] for r in records)
+        cost = sum(cost_usd(r["model_id"], {"inputTokens": r["input_tokens"],
+                                            "outputTokens": r["output_tokens"],
+                                            "cacheReadInputTokens": r["cache_read_tokens"],
+                                            "cacheWriteInputTokens": r["cache_write_tokens"]})
+                   for r in records)
+        with self._lock:
+            self._counters["wasted_input_tokens"] += input_tokens
+            self._counters["wasted_output_tokens"] += output_tokens
+            self._counters["wasted_cost_usd"] += cost
+
+    def _count(self, name, saved_ms=0.0):
+        with self._lock:
+            self._counters[name] += 1
+            self._counters["saved_ms"] += saved_ms
+
+    def stats(self):
+        """Hit rate, wasted tokens/spend and classifier latency hidden by hits.
+
+        errors counts correct guesses whose speculative run raised and was
+        re-executed; their tokens count as wasted. Wasted totals include discarded branches that are still running
+        only once they finish.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        speculated = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / speculated if speculated else 0.0
+        stats["speculation_rate"] = stats["speculated"] / stats["decisions"] if stats["decisions"] else 0.0
+        stats["wasted_cost_usd"] = round(stats["wasted_cost_usd"], 6)
+        return stats
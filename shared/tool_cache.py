@@ -0,0 +1,151 @@
+"""
+Memoization of tool results across the turns of an agent session.
+
+Models often call the same tool with the same arguments several times in
+one session. A ToolResultCache passed to converse_with_tools() answers
+repeat calls from memory. Caching is opt-in per tool, with a TTL each,
+and tools with side effects can invalidate the results they make stale.
+
+Usage:
+    tool_cache = ToolResultCache(
+        tools={"search_faq": {"ttl": 3600, "scope": "global"},
+               "check_balance": {"ttl": 30}},
+        invalidates={"initiate_transfer": ["check_balance"]},
+    )
+    converse_with_tools(..., tool_cache=tool_cache)
+    print(tool_cache.stats())
+
+Session-scoped entries live in the ToolResultCache instance (create one
+per session). Global-scoped entries are shared by every instance in the
+process. Cache hits are marked cached=True on the tool's trace span.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+GLOBAL_MAX_ENTRIES = 4096
+
+_global_entries = OrderedDict()
+_global_lock = threading.Lock()
+
+
+def tool_key(tool_name, tool_input):
+    """Cache key: tool name plus the input as canonical JSON."""
+    return tool_name, json.dumps(tool_input, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _get(entries, key, now):
+    entry = entries.get(key)
+    if entry is None:
+        return None
+    expires, result = entry
+    if expires is not None and expires <= now:
+        del entries[key]
+        return None
+    entries.move_to_end(key)
+    return entry
+
+
+def _put(entries, key, result, ttl, max_entries):
+    entries[key] = (time.monotonic() + ttl if ttl is not None else None, result)
+    entries.move_to_end(key)
+    while len(entries) > max_entries:
+        entries.popitem(last=False)
+
+
+def _drop(entries, tool_names):
+    stale = [k for k in entries if tool_names is None or k[0] in tool_names]
+    for key in stale:
+        del entries[key]
+    return len(stale)
+
+
+class ToolResultCache:
+    """Per-session tool-result cache with per-tool TTLs and invalidation.
+
+    Args:
+        tools: Dict of tool name -> {"ttl": seconds or None, "scope":
+            "session" (default) or "global"}. Only these tools are cached.
+        invalidates: Dict of side-effect tool name -> list of tool names
+            whose cached results it makes stale, or None for all of them.
+        max_entries: Session entries kept (least recently used go first).
+    """
+
+    def __init__(self, tools=None, invalidates=None, max_entries=1024):
+        self.tools = dict(tools or {})
+        self.invalidates = dict(invalidates or {})
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidated": 0}
+        self._hits_by_tool = {}
+
+    def _store_for(self, tool_name):
+        if self.tools[tool_name].get("scope") == "global":
+            return _global_entries, _global_lock, GLOBAL_MAX_ENTRIES
+        return self._entries, self._lock, self.max_entries
+
+    def lookup(self, tool_name, tool_input):
+        """Return (True, result) on a fresh hit, else (False, None)."""
+        if tool_name not in self.tools:
+            return False, None
+        entries, lock, _ = self._store_for(tool_name)
+        with lock:
+            entry = _get(entries, tool_key(tool_name, tool_input), time.monotonic())
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return False, None
+            self._counters["hits"] += 1
+            self._hits_by_tool[tool_name] = self._hits_by_tool.get(tool_name, 0) + 1
+        return True, entry[1]
+
+    def record(self, tool_name, tool_input, result):
+        """Store a fresh result (if tool_name opted in) and apply invalidations."""
+        if tool_name in self.tools:
+            entries, lock, max_entries = self._store_for(tool_name)
+            with lock:
+                _put(entries, tool_key(tool_name, tool_input), result,
+                     self.tools[tool_name].get("ttl"), max_entries)
+        if tool_name in self.invalidates:
+            targets = self.invalidates[tool_name]
+            if targets is None:
+                self.invalidate()
+            else:
+                self.invalidate(*targets)
+
+    def call(self, tool_name, tool_input, fn):
+        """Return (result, cached), running fn(**tool_input) on a miss.
+
+        Exceptions from fn propagate and nothing is cached.
+        """
+        hit, result = self.lookup(tool_name, tool_input)
+        if hit:
+            return result, True
+        result = fn(**tool_input)
+        self.record(tool_name, tool_input, result)
+        return result, False
+
+    def invalidate(self, *tool_names):
+        """Drop cached results for tool_names (all tools if none given).
+
+        Global-scope entries for those tools are dropped for every session.
+        """
+        names = set(tool_names) if tool_names else None
+        with self._lock:
+            dropped = _drop(self._entries, names)
+        with _global_lock:
+            dropped += _drop(_global_entries, names if names is not None else set(self.tools))
+        with self._lock:
+            self._counters["invalidated"] += dropped
+        return dropped
+
+    def stats(self):
+        """Hit/miss counts; hits are tool executions saved."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {**self._counters, "entries": len(self._entries),
+                    "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                    "hits_by_tool": dict(self._hits_by_tool)}
@@ -0,0 +1,279 @@
+"""
+Decorator-based tool registry with generated schemas and input validation.
+
+Each registered function gets its Bedrock toolSpec built once, at import,
+from its signature and Google-style docstring (or from a hand-written
+schema), plus a precompiled validator for its input schema. The tool list
+and dispatch map are built once and reused on every turn, and malformed
+model input is rejected with a clear error before the function runs.
+
+Usage:
+    tools = ToolRegistry()
+
+    @tools.tool
+    def get_weather(city, units="celsius"):
+        '''Get the current weather for a city.
+
+        Args:
+            city (str): The city name, e.g. 'London'.
+            units (str): "celsius" or "fahrenheit".
+        '''
+        ...
+
+    tools.register(calculator, schema=TOOL_SCHEMA)   # existing schema dicts work too
+
+    converse_with_tools(client, model_id, prompt, tools.tools, tools.dispatch, message)
+"""
+
+import inspect
+import re
+from functools import wraps
+
+# JSON-schema type -> accepted Python types.
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+}
+
+# Python / docstring type names -> JSON-schema type.
+PYTHON_TYPES = {
+    str: "string", "str": "string", "string": "string",
+    int: "integer", "int": "integer", "integer": "integer",
+    float: "number", "float": "number", "number": "number",
+    bool: "boolean", "bool": "boolean", "boolean": "boolean",
+    list: "array", "list": "array", "array": "array",
+    dict: "object", "dict": "object", "object": "object",
+}
+
+_ARG_LINE = re.compile(r"^(\*{0,2}\w+)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$")
+
+
+class ToolInputError(ValueError):
+    """The model called a tool with input that does not match its schema."""
+
+
+def _parse_docstring(doc):
+    """Split a Google-style docstring into (summary, {arg: (type, description)})."""
+    summary_lines = []
+    for line in doc.splitlines():
+        if not line.strip():
+            break
+        summary_lines.append(line.strip())
+
+    args = {}
+    in_args = False
+    current = None
+    indent = None
+    for line in doc.splitlines():
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:", "Parameters:"):
+            in_args, current, indent = True, None, None
+            continue
+        if not in_args:
+            continue
+        if not stripped:
+            continue
+        line_indent = len(line) - len(line.lstrip())
+        if line_indent == 0:
+            break  # next section (Returns:, Raises:, ...)
+        match = _ARG_LINE.match(stripped)
+        if match and (indent is None or line_indent <= indent):
+            indent = line_indent
+            current = match.group(1).lstrip("*")
+            args[current] = [match.group(2), match.group(3)]
+        elif current is not None:
+            args[current][1] += " " + stripped
+    return " ".join(summary_lines), {k: (t, d.strip()) for k, (t, d) in args.items()}
+
+
+def _json_type(annotation, doc_type, default):
+    if doc_type:
+        for part in doc_type.replace(" ", "").lower().split(","):
+            if part in PYTHON_TYPES:
+                return PYTHON_TYPES[part]
+    if annotation is not inspect.Parameter.empty and annotation in PYTHON_TYPES:
+        return PYTHON_TYPES[annotation]
+    if default is not inspect.Parameter.empty and default is not None:
+        return PYTHON_TYPES.get(type(default), "string")
+    return "string"
+
+
+def schema_from_function(fn, name=None, description=None, params=None):
+    """Build a Bedrock tool schema ({"toolSpec": ...}) from fn.
+
+    Parameter types come from the docstring's Args section, then type
+    annotations, then default values, falling back to string. Parameters
+    without defaults are required.
+
+    Args:
+        fn: The tool function.
+        name: Tool name (default fn.__name__).
+        description: Tool description (default the docstring summary).
+        params: Optional dict of parameter name -> extra JSON-schema keys
+            (e.g. {"operation": {"enum": [...]}}) merged into the property.
+    """
+    summary, arg_docs = _parse_docstring(inspect.getdoc(fn) or "")
+    properties = {}
+    required = []
+    closed = True
+    for param in inspect.signature(fn).parameters.values():
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            closed = False
+            continue
+        if param.kind is inspect.Parameter.VAR_POSITIONAL:
+            continue
+        doc_type, doc_description = arg_docs.get(param.name, (None, ""))
+        prop = {"type": _json_type(param.annotation, doc_type, param.default)}
+        if doc_description:
+            prop["description"] = doc_description
+        prop.update((params or {}).get(param.name, {}))
+        properties[param.name] = prop
+        if param.default is inspect.Parameter.empty:
+            required.append(param.name)
+
+    input_schema = {"type": "object", "properties": properties, "required": required}
+    if closed:
+        input_schema["additionalProperties"] = False
+    return {"toolSpec": {
+        "name": name or fn.__name__,
+        "description": description or summary or (name or fn.__name__).replace("_", " "),
+        "inputSchema": {"json": input_schema},
+    }}
+
+
+def compile_validator(tool_name, input_schema):
+    """Return validate(tool_input) for one tool's input JSON schema.
+
+    Checks required keys, unknown keys (when additionalProperties is
+    false), top-level types and enums, and raises ToolInputError listing
+    every problem. Nested schemas are not descended into.
+    """
+    properties = input_schema.get("properties", {})
+    required = tuple(input_schema.get("required", ()))
+    known = frozenset(properties) if input_schema.get("additionalProperties") is False else None
+    checks = []
+    for key, prop in properties.items():
+        json_type = prop.get("type")
+        types = JSON_TYPES.get(json_type) if isinstance(json_type, str) else None
+        enum = tuple(prop["enum"]) if "enum" in prop else None
+        if types is not None or enum is not None:
+            checks.append((key, json_type, types, json_type in ("integer", "number"), enum))
+
+    def validate(tool_input):
+        if not isinstance(tool_input, dict):
+            raise ToolInputError(f"{tool_name}: input must be an object")
+        problems = [f"missing required '{key}'" for key in required if key not in tool_input]
+        if known is not None:
+            problems += [f"unexpected '{key}'" for key in tool_input if key not in known]
+        for key, json_type, types, numeric, enum in checks:
+            if key not in tool_input:
+                continue
+            value = tool_input[key]
+            if types is not None and (not isinstance(value, types)
+                                      or (numeric and isinstance(value, bool))):
+                problems.append(f"'{key}' must be {json_type}, got {type(value).__name__}")
+            elif enum is not None and value not in enum:
+                problems.append(f"'{key}' must be one of {sorted(enum, key=str)}")
+        if problems:
+            raise ToolInputError(f"{tool_name}: " + "; ".join(problems))
+
+    return validate
+
+
+def _with_validation(fn, validate):
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def async_call(**tool_input):
+            validate(tool_input)
+            return await fn(**tool_input)
+        return async_call
+
+    @wraps(fn)
+    def call(**tool_input):
+        validate(tool_input)
+        return fn(**tool_input)
+    return call
+
+
+class ToolRegistry:
+    """A set of tools with cached schemas and a validating dispatch map.
+
+    registry.tools and registry.dispatch plug straight into the tools and
+    tool_dispatch arguments of converse_with_tools(). Both are built once
+    and rebuilt only when a tool is registered.
+    """
+
+    def __init__(self):
+        self._entries = {}  # name -> (schema, validating callable)
+        self._tools = None
+        self._dispatch = None
+        self._tool_config = None
+
+    def tool(self, fn=None, *, name=None, description=None, params=None):
+        """Decorator registering fn with a schema derived from it.
+
+        Usable bare (@registry.tool) or with options
+        (@registry.tool(name=..., params=...)). Returns fn unchanged.
+        """
+        def decorator(fn):
+            return self.register(fn, name=name, description=description, params=params)
+        return decorator(fn) if fn is not None else decorator
+
+    def register(self, fn, schema=None, name=None, description=None, params=None):
+        """Register fn, with an explicit {"toolSpec": ...} schema or a derived one.
+
+        Returns:
+            fn, unchanged.
+        """
+        if schema is None:
+            schema = schema_from_function(fn, name, description, params)
+        spec = schema["toolSpec"]
+        validate = compile_validator(spec["name"], spec["inputSchema"]["json"])
+        self._entries[spec["name"]] = (schema, _with_validation(fn, validate), validate)
+        self._tools = self._dispatch = self._tool_config = None
+        return fn
+
+    @property
+    def tools(self):
+        """List of tool schemas for converse_with_tools(tools=...)."""
+        if self._tools is None:
+            self._tools = [schema for schema, _, _ in self._entries.values()]
+        return self._tools
+
+    @property
+    def dispatch(self):
+        """Dict of tool name -> validating callable, for tool_dispatch=."""
+        if self._dispatch is None:
+            self._dispatch = {name: call for name, (_, call, _) in self._entries.items()}
+        return self._dispatch
+
+    def tool_config(self):
+        """The toolConfig payload for a raw client.converse() call."""
+        if self._tool_config is None:
+            self._tool_config = {"tools": self.tools}
+        return self._tool_config
+
+    def validate(self, name, tool_input):
+        """Raise ToolInputError if tool_input is not valid for tool name."""
+        if name not in self._entries:
+            raise ToolInputError(f"unknown tool '{name}'")
+        self._entries[name][2](tool_input)
+
+    def call(self, name, tool_input):
+        """Validate and run one tool call."""
+        if name not in self._entries:
+            raise ToolInputError(f"unknown tool '{name}'")
+        return self._entries[name][1](**tool_input)
+
+    def names(self):
+        return list(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,31 @@
+"""
+Offline unit tests for the shared/ modules. No AWS access needed.
+
+Run from the repo root:
+    python -m pytest -q tests
+
+Tests that drive a model through fake_bedrock need botocore (installed
+with boto3 from shared/requirements.txt) and are skipped without it.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SHARED_DIR = REPO_ROOT / "shared"
+FAQ_PATH = REPO_ROOT / "hackathon" / "data" / "faq_data.json"
+
+sys.path.insert(0, str(SHARED_DIR))
+
+
+@pytest.fixture
+def fake_bedrock():
+    """The fake_bedrock module, with any installed fake removed afterwards."""
+    pytest.importorskip("botocore")
+    import fake_bedrock
+
+    yield fake_bedrock
+    fake_bedrock.uninstall()
+
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from bedrock_client import CLAUDE_HAIKU, _acall_tool, aconverse, aconverse_with_tools
+
+
+def tool_use(name, **tool_input):
+    return {"toolUseId": name, "name": name, "input": tool_input}
+
+
+def results_of(messages):
+    return [block["toolResult"]["content"][0]["text"]
+            for message in messages for block in message["content"] if "toolResult" in block]
+
+
+def test_coroutine_tools_are_awaited_on_the_loop():
+    async def lookup(city):
+        await asyncio.sleep(0)
+        return f"sunny in {city}"
+
+    result = asyncio.run(_acall_tool({"lookup": lookup}, tool_use("lookup", city="Leeds")))
+
+    assert result == "sunny in Leeds"
+
+
+def test_plain_tools_run_off_the_loop():
+    def blocking(seconds):
+        time.sleep(seconds)
+        return "done"
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await _acall_tool({"blocking": blocking}, tool_use("blocking", seconds=0.1))
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == "done"
+    assert ticks >= 5  # the loop kept running while the tool blocked
+
+
+def test_slow_coroutine_tool_times_out():
+    async def slow():
+        await asyncio.sleep(1)
+
+    result = asyncio.run(_acall_tool({"slow": slow}, tool_use("slow"), tool_timeout=0.05))
+
+    assert "timed out" in json.loads(result)["error"]
+
+
+def test_aconverse_returns_message_and_stop_reason(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(script=[fake_bedrock.text_response("hello")])
+    messages = [{"role": "user", "content": [{"text": "hi"}]}]
+
+    message, stop_reason = asyncio.run(aconverse(fake, CLAUDE_HAIKU, messages))
+
+    assert (message["content"][0]["text"], stop_reason) == ("hello", "end_turn")
+
+
+def test_async_loop_mixes_coroutine_and_plain_tools(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_calls_response([("weather", {"city": "Leeds"}), ("balance", {})]),
+        fake_bedrock.text_response("All done."),
+    ])
+
+    async def weather(city):
+        return f"sunny in {city}"
+
+    answer, messages = asyncio.run(aconverse_with_tools(
+        fake, CLAUDE_HAIKU, None, [], {"weather": weather, "balance": lambda: "100"}, "go",
+        parallel_tools=True,
+    ))
+
+    assert answer == "All done."
+    assert results_of(messages) == ["sunny in Leeds", "100"]
+
+
+@pytest.mark.parametrize("max_workers, expected_peak", [(2, 2), (8, 4)])
+def test_parallel_tools_are_bounded_by_max_workers(fake_bedrock, max_workers, expected_peak):
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_calls_response([("work", {"i": i}) for i in range(4)]),
+        fake_bedrock.text_response("done"),
+    ])
+    running = peak = 0
+
+    async def work(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return str(i)
+
+    _, messages = asyncio.run(aconverse_with_tools(
+        fake, CLAUDE_HAIKU, None, [], {"work": work}, "go",
+        parallel_tools=True, max_workers=max_workers,
+    ))
+
+    assert peak == expected_peak
+    assert results_of(messages) == ["0", "1", "2", "3"]
+
+
+def test_queued_tools_get_their_full_timeout(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_calls_response([("work", {}), ("work", {})]),
+        fake_bedrock.text_response("done"),
+    ])
+
+    async def work():
+        await asyncio.sleep(0.06)
+        return "ok"
+
+    _, messages = asyncio.run(aconverse_with_tools(
+        fake, CLAUDE_HAIKU, None, [], {"work": work}, "go",
+        parallel_tools=True, max_workers=1, tool_timeout=0.1,
+    ))
+
+    assert results_of(messages) == ["ok", "ok"]
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+
+from batch import BatchRunner, converse_job, item_key
+from rate_limiter import PRIORITY_BATCH, current_priority
+
+
+def test_item_key_uses_id_or_a_stable_hash():
+    assert item_key({"id": 7, "prompt": "x"}) == "7"
+    assert item_key({"b": 1, "a": 2}) == item_key({"a": 2, "b": 1})
+    assert item_key({"a": 1}) != item_key({"a": 2})
+
+
+def test_results_come_back_in_input_order_within_max_workers():
+    running = peak = 0
+    lock = threading.Lock()
+
+    def job(item):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01 * (5 - item["n"] % 5))
+        with lock:
+            running -= 1
+        return item["n"] * 2
+
+    runner = BatchRunner(fn=job, max_workers=3)
+    results = runner.run([{"n": n} for n in range(12)])
+
+    assert [r["output"] for r in results] == [n * 2 for n in range(12)]
+    assert [r["index"] for r in results] == list(range(12))
+    assert peak <= 3
+    assert runner.stats()["completed"] == 12
+
+
+def test_jobs_run_in_the_batch_lane():
+    results = BatchRunner(fn=lambda item: current_priority()).run([{"n": 1}])
+    assert results[0]["output"] == PRIORITY_BATCH
+
+
+def test_errors_are_captured_per_item():
+    def job(item):
+        if item["n"] == 1:
+            raise ValueError("bad item")
+        return "ok"
+
+    runner = BatchRunner(fn=job)
+    results = runner.run([{"n": 0}, {"n": 1}])
+
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "ValueError: bad item"
+    assert (runner.stats()["completed"], runner.stats()["failed"]) == (1, 1)
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "run.jsonl")
+    items = [{"id": n} for n in range(10)]
+    calls = []
+
+    def job(item):
+        calls.append(item["id"])
+        return item["id"]
+
+    first = BatchRunner(fn=job, max_workers=1, checkpoint_path=checkpoint)
+    for count, _ in enumerate(first.as_completed(items), 1):
+        if count == 4:
+            break  # simulate an interruption
+    with open(checkpoint) as f:
+        saved = {json.loads(line)["key"] for line in f}
+    assert len(saved) >= 4
+
+    calls.clear()
+    second = BatchRunner(fn=job, max_workers=1, checkpoint_path=checkpoint)
+    results = second.run(items)
+
+    assert [r["output"] for r in results] == list(range(10))
+    assert sorted(calls) == sorted(set(range(10)) - {int(k) for k in saved})
+    assert all(r["resumed"] for r in results if r["key"] in saved)
+    assert second.stats()["resumed"] == len(saved)
+
+
+def test_failed_items_and_torn_lines_are_retried(tmp_path):
+    checkpoint = tmp_path / "run.jsonl"
+    attempts = {}
+
+    def flaky(item):
+        attempts[item["id"]] = attempts.get(item["id"], 0) + 1
+        if item["id"] == "b" and attempts["b"] == 1:
+            raise TimeoutError("slow")
+        return item["id"]
+
+    items = [{"id": "a"}, {"id": "b"}]
+    BatchRunner(fn=flaky, checkpoint_path=str(checkpoint)).run(items)
+    with open(checkpoint, "a") as f:
+        f.write('{"key": "a", "out')  # cut short by a crash
+
+    results = BatchRunner(fn=flaky, checkpoint_path=str(checkpoint)).run(items)
+
+    assert [r["output"] for r in results] == ["a", "b"]
+    assert attempts == {"a": 1, "b": 2}
+
+
+def test_converse_job_and_token_throughput(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(rules=[(r".", fake_bedrock.text_response("yes"))])
+    runner = BatchRunner(fn=lambda item: converse_job(item, client=fake), max_workers=4)
+
+    results = runner.run([{"prompt": f"question {n}"} for n in range(5)])
+
+    assert {r["output"]["text"] for r in results} == {"yes"}
+    assert fake.counters["calls"] == 5
+    assert runner.stats()["input_tokens"] > 0
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from bedrock_client import CLAUDE_HAIKU, CLAUDE_SONNET
+from budget import Budget, cost_usd, remaining_time
+
+USAGE = {"inputTokens": 1000, "outputTokens": 100}
+
+
+def test_cost_is_priced_per_model_and_token_kind():
+    usage = dict(USAGE, cacheReadInputTokens=1000)
+
+    assert cost_usd(CLAUDE_SONNET, usage) == pytest.approx((3000 + 1500 + 300) / 1_000_000)
+    assert cost_usd("unknown-model", usage) == 0.0
+    assert cost_usd(CLAUDE_SONNET, None) == 0.0
+
+
+def test_turn_limit():
+    budget = Budget(max_turns=2)
+    budget.charge(CLAUDE_HAIKU, USAGE)
+    assert budget.exhausted() is None
+
+    budget.charge(CLAUDE_HAIKU, None)  # a call without usage still counts
+    assert budget.exhausted() == "turn limit of 2 reached"
+    assert budget.stats()["stop_reason"] == "turn limit of 2 reached"
+
+
+def test_token_and_cost_limits():
+    tokens = Budget(max_input_tokens=1500, max_output_tokens=1000)
+    tokens.charge(CLAUDE_HAIKU, USAGE)
+    assert tokens.exhausted() is None
+    tokens.charge(CLAUDE_HAIKU, {"inputTokens": 200, "cacheReadInputTokens": 300})
+    assert tokens.exhausted() == "input token budget of 1500 used"
+
+    spend = Budget(max_cost_usd=0.005)
+    spend.charge(CLAUDE_SONNET, USAGE)
+    assert spend.exhausted() is None
+    spend.charge(CLAUDE_SONNET, USAGE)
+    assert spend.exhausted() == "spend limit of $0.005 reached"
+    assert spend.stats()["cost_usd"] == pytest.approx(0.009)
+
+
+def test_deadline_starts_on_first_use():
+    budget = Budget(max_seconds=0.05)
+    time.sleep(0.08)
+    assert budget.exhausted() is None  # the clock starts here
+
+    time.sleep(0.08)
+    assert budget.exhausted() == "deadline of 0.05s passed"
+    assert budget.remaining_seconds() == 0.0
+
+
+def test_tool_timeout_is_capped_by_the_deadline():
+    assert Budget().tool_timeout(5) == 5
+    budget = Budget(max_seconds=2)
+    assert budget.tool_timeout(5) <= 2
+    assert budget.tool_timeout(0.5) == 0.5
+    assert 1.9 < budget.tool_timeout() <= 2
+
+
+def test_remaining_time_follows_the_active_budget():
+    assert remaining_time() is None
+    with Budget(max_seconds=10).active():
+        assert 9 < remaining_time() <= 10
+    assert remaining_time() is None
+
+
+def test_loop_stops_with_partial_answer(fake_bedrock):
+    from bedrock_client import converse_with_tools
+
+    fake = fake_bedrock.FakeBedrockClient(rules=[
+        (lambda request: True, fake_bedrock.tool_use_response("lookup", {"q": "x"}, text="Still looking")),
+    ])
+    budget = Budget(max_turns=3)
+
+    text, messages = converse_with_tools(fake, CLAUDE_HAIKU, None, [],
+                                         {"lookup": lambda q: "more"}, "go", budget=budget)
+
+    assert fake.counters["calls"] == 3
+    assert text == "Still looking\n\n[Stopped early: turn limit of 3 reached]"
+    assert messages[-1] == {"role": "assistant", "content": [{"text": text}]}
+
+
+def test_response_cache_hits_count_turns_but_not_cost(fake_bedrock):
+    from bedrock_client import converse_with_tools
+    from response_cache import ResponseCache
+
+    fake = fake_bedrock.FakeBedrockClient(rules=[(r".", fake_bedrock.text_response("hello"))])
+    cache = ResponseCache()
+    first, replay = Budget(), Budget()
+    first_usage, replay_usage = {}, {}
+
+    converse_with_tools(fake, CLAUDE_SONNET, None, [], {}, "hi", cache=cache,
+                        budget=first, usage=first_usage)
+    converse_with_tools(fake, CLAUDE_SONNET, None, [], {}, "hi", cache=cache,
+                        budget=replay, usage=replay_usage)
+
+    assert fake.counters["calls"] == 1
+    assert first.cost_usd > 0 and first.input_tokens > 0
+    assert (replay.turns, replay.input_tokens, replay.cost_usd) == (1, 0, 0.0)
+    assert replay_usage.get("inputTokens", 0) == 0
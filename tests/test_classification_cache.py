@@ -0,0 +1,83 @@
+from classification_cache import ClassificationCache, jaccard, normalize, shingles
+
+
+def test_normalize_drops_punctuation_case_and_stop_words():
+    assert normalize("What's my balance?") == "balance"
+    assert normalize("whats my BALANCE") == "balance"
+
+
+def test_normalize_keeps_words_when_only_stop_words():
+    assert normalize("How are you?") == "how are you"
+
+
+def test_shingles_and_jaccard():
+    assert shingles("ab") == {" ab", "ab "}
+    assert jaccard(set(), set()) == 1.0
+    assert jaccard({"a", "b"}, {"b", "c"}) == 1 / 3
+
+
+def test_exact_hit_after_normalization():
+    cache = ClassificationCache()
+    cache.put("What's my balance?", "account_query")
+
+    assert cache.lookup("whats my BALANCE") == ("account_query", "exact")
+
+
+def test_near_duplicate_hit():
+    cache = ClassificationCache(similarity=0.5)
+    cache.put("transfer money to savings account", "transaction")
+
+    assert cache.lookup("transfer money to my saving account") == ("transaction", "near")
+
+
+def test_dissimilar_text_misses():
+    cache = ClassificationCache(similarity=0.5)
+    cache.put("transfer money to savings account", "transaction")
+
+    assert cache.lookup("branch opening hours") == (None, None)
+    assert cache.stats()["misses"] == 1
+
+
+def test_near_matching_can_be_disabled():
+    cache = ClassificationCache(similarity=None)
+    cache.put("transfer money to savings account", "transaction")
+
+    assert cache.lookup("transfer money to my saving account") == (None, None)
+
+
+def test_lru_eviction_removes_index_entries():
+    cache = ClassificationCache(max_entries=2)
+    cache.put("opening hours", "faq")
+    cache.put("account balance", "account_query")
+    cache.lookup("opening hours")              # now most recently used
+    cache.put("transfer money", "transaction")
+
+    assert len(cache) == 2
+    assert cache.lookup("account balance") == (None, None)
+    assert cache.lookup("opening hours") == ("faq", "exact")
+    assert cache.stats()["evictions"] == 1
+    indexed = set().union(*(members for bucket in cache._buckets for members in bucket.values()))
+    assert indexed == {"opening hours", "transfer money"}
+
+
+def test_put_replaces_existing_value():
+    cache = ClassificationCache()
+    cache.put("opening hours", "faq")
+    cache.put("Opening hours!", "general")
+
+    assert len(cache) == 1
+    assert cache.lookup("opening hours") == ("general", "exact")
+
+
+def test_get_or_compute_computes_once():
+    cache = ClassificationCache()
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return "faq"
+
+    assert cache.get_or_compute("opening hours?", compute) == ("faq", None)
+    assert cache.get_or_compute("Opening hours", compute) == ("faq", "exact")
+    assert calls == ["opening hours?"]
+    assert cache.stats()["hit_rate"] == 0.5
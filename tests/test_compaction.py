@@ -0,0 +1,96 @@
+import pytest
+
+from compaction import SUMMARY_ACK, SUMMARY_PREFIX, ContextCompactor, _is_turn_start, estimate_tokens
+
+
+def text(role, body):
+    return {"role": role, "content": [{"text": body}]}
+
+
+def turn(i, size=400):
+    """One user turn with a tool call: four messages, roughly 4 * size/4 tokens."""
+    filler = "x" * size
+    return [
+        text("user", f"question {i} {filler}"),
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": f"t{i}", "name": "lookup",
+                                                       "input": {"q": i}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": f"t{i}",
+                                                     "content": [{"text": f"result {i} {filler}"}]}}]},
+        text("assistant", f"answer {i} {filler}"),
+    ]
+
+
+def history(turns, size=400):
+    return [m for i in range(turns) for m in turn(i, size)]
+
+
+@pytest.fixture
+def summarizer(fake_bedrock):
+    return fake_bedrock.FakeBedrockClient(rules=[(lambda request: True,
+                                                  fake_bedrock.text_response("SUMMARY"))])
+
+
+def test_estimate_tokens_counts_every_block_type():
+    assert estimate_tokens(text("user", "x" * 40)) == 4 + 10
+    tool_use = {"role": "assistant", "content": [{"toolUse": {"name": "abcd", "input": {}}}]}
+    assert estimate_tokens(tool_use) == 4 + (4 + 2) // 4
+
+
+def test_under_budget_returns_same_list():
+    compactor = ContextCompactor(client=None, max_tokens=10_000)
+    messages = history(3)
+    assert compactor.compact(messages) is messages
+
+
+def test_compaction_fits_target_and_keeps_tool_pairs(summarizer):
+    compactor = ContextCompactor(summarizer, max_tokens=1000, target_tokens=600, keep_recent=4)
+    messages = history(6)
+
+    compacted = compactor.compact(messages)
+
+    assert compacted[0]["content"][0]["text"] == SUMMARY_PREFIX + "SUMMARY"
+    assert compacted[1]["content"][0]["text"] == SUMMARY_ACK
+    assert _is_turn_start(compacted[2])
+    assert compacted[-4:] == messages[-4:]
+    assert compactor.total_tokens(compacted) <= 1000
+    assert compactor.summarized_messages == len(messages) - (len(compacted) - 2)
+    assert messages == history(6)  # input untouched
+
+
+def test_only_new_turns_are_summarized(summarizer):
+    compactor = ContextCompactor(summarizer, max_tokens=1000, target_tokens=600, keep_recent=4)
+    compacted = compactor.compact(history(6))
+    summarizer.requests.clear()
+
+    grown = compacted + [m for i in range(6, 10) for m in turn(i)]
+    compactor.compact(grown)
+
+    (request,) = summarizer.requests
+    prompt = request["messages"][0]["content"][0]["text"]
+    assert prompt.startswith("Existing summary:\nSUMMARY")
+    assert "question 0" not in prompt
+    assert compactor.compactions == 2
+
+
+def test_copied_summary_pair_is_not_summarized_again(summarizer):
+    compactor = ContextCompactor(summarizer, max_tokens=1000, target_tokens=600, keep_recent=4)
+    compacted = compactor.compact(history(6))
+    copied = [dict(m) for m in compacted] + [m for i in range(6, 10) for m in turn(i)]
+    summarizer.requests.clear()
+
+    result = compactor.compact(copied)
+
+    prompt = summarizer.requests[0]["messages"][0]["content"][0]["text"]
+    assert SUMMARY_PREFIX not in prompt
+    assert result[0]["content"][0]["text"].startswith(SUMMARY_PREFIX)
+
+
+def test_unreachable_budget_does_not_summarize_every_turn(summarizer, capsys):
+    compactor = ContextCompactor(summarizer, max_tokens=500, keep_recent=4)
+    messages = turn(0, size=100) + turn(1, size=2000)  # the kept turn alone is over budget
+
+    assert compactor.compact(messages) is messages
+    assert compactor.compact(messages) is messages
+    assert compactor.budget_unreachable
+    assert summarizer.counters["calls"] == 0
+    assert capsys.readouterr().err.count("[compaction]") == 1
@@ -0,0 +1,121 @@
+import json
+import os
+import signal
+import threading
+
+import pytest
+
+import config
+from config import DEFAULTS, get_config, on_reload, reload, resolve
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """A private .env and fresh config state, so shared/.env is never read."""
+    for key in list(os.environ):
+        if key.startswith(config.ENV_PREFIX):
+            monkeypatch.delenv(key)
+    path = tmp_path / ".env"
+    path.write_text("")
+    monkeypatch.setenv("BEDROCK_ENV_FILE", str(path))
+    monkeypatch.setattr(config, "_settings", None)
+    monkeypatch.setattr(config, "_dotenv_keys", {})
+    monkeypatch.setattr(config, "_listeners", [])
+    yield path
+    for key in config._dotenv_keys:
+        os.environ.pop(key, None)
+
+
+def test_defaults_then_profile_then_environment():
+    assert resolve({}).as_dict() == DEFAULTS
+
+    settings = resolve({"BEDROCK_PROFILE": "server", "BEDROCK_READ_TIMEOUT": "45"})
+
+    assert settings.profile == "server"
+    assert settings.max_pool_connections == 100  # from the profile
+    assert settings.read_timeout == 45  # the environment beats the profile
+    assert settings.region == DEFAULTS["region"]
+
+
+def test_profiles_file_adds_and_extends_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"eu": {"region": "eu-west-1"}, "batch": {"max_attempts": 2}}))
+    environ = {"BEDROCK_PROFILES_FILE": str(path)}
+
+    assert resolve(dict(environ, BEDROCK_PROFILE="eu")).region == "eu-west-1"
+    batch = resolve(dict(environ, BEDROCK_PROFILE="batch"))
+    assert (batch.max_attempts, batch.read_timeout) == (2, 300)
+
+
+@pytest.mark.parametrize("environ, message", [
+    ({"BEDROCK_PROFILE": "nope"}, "unknown BEDROCK_PROFILE 'nope'"),
+    ({"BEDROCK_MAX_ATTEMPTS": "many"}, "BEDROCK_MAX_ATTEMPTS='many' is not a valid int"),
+])
+def test_invalid_settings_are_rejected(environ, message):
+    with pytest.raises(ValueError, match=message):
+        resolve(environ)
+
+
+def test_settings_are_read_only():
+    settings = resolve({})
+    with pytest.raises(AttributeError):
+        settings.region = "us-east-1"
+    with pytest.raises(AttributeError, match="unknown setting"):
+        settings.colour
+
+
+def test_env_file_loads_but_real_environment_wins(env_file, monkeypatch):
+    env_file.write_text("# comment\nBEDROCK_REGION=eu-west-2\nBEDROCK_READ_TIMEOUT='30'\n")
+    monkeypatch.setenv("BEDROCK_READ_TIMEOUT", "90")
+
+    settings = get_config()
+
+    assert (settings.region, settings.read_timeout) == ("eu-west-2", 90)
+    assert settings.env_file == env_file
+    assert os.environ["BEDROCK_REGION"] == "eu-west-2"
+    assert get_config() is settings
+
+
+def test_reload_applies_env_changes_and_notifies(env_file):
+    env_file.write_text("BEDROCK_REGION=eu-west-2\nBEDROCK_PROFILE=batch\n")
+    get_config()
+    seen = []
+    on_reload(lambda old, new: seen.append((old.region, new.region)))
+
+    env_file.write_text("BEDROCK_REGION=us-east-1\n")
+    settings = reload()
+
+    assert (settings.region, settings.profile) == ("us-east-1", "default")
+    assert "BEDROCK_PROFILE" not in os.environ  # deleted from .env, so unset
+    assert seen == [("eu-west-2", "us-east-1")]
+
+
+def test_invalid_reload_changes_nothing(env_file):
+    env_file.write_text("BEDROCK_REGION=eu-west-2\n")
+    before = get_config()
+
+    env_file.write_text("BEDROCK_REGION=us-east-1\nBEDROCK_MAX_ATTEMPTS=lots\n")
+    with pytest.raises(ValueError):
+        reload()
+
+    assert get_config() is before
+    assert os.environ["BEDROCK_REGION"] == "eu-west-2"
+    assert "BEDROCK_MAX_ATTEMPTS" not in os.environ
+
+
+def test_signal_reloads_on_a_worker_even_while_the_lock_is_held(env_file):
+    get_config()
+    reloaded = threading.Event()
+    on_reload(lambda old, new: reloaded.set())
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert config.install_reload_handler(signal.SIGUSR1)
+        env_file.write_text("BEDROCK_REGION=eu-central-1\n")
+        with config._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert not reloaded.wait(0.1)  # the handler must not reload inline
+        assert reloaded.wait(2)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+    assert get_config().region == "eu-central-1"
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from conftest import FAQ_PATH
+from faq_index import FAQIndex, load_faq_index, tokenize
+
+ENTRIES = [
+    {"id": 1, "question": "What are your branch opening hours?",
+     "answer": "Branches are open Monday to Friday, 9am to 5pm."},
+    {"id": 2, "question": "How do I report a lost or stolen card?",
+     "answer": "Call our helpline or freeze the card in the mobile app."},
+    {"id": 3, "question": "What is the daily ATM withdrawal limit?",
+     "answer": "You can withdraw up to 500 pounds per day from an ATM."},
+]
+
+
+@pytest.fixture
+def index():
+    index = FAQIndex()
+    index.add(ENTRIES)
+    return index
+
+
+def test_tokenize_stems_and_drops_stop_words():
+    assert tokenize("Opening hours") == tokenize("open hour")
+
+
+def test_search_ranks_the_matching_entry_first(index):
+    hits = index.search("Someone stole my card", k=3)
+    assert hits[0]["id"] == 2
+    assert all(0.0 <= hit["coverage"] <= 1.0 for hit in hits)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_no_shared_terms_no_hits(index):
+    assert index.search("mortgage") == []
+
+
+def test_idf_covers_corpus_terms_only(index):
+    vocabulary = len(index._idf)
+    unknown = index.idf("mortgage")
+
+    for i in range(100):
+        index.search(f"unseen{i} query{i}")
+
+    assert len(index._idf) == vocabulary
+    assert index.idf("mortgage") == unknown > index.idf("card")
+    index.add([{"id": 9, "question": "Can I get a mortgage?", "answer": "Yes."}])
+    assert index.idf("mortgage") < unknown
+
+
+def test_sync_adds_updates_and_removes(index):
+    edited = dict(ENTRIES[2], answer="The ATM limit is 300 pounds a day.")
+    new = {"id": 4, "question": "Do you offer student accounts?", "answer": "Yes."}
+
+    changed, removed = index.sync([ENTRIES[0], edited, new])
+
+    assert (changed, removed) == (2, 1)
+    assert 2 not in index and 4 in index
+    assert "300" in index.search("ATM limit")[0]["answer"]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = tmp_path / "index.json"
+    index.save(path)
+    loaded = FAQIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.search("ATM withdrawal limit") == index.search("ATM withdrawal limit")
+
+
+def test_load_faq_index_rebuilds_when_params_change(tmp_path):
+    faq_path = tmp_path / "faq.json"
+    faq_path.write_text(json.dumps(ENTRIES))
+    index_path = tmp_path / "index.json"
+
+    default = load_faq_index(faq_path, index_path)
+    tuned = load_faq_index(faq_path, index_path, k1=2.0, question_weight=3)
+    reloaded = load_faq_index(faq_path, index_path, k1=2.0, question_weight=3)
+
+    assert default.k1 == 1.2
+    assert (tuned.k1, tuned.question_weight) == (2.0, 3)
+    assert json.loads(index_path.read_text())["params"]["k1"] == 2.0
+    assert reloaded.search("card")[0]["score"] == tuned.search("card")[0]["score"]
+
+
+def test_hackathon_faq_questions_find_themselves():
+    index = load_faq_index(FAQ_PATH)
+    with open(FAQ_PATH) as f:
+        entries = json.load(f)
+    for entry in entries:
+        assert index.search(entry["question"], k=1)[0]["id"] == entry["id"]
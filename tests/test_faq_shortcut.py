@@ -0,0 +1,61 @@
+import pytest
+
+from faq_index import FAQIndex, FAQShortCircuit
+
+ENTRIES = [
+    {"id": 1, "question": "What are your branch opening hours?",
+     "answer": "Branches are open Monday to Friday, 9am to 5pm."},
+    {"id": 2, "question": "How do I report a lost or stolen card?",
+     "answer": "Call our helpline or freeze the card in the mobile app."},
+    {"id": 3, "question": "What is the daily ATM withdrawal limit?",
+     "answer": "You can withdraw up to 500 pounds per day from an ATM."},
+]
+
+
+@pytest.fixture
+def index():
+    index = FAQIndex()
+    index.add(ENTRIES)
+    return index
+
+
+def test_short_circuit_answers_clear_matches_directly(index):
+    shortcut = FAQShortCircuit(index, fallback=None)
+
+    answer, hit = shortcut.answer("What is the daily ATM withdrawal limit?")
+
+    assert hit["id"] == 3
+    assert answer == ENTRIES[2]["answer"]
+    assert shortcut.stats()["direct"] == 1
+
+
+def test_short_circuit_escalates_with_fallback_kwargs(index):
+    calls = []
+
+    def fallback(text, **kwargs):
+        calls.append((text, kwargs))
+        return "from the model"
+
+    shortcut = FAQShortCircuit(index, fallback=fallback)
+
+    assert shortcut.answer("What is the interest rate?", state={"turn": 3}) == ("from the model", None)
+    assert calls == [("What is the interest rate?", {"state": {"turn": 3}})]
+
+
+def test_short_circuit_guard_and_rephrase(index):
+    blocked = FAQShortCircuit(index, fallback=lambda text: "escalated", guard=lambda text, hit: False)
+    assert blocked.answer("What is the daily ATM withdrawal limit?") == ("escalated", None)
+
+    rephrased = FAQShortCircuit(index, fallback=None, rephrase=lambda text, hit: hit["answer"].upper())
+    answer, _ = rephrased.answer("What is the daily ATM withdrawal limit?")
+    assert answer == ENTRIES[2]["answer"].upper()
+
+
+def test_near_ties_escalate():
+    index = FAQIndex()
+    index.add([{"id": 1, "question": "How do I close my account?", "answer": "Visit a branch."},
+               {"id": 2, "question": "How do I close my savings account?", "answer": "Use the app."}])
+    shortcut = FAQShortCircuit(index, fallback=lambda text: "escalated", min_score=0.0,
+                               min_coverage=0.0, max_runner_up=0.6)
+
+    assert shortcut.answer("close account") == ("escalated", None)
@@ -0,0 +1,93 @@
+import pytest
+
+from local_classifier import TIER_FALLBACK, TIER_LOCAL, FastPathClassifier, LocalIntentClassifier, tokenize
+
+EXAMPLES = [
+    ("What are your opening hours?", "faq"),
+    ("When are branches open?", "faq"),
+    ("How do I report a stolen card?", "faq"),
+    ("What's my balance?", "account_query"),
+    ("Show my recent transactions", "account_query"),
+    ("How much money is in my savings account?", "account_query"),
+    ("Transfer 100 pounds to my savings", "transaction"),
+    ("Send 50 to my landlord", "transaction"),
+    ("Pay my credit card bill", "transaction"),
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LocalIntentClassifier().fit(EXAMPLES)
+
+
+def test_tokenize_drops_apostrophes():
+    assert tokenize("What's my BALANCE?") == ["whats", "my", "balance"]
+
+
+def test_predicts_training_labels(model):
+    for text, label in EXAMPLES:
+        assert model.predict(text)[0] == label
+
+
+def test_tolerates_typos_and_rewording(model):
+    assert model.predict("whats my balanse")[0] == "account_query"
+    assert model.predict("transfer 20 pounds to savings")[0] == "transaction"
+
+
+def test_confidence_is_a_probability(model):
+    for text in ("opening hours", "balance", "the", "zzz qqq"):
+        _, confidence = model.predict(text)
+        assert 0.0 <= confidence <= 1.0
+
+
+def test_unrelated_text_has_zero_confidence(model):
+    assert model.predict("xyzzy")[1] == 0.0
+
+
+def test_unfitted_and_empty_training_fail_loudly():
+    with pytest.raises(RuntimeError):
+        LocalIntentClassifier().predict("hello")
+    with pytest.raises(ValueError):
+        LocalIntentClassifier().fit([])
+
+
+def test_refit_replaces_previous_training(model):
+    refitted = LocalIntentClassifier().fit([("hello there", "greeting"), ("goodbye now", "farewell")])
+    assert refitted.labels == ["farewell", "greeting"]
+    assert model.labels == ["account_query", "faq", "transaction"]
+
+
+def test_fast_path_skips_fallback_when_confident(model):
+    calls = []
+    classifier = FastPathClassifier(model, fallback=calls.append, threshold=0.0)
+
+    result = classifier.classify("What are your opening hours?")
+
+    assert result["tier"] == TIER_LOCAL
+    assert result["intent"] == "faq"
+    assert result["entities"] == {}
+    assert calls == []
+
+
+def test_fast_path_falls_back_below_threshold(model):
+    def fallback(text):
+        return {"intent": "general", "confidence": 0.9, "entities": {"text": text}}
+
+    classifier = FastPathClassifier(model, fallback=fallback, threshold=1.01)
+    result = classifier.classify("What are your opening hours?")
+
+    assert result == {"intent": "general", "confidence": 0.9,
+                      "entities": {"text": "What are your opening hours?"}, "tier": TIER_FALLBACK}
+    stats = classifier.stats()
+    assert (stats["calls"], stats["local"], stats["fallback"]) == (1, 0, 1)
+    assert stats["fallback_rate"] == 1.0
+
+
+def test_fast_path_reuses_a_given_prediction(model):
+    class Unused:
+        def predict(self, text):
+            raise AssertionError("prediction was passed in")
+
+    classifier = FastPathClassifier(Unused(), fallback=None, threshold=0.5)
+    result = classifier.classify("anything", prediction=("faq", 0.75))
+    assert (result["intent"], result["confidence"], result["tier"]) == ("faq", 0.75, TIER_LOCAL)
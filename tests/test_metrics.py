@@ -0,0 +1,111 @@
+import contextvars
+import json
+import threading
+
+import pytest
+
+from metrics import UsageCollector, capture, current_labels, get_collector, labels
+
+
+def test_labels_nest_and_override():
+    with labels(agent="Researcher", session="s1"):
+        with labels(agent="Writer"):
+            assert current_labels() == {"agent": "Writer", "session": "s1"}
+        assert current_labels() == {"agent": "Researcher", "session": "s1"}
+    assert current_labels() == {}
+
+
+def test_records_carry_usage_and_active_labels():
+    collector = UsageCollector()
+    with labels(agent="Researcher"):
+        record = collector.record("sonnet", usage={"inputTokens": 100, "outputTokens": 20,
+                                                   "cacheReadInputTokens": 50})
+
+    assert (record["input_tokens"], record["output_tokens"], record["cache_read_tokens"]) == (100, 20, 50)
+    assert record["labels"] == {"agent": "Researcher"}
+    assert collector.records(agent="Researcher") == [record]
+    assert collector.records(model_id="haiku") == []
+
+
+def test_summary_groups_and_aggregates():
+    collector = UsageCollector()
+    for ms in (100, 200, 300, 400):
+        with labels(agent="Researcher"):
+            collector.record("sonnet", usage={"inputTokens": 10, "outputTokens": 1}, client_latency_ms=ms)
+    with labels(agent="Writer"):
+        collector.record("haiku", usage={"inputTokens": 5}, client_latency_ms=50, retries=2)
+        collector.record("haiku", error="ThrottlingException")
+        collector.record("haiku", cached=True)
+
+    summary = collector.summary(group_by=("agent", "model_id"))
+
+    researcher = summary[("Researcher", "sonnet")]
+    assert (researcher["calls"], researcher["input_tokens"], researcher["output_tokens"]) == (4, 40, 4)
+    assert researcher["client_p50_ms"] == pytest.approx(250)
+    assert researcher["client_p95_ms"] == pytest.approx(385)
+    writer = summary[("Writer", "haiku")]
+    assert (writer["calls"], writer["errors"], writer["cached"], writer["retries"]) == (3, 1, 1, 2)
+    assert writer["server_p50_ms"] == 0.0  # no server latency recorded
+
+
+def test_summary_filters():
+    collector = UsageCollector()
+    collector.record("sonnet")
+    with labels(agent="Writer"):
+        collector.record("haiku")
+
+    assert list(collector.summary(agent="Writer")) == [("haiku",)]
+
+
+def test_collector_is_bounded_and_can_be_disabled():
+    collector = UsageCollector(max_records=3)
+    for i in range(5):
+        collector.record(f"m{i}")
+    assert [r["model_id"] for r in collector.records()] == ["m2", "m3", "m4"]
+
+    collector.enabled = False
+    assert collector.record("m5") is None
+    assert len(collector) == 3
+
+
+def test_capture_collects_only_calls_in_the_block_including_copied_contexts():
+    collector = UsageCollector()
+    collector.record("before")
+    with capture() as records:
+        collector.record("inside")
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(collector.record, "thread"))
+        thread.start()
+        thread.join()
+        with capture() as inner:
+            collector.record("nested")
+    collector.record("after")
+
+    assert [r["model_id"] for r in records] == ["inside", "thread", "nested"]
+    assert [r["model_id"] for r in inner] == ["nested"]
+
+
+def test_export_jsonl(tmp_path):
+    collector = UsageCollector()
+    collector.record("sonnet", usage={"inputTokens": 1})
+    collector.record("haiku")
+
+    path = tmp_path / "calls.jsonl"
+    assert collector.export_jsonl(path, model_id="sonnet") == 1
+    (row,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert row["model_id"] == "sonnet"
+
+
+def test_every_converse_call_is_recorded(fake_bedrock):
+    from bedrock_client import CLAUDE_HAIKU, converse
+
+    fake = fake_bedrock.FakeBedrockClient(script=[fake_bedrock.text_response("hi")])
+    with labels(agent="Tester"), capture() as records:
+        converse(fake, CLAUDE_HAIKU, [{"role": "user", "content": [{"text": "hello"}]}])
+
+    (record,) = records
+    assert record in get_collector().records(agent="Tester")
+    assert record["model_id"] == CLAUDE_HAIKU
+    assert record["output_tokens"] > 0
+    assert record["server_latency_ms"] is not None
+    assert record["error"] is None
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+
+from bedrock_client import CLAUDE_HAIKU, converse_with_tools, dispatch_tools_parallel
+
+
+def tool_use(tool_id, name, **tool_input):
+    return {"toolUseId": tool_id, "name": name, "input": tool_input}
+
+
+def result_texts(blocks):
+    return [(b["toolResult"]["toolUseId"], b["toolResult"]["content"][0]["text"]) for b in blocks]
+
+
+def sleeper(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def test_results_keep_the_model_order_whatever_finishes_first():
+    uses = [tool_use("a", "sleep", seconds=0.1, value="slow"),
+            tool_use("b", "sleep", seconds=0.0, value="fast"),
+            tool_use("c", "sleep", seconds=0.05, value="medium")]
+
+    blocks = dispatch_tools_parallel(uses, {"sleep": sleeper}, max_workers=3)
+
+    assert result_texts(blocks) == [("a", "slow"), ("b", "fast"), ("c", "medium")]
+
+
+def test_tools_run_concurrently_up_to_max_workers():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def tracked(value):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return value
+
+    uses = [tool_use(str(i), "tracked", value=i) for i in range(6)]
+    dispatch_tools_parallel(uses, {"tracked": tracked}, max_workers=2)
+
+    assert peak[0] == 2
+
+
+def test_overrunning_tool_times_out_without_blocking_the_others():
+    uses = [tool_use("slow", "sleep", seconds=1.0, value="late"),
+            tool_use("fast", "sleep", seconds=0.0, value="ok")]
+
+    started = time.perf_counter()
+    blocks = dispatch_tools_parallel(uses, {"sleep": sleeper}, max_workers=2, tool_timeout=0.1)
+
+    assert time.perf_counter() - started < 0.5
+    (slow_id, slow), fast = result_texts(blocks)
+    assert slow_id == "slow"
+    assert "timed out" in json.loads(slow)["error"]
+    assert fast == ("fast", "ok")
+
+
+def test_queued_tools_get_their_full_timeout():
+    uses = [tool_use(str(i), "sleep", seconds=0.08, value=i) for i in range(3)]
+
+    blocks = dispatch_tools_parallel(uses, {"sleep": sleeper}, max_workers=1, tool_timeout=0.15)
+
+    assert [text for _, text in result_texts(blocks)] == ["0", "1", "2"]
+
+
+def test_tool_errors_become_error_results():
+    def broken():
+        raise RuntimeError("backend down")
+
+    blocks = dispatch_tools_parallel([tool_use("x", "broken")], {"broken": broken})
+
+    assert json.loads(result_texts(blocks)[0][1]) == {"error": "backend down"}
+
+
+def test_agent_loop_dispatches_one_turn_in_parallel(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_calls_response([("sleep", {"seconds": 0.1, "value": "a"}),
+                                          ("sleep", {"seconds": 0.1, "value": "b"})]),
+        fake_bedrock.text_response("done"),
+    ])
+
+    started = time.perf_counter()
+    answer, messages = converse_with_tools(fake, CLAUDE_HAIKU, None, [], {"sleep": sleeper},
+                                           "go", parallel_tools=True)
+
+    assert answer == "done"
+    assert time.perf_counter() - started < 0.18
+    assert [text for _, text in result_texts(messages[2]["content"])] == ["a", "b"]
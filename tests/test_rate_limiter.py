@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import (PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimiter, TokenBucket,
+                          current_priority, estimate_request_tokens, is_throttle_error, priority)
+
+
+class Throttled(Exception):
+    """Shaped like a botocore ClientError for ThrottlingException."""
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+def test_throttle_errors_are_recognized_by_code():
+    assert is_throttle_error(Throttled())
+    assert not is_throttle_error(ValueError("boom"))
+
+
+def test_priority_context_nests():
+    with priority(PRIORITY_BATCH):
+        with priority(PRIORITY_INTERACTIVE):
+            assert current_priority() == PRIORITY_INTERACTIVE
+        assert current_priority() == PRIORITY_BATCH
+
+
+def test_estimate_request_tokens_ignores_model_id():
+    request = {"modelId": "m" * 400, "messages": [{"role": "user", "content": [{"text": "x" * 400}]}]}
+    assert 100 <= estimate_request_tokens(request) < 150
+
+
+def test_token_bucket_refills_at_per_minute_rate():
+    bucket = TokenBucket(60)  # one token per second
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 0.5) == pytest.approx(0.5)
+
+
+def test_call_retries_throttling_then_succeeds():
+    limiter = RateLimiter(base_delay=0.001, max_delay=0.001)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled()
+        return "ok"
+
+    assert limiter.call("model", fn) == "ok"
+    stats = limiter.stats()
+    assert (stats["throttles"], stats["retries"], stats["calls"]) == (2, 2, 1)
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = RateLimiter(max_retries=1, base_delay=0.001, max_delay=0.001)
+    with pytest.raises(Throttled):
+        limiter.call("model", lambda: (_ for _ in ()).throw(Throttled()))
+    assert limiter.stats()["failures"] == 1
+
+
+def test_other_errors_are_not_retried():
+    limiter = RateLimiter()
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call("model", fn)
+    assert len(attempts) == 1
+
+
+def test_usage_corrects_the_token_bucket():
+    limiter = RateLimiter(limits={"model": {"tokens_per_minute": 1000}})
+    limiter.call("model", lambda: {"usage": {"inputTokens": 300, "outputTokens": 100}},
+                 estimated_tokens=100)
+    assert limiter._state("model").tokens.tokens == pytest.approx(600, abs=1)
+
+
+def test_interactive_callers_go_before_batch_callers():
+    limiter = RateLimiter()
+    state = limiter._state("model")
+    state.blocked_until = time.monotonic() + 0.2
+    admitted = []
+
+    def caller(level):
+        limiter.acquire("model", priority=level)
+        admitted.append(level)
+
+    batch = threading.Thread(target=caller, args=(PRIORITY_BATCH,))
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=caller, args=(PRIORITY_INTERACTIVE,))
+    interactive.start()
+    batch.join(2)
+    interactive.join(2)
+
+    assert admitted == [PRIORITY_INTERACTIVE, PRIORITY_BATCH]
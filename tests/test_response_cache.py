@@ -0,0 +1,86 @@
+import time
+
+from response_cache import ResponseCache, request_key
+
+
+def request(i, **extra):
+    return {"modelId": "model", "messages": [{"role": "user", "content": [{"text": f"q{i}"}]}], **extra}
+
+
+def response(text="hello"):
+    return {"output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": "end_turn", "usage": {"inputTokens": 1, "outputTokens": 1},
+            "ResponseMetadata": {"RequestId": "not replayed"}}
+
+
+def test_key_ignores_field_order_and_non_model_fields():
+    a = {"modelId": "m", "messages": [], "system": [{"text": "s"}]}
+    b = {"system": [{"text": "s"}], "messages": [], "modelId": "m", "additionalModelResponseFieldPaths": []}
+    assert request_key(a) == request_key(b)
+    assert request_key(a) != request_key(dict(a, modelId="other"))
+
+
+def test_memory_hit_returns_replayable_fields_only():
+    cache = ResponseCache()
+    assert cache.get(request(1)) is None
+    cache.put(request(1), response())
+
+    cached = cache.get(request(1))
+    assert cached["output"]["message"]["content"][0]["text"] == "hello"
+    assert "ResponseMetadata" not in cached
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(sqlite_path=path)
+    first.put(request(1), response("persisted"))
+    first.close()
+
+    second = ResponseCache(sqlite_path=path)
+    assert second.get(request(1))["output"]["message"]["content"][0]["text"] == "persisted"
+    assert second.get(request(1)) is not None
+    stats = second.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(sqlite_path=str(tmp_path / "cache.db"), ttl=0.01)
+    cache.put(request(1), response())
+    time.sleep(0.02)
+
+    assert cache.get(request(1)) is None
+    stats = cache.stats()
+    assert stats["expired"] == 2  # once in each tier
+    assert stats["disk_entries"] == 0
+    assert cache._disk_bytes == 0
+
+
+def test_disk_tier_stays_under_max_bytes(tmp_path):
+    cache = ResponseCache(sqlite_path=str(tmp_path / "cache.db"), max_entries=1, max_bytes=2000)
+    for i in range(30):
+        cache.put(request(i), response("x" * 200))
+        assert cache._disk_bytes == cache._disk_size()
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 2000
+    assert stats["disk_entries"] < 30
+    assert cache.get(request(29)) is not None   # most recent kept
+    assert cache.get(request(0)) is None        # least recently used evicted
+
+
+def test_replacing_an_entry_does_not_double_count(tmp_path):
+    cache = ResponseCache(sqlite_path=str(tmp_path / "cache.db"))
+    cache.put(request(1), response("x" * 100))
+    cache.put(request(1), response("y"))
+
+    assert cache._disk_bytes == cache._disk_size() == cache.stats()["disk_bytes"]
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = ResponseCache(sqlite_path=str(tmp_path / "cache.db"))
+    cache.put(request(1), response())
+    cache.clear()
+
+    assert cache.get(request(1)) is None
+    assert cache.stats()["disk_bytes"] == cache._disk_bytes == 0
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from bedrock_client import CACHE_POINT, CLAUDE_HAIKU, CLAUDE_SONNET
+from routing import HedgingRouter, LatencyTracker, latency_sensitive, reroute
+
+
+class Throttled(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+def request(model_id=CLAUDE_SONNET):
+    return {"modelId": model_id,
+            "system": [{"text": "system"}, CACHE_POINT],
+            "messages": [{"role": "user", "content": [{"text": "hi"}, CACHE_POINT]}]}
+
+
+def test_reroute_strips_cache_points_without_touching_the_original():
+    original = request()
+    rerouted = reroute(original, CLAUDE_HAIKU)
+
+    assert rerouted["modelId"] == CLAUDE_HAIKU
+    assert rerouted["system"] == [{"text": "system"}]
+    assert rerouted["messages"][0]["content"] == [{"text": "hi"}]
+    assert original == request()
+
+
+def test_latency_tracker_percentiles():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile("m", 50) is None
+    for ms in range(1, 101):
+        tracker.observe("m", ms / 1000)
+    assert tracker.percentile("m", 50) == pytest.approx(0.051)
+    assert tracker.percentile("m", 95) == pytest.approx(0.096)
+
+
+def test_models_without_fallback_pass_through():
+    router = HedgingRouter()
+    response, model_id = router.send(request(CLAUDE_HAIKU), lambda r: r["modelId"])
+    assert (response, model_id) == (CLAUDE_HAIKU, CLAUDE_HAIKU)
+
+
+def test_throttled_model_falls_back_then_cools_down():
+    router = HedgingRouter(throttle_cooldown=60)
+    sent = []
+
+    def send(r):
+        sent.append(r["modelId"])
+        if r["modelId"] == CLAUDE_SONNET:
+            raise Throttled()
+        return "answer"
+
+    assert router.send(request(), send) == ("answer", CLAUDE_HAIKU)
+    assert router.send(request(), send) == ("answer", CLAUDE_HAIKU)
+    assert sent == [CLAUDE_SONNET, CLAUDE_HAIKU, CLAUDE_HAIKU]
+    assert router.stats()["throttled_models"] == [CLAUDE_SONNET]
+
+
+def test_other_errors_propagate():
+    router = HedgingRouter()
+
+    def send(r):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        router.send(request(), send)
+
+
+def test_no_hedge_outside_latency_sensitive_blocks():
+    router = HedgingRouter(hedge_after=0.0)
+
+    def send(r):
+        time.sleep(0.05)
+        return r["modelId"]
+
+    assert router.send(request(), send) == (CLAUDE_SONNET, CLAUDE_SONNET)
+    assert router.stats()["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_fast_fallback_wins(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(latency={
+        CLAUDE_SONNET: fake_bedrock.LatencyModel(first_token_ms=500, per_token_ms=0, sigma=0),
+        CLAUDE_HAIKU: fake_bedrock.NO_LATENCY,
+    })
+    router = HedgingRouter(hedge_after=0.02)
+
+    started = time.perf_counter()
+    with latency_sensitive():
+        response, model_id = router.send(request(), lambda r: fake.converse(**r))
+
+    assert model_id == CLAUDE_HAIKU
+    assert response["stopReason"] == "end_turn"
+    assert time.perf_counter() - started < 0.4
+    stats = router.stats()
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    assert CACHE_POINT not in fake.requests[-1]["system"]
+
+
+def test_fast_primary_is_not_hedged(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient()
+    router = HedgingRouter(hedge_after=0.5)
+
+    with latency_sensitive():
+        _, model_id = router.send(request(), lambda r: fake.converse(**r))
+
+    assert model_id == CLAUDE_SONNET
+    assert router.stats()["hedged"] == 0
+    assert fake.counters["calls"] == 1
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from bedrock_client import CLAUDE_HAIKU
+from metrics import get_collector
+from speculation import Speculator
+
+
+def recording_execute(executed, release=None):
+    """execute(branch) that records one model call of 100 input / 10 output tokens."""
+    def execute(branch):
+        if release is not None:
+            release.wait(2)
+        executed.append(branch)
+        get_collector().record(CLAUDE_HAIKU, usage={"inputTokens": 100, "outputTokens": 10})
+        return f"result for {branch}"
+
+    return execute
+
+
+def test_hit_uses_the_speculated_result():
+    speculator = Speculator(min_confidence=0.5)
+    executed = []
+
+    decision, result = speculator.run(decide=lambda: "faq", execute=recording_execute(executed),
+                                      guess="faq", confidence=0.9)
+
+    assert (decision, result) == ("faq", "result for faq")
+    assert executed == ["faq"]
+    stats = speculator.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 0, 1.0)
+    assert stats["wasted_input_tokens"] == 0
+
+
+def test_failed_speculation_on_a_hit_is_executed_again():
+    speculator = Speculator(min_confidence=0.5)
+    attempts = []
+
+    def execute(branch):
+        attempts.append(branch)
+        get_collector().record(CLAUDE_HAIKU, usage={"inputTokens": 100, "outputTokens": 10})
+        if len(attempts) == 1:
+            raise ConnectionError("dropped")
+        return f"result for {branch}"
+
+    decision, result = speculator.run(decide=lambda: "faq", execute=execute, guess="faq", confidence=0.9)
+
+    assert (decision, result) == ("faq", "result for faq")
+    assert attempts == ["faq", "faq"]
+    stats = speculator.stats()
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (0, 0, 1)
+    assert stats["wasted_input_tokens"] == 100
+
+
+def test_miss_runs_the_decided_branch_and_charges_the_waste():
+    speculator = Speculator(min_confidence=0.5)
+    executed = []
+    release = threading.Event()
+
+    def decide():
+        release.set()  # let the speculative branch finish its call first
+        return "account_query"
+
+    decision, result = speculator.run(decide=decide, execute=recording_execute(executed, release),
+                                      guess="faq", confidence=0.9)
+    speculator._executor.shutdown(wait=True)
+
+    assert (decision, result) == ("account_query", "result for account_query")
+    assert sorted(executed) == ["account_query", "faq"]
+    stats = speculator.stats()
+    assert stats["misses"] == 1
+    assert (stats["wasted_input_tokens"], stats["wasted_output_tokens"]) == (100, 10)
+    assert stats["wasted_cost_usd"] > 0
+
+
+def test_waste_counts_only_the_discarded_branch():
+    speculator = Speculator(min_confidence=0.5)
+    release = threading.Event()
+
+    def decide():
+        get_collector().record(CLAUDE_HAIKU, usage={"inputTokens": 5000, "outputTokens": 500})
+        release.set()
+        return "account_query"
+
+    speculator.run(decide=decide, execute=recording_execute([], release), guess="faq", confidence=0.9)
+    speculator._executor.shutdown(wait=True)
+
+    assert speculator.stats()["wasted_input_tokens"] == 100
+
+
+def test_low_confidence_and_unsafe_branches_are_not_speculated():
+    speculator = Speculator(min_confidence=0.5, branches={"faq"})
+    executed = []
+    execute = recording_execute(executed)
+
+    speculator.run(decide=lambda: "faq", execute=execute, guess="faq", confidence=0.2)
+    speculator.run(decide=lambda: "transaction", execute=execute, guess="transaction", confidence=0.9)
+
+    assert executed == ["faq", "transaction"]
+    stats = speculator.stats()
+    assert (stats["speculated"], stats["decisions"]) == (0, 2)
+
+
+def test_branch_of_and_none_branch():
+    speculator = Speculator()
+    executed = []
+
+    decision, result = speculator.run(decide=lambda: {"intent": None},
+                                      execute=recording_execute(executed),
+                                      branch_of=lambda d: d["intent"])
+
+    assert (decision, result) == ({"intent": None}, None)
+    assert executed == []
+
+
+def test_failed_decision_discards_the_speculation():
+    speculator = Speculator(min_confidence=0.0)
+
+    def decide():
+        raise RuntimeError("classifier down")
+
+    with pytest.raises(RuntimeError):
+        speculator.run(decide=decide, execute=recording_execute([]), guess="faq")
+    speculator._executor.shutdown(wait=True)
+    assert speculator._in_flight == 0
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from bedrock_client import CLAUDE_HAIKU, astream_with_tools, stream_with_tools
+
+
+class ScriptedStreamClient:
+    """converse_stream() replays hand-written event lists, one per call."""
+
+    def __init__(self, *turns):
+        self.turns = list(turns)
+        self.calls = 0
+        self.closed = 0
+
+    def converse_stream(self, **request):
+        self.calls += 1
+        events = self.turns.pop(0)
+        if isinstance(events, Exception):
+            raise events
+
+        def stream():
+            try:
+                yield from events
+            finally:
+                self.closed += 1
+
+        return {"stream": stream()}
+
+
+def tool_block(index, tool_id, name, raw_input, chunk=5):
+    events = [{"contentBlockStart": {"contentBlockIndex": index,
+                                     "start": {"toolUse": {"toolUseId": tool_id, "name": name}}}}]
+    for i in range(0, len(raw_input), chunk):
+        events.append({"contentBlockDelta": {"contentBlockIndex": index,
+                                             "delta": {"toolUse": {"input": raw_input[i:i + chunk]}}}})
+    events.append({"contentBlockStop": {"contentBlockIndex": index}})
+    return events
+
+
+def text_block(index, *chunks):
+    return [{"contentBlockDelta": {"contentBlockIndex": index, "delta": {"text": c}}} for c in chunks] + [
+        {"contentBlockStop": {"contentBlockIndex": index}}]
+
+
+def end(stop_reason):
+    return [{"messageStop": {"stopReason": stop_reason}},
+            {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 5}, "metrics": {"latencyMs": 1}}}]
+
+
+def tool_turn():
+    return (text_block(0, "Let me ", "check.")
+            + tool_block(1, "t1", "weather", json.dumps({"city": "Leeds", "days": 3}))
+            + tool_block(2, "t2", "weather", '{"city": "Yo')  # cut off mid-JSON
+            + end("tool_use"))
+
+
+def weather(city, days=1):
+    return f"{city}: sunny for {days} days"
+
+
+def test_tool_use_input_is_assembled_from_deltas():
+    client = ScriptedStreamClient(tool_turn(), text_block(0, "Sunny.") + end("end_turn"))
+    usage = {}
+
+    events = list(stream_with_tools(client, CLAUDE_HAIKU, None, [], {"weather": weather}, "weather?",
+                                    usage=usage))
+
+    assert [e["type"] for e in events] == ["text", "text", "tool_use", "tool_use",
+                                           "tool_result", "tool_result", "text", "done"]
+    assert events[2]["input"] == {"city": "Leeds", "days": 3}
+    assert events[4]["result"] == "Leeds: sunny for 3 days"
+    assert "Malformed tool input" in json.loads(events[5]["result"])["error"]
+
+    messages = events[-1]["messages"]
+    assert messages[1]["content"] == [
+        {"text": "Let me check."},
+        {"toolUse": {"toolUseId": "t1", "name": "weather", "input": {"city": "Leeds", "days": 3}}},
+        {"toolUse": {"toolUseId": "t2", "name": "weather", "input": {}}},
+    ]
+    assert [b["toolResult"]["toolUseId"] for b in messages[2]["content"]] == ["t1", "t2"]
+    assert events[-1]["text"] == "Sunny."
+    assert usage["inputTokens"] == 20
+
+
+def test_tools_start_while_the_model_is_still_streaming():
+    started = threading.Event()
+
+    def slow_events():
+        yield from tool_block(0, "t1", "mark", "{}")
+        assert started.wait(1), "tool did not start before the stream ended"
+        yield from end("tool_use")
+
+    client = ScriptedStreamClient(slow_events(), text_block(0, "ok") + end("end_turn"))
+
+    events = list(stream_with_tools(client, CLAUDE_HAIKU, None, [], {"mark": lambda: started.set()}, "go"))
+
+    assert events[-1]["text"] == "ok"
+
+
+def test_cancel_stops_the_sync_loop_and_closes_the_stream():
+    cancel = threading.Event()
+    client = ScriptedStreamClient(tool_turn(), text_block(0, "never") + end("end_turn"))
+    calls = []
+
+    events = []
+    for event in stream_with_tools(client, CLAUDE_HAIKU, None, [], {"weather": calls.append},
+                                   "go", cancel=cancel):
+        events.append(event)
+        cancel.set()
+
+    assert [e["type"] for e in events] == ["text"]
+    assert (client.calls, client.closed) == (1, 1)
+    assert calls == []
+
+
+def test_async_stream_errors_propagate_after_the_worker_stops():
+    client = ScriptedStreamClient(ValueError("bad request"))
+
+    async def consume():
+        async for _ in astream_with_tools(client, CLAUDE_HAIKU, None, [], {}, "go"):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(consume())
+
+
+def test_async_stream_runs_coroutine_tools():
+    client = ScriptedStreamClient(tool_turn(), text_block(0, "Sunny.") + end("end_turn"))
+
+    async def aweather(city, days=1):
+        await asyncio.sleep(0)
+        return f"{city}: {days}"
+
+    async def consume():
+        return [e async for e in astream_with_tools(client, CLAUDE_HAIKU, None, [],
+                                                    {"weather": aweather}, "go")]
+
+    events = asyncio.run(consume())
+    assert [e["result"] for e in events if e["type"] == "tool_result"][0] == "Leeds: 3"
+    assert events[-1]["type"] == "done"
+
+
+def test_async_consumer_leaving_early_stops_model_and_tool_calls(fake_bedrock):
+    fake = fake_bedrock.FakeBedrockClient(
+        rules=[(lambda request: True, fake_bedrock.tool_use_response("lookup", {"q": "x"}, text="Checking"))],
+        latency=fake_bedrock.LatencyModel(first_token_ms=20, per_token_ms=1, sigma=0),
+    )
+    tool_runs = []
+
+    async def consume():
+        events = astream_with_tools(fake, CLAUDE_HAIKU, None, [],
+                                    {"lookup": lambda q: tool_runs.append(q) or "found"}, "go")
+        await events.__anext__()
+        await events.aclose()
+        await asyncio.sleep(0.5)
+
+    asyncio.run(consume())
+    time.sleep(0.1)
+
+    assert fake.counters["calls"] == 1
+    assert len(tool_runs) <= 1
@@ -0,0 +1,147 @@
+import pytest
+
+import tool_cache
+from tool_cache import ToolResultCache, tool_key
+
+
+@pytest.fixture(autouse=True)
+def _clear_global_entries():
+    """Global-scope results are process-wide; isolate each test."""
+    tool_cache._global_entries.clear()
+    yield
+    tool_cache._global_entries.clear()
+
+
+def counting(result="ok"):
+    calls = []
+
+    def fn(**kwargs):
+        calls.append(kwargs)
+        return result
+
+    return fn, calls
+
+
+def test_key_ignores_argument_order():
+    assert tool_key("t", {"a": 1, "b": 2}) == tool_key("t", {"b": 2, "a": 1})
+
+
+def test_repeat_call_is_served_from_cache():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 60}})
+    fn, calls = counting("100")
+
+    assert cache.call("check_balance", {"account_id": "A"}, fn) == ("100", False)
+    assert cache.call("check_balance", {"account_id": "A"}, fn) == ("100", True)
+    assert cache.call("check_balance", {"account_id": "B"}, fn) == ("100", False)
+    assert len(calls) == 2
+    assert cache.stats()["hits_by_tool"] == {"check_balance": 1}
+
+
+def test_tools_not_opted_in_are_never_cached():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 60}})
+    fn, calls = counting()
+
+    cache.call("initiate_transfer", {"amount": 5}, fn)
+    cache.call("initiate_transfer", {"amount": 5}, fn)
+
+    assert len(calls) == 2
+    assert cache.lookup("initiate_transfer", {"amount": 5}) == (False, None)
+
+
+def test_expired_results_are_recomputed():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 0}})
+    fn, calls = counting()
+
+    cache.call("check_balance", {}, fn)
+    cache.call("check_balance", {}, fn)
+
+    assert len(calls) == 2
+
+
+def test_side_effect_tool_invalidates_stale_results():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 60}, "search_faq": {"ttl": 60}},
+                            invalidates={"initiate_transfer": ["check_balance"]})
+    balance, balance_calls = counting("100")
+    faq, faq_calls = counting("answer")
+    transfer, _ = counting("done")
+
+    cache.call("check_balance", {}, balance)
+    cache.call("search_faq", {"query": "hours"}, faq)
+    cache.call("initiate_transfer", {"amount": 5}, transfer)
+    cache.call("check_balance", {}, balance)
+    cache.call("search_faq", {"query": "hours"}, faq)
+
+    assert len(balance_calls) == 2
+    assert len(faq_calls) == 1
+    assert cache.stats()["invalidated"] == 1
+
+
+def test_global_scope_is_shared_and_session_scope_is_not():
+    tools = {"search_faq": {"ttl": 60, "scope": "global"}, "check_balance": {"ttl": 60}}
+    first, second = ToolResultCache(tools=tools), ToolResultCache(tools=tools)
+    fn, calls = counting()
+
+    first.call("search_faq", {"query": "hours"}, fn)
+    first.call("check_balance", {}, fn)
+    assert second.call("search_faq", {"query": "hours"}, fn) == ("ok", True)
+    assert second.call("check_balance", {}, fn) == ("ok", False)
+    assert len(calls) == 3
+
+
+def test_invalidating_everything_drops_own_global_tools():
+    cache = ToolResultCache(tools={"search_faq": {"ttl": 60, "scope": "global"},
+                                   "check_balance": {"ttl": 60}})
+    fn, _ = counting()
+    cache.call("search_faq", {}, fn)
+    cache.call("check_balance", {}, fn)
+
+    assert cache.invalidate() == 2
+    assert cache.stats()["entries"] == 0
+    assert cache.lookup("search_faq", {}) == (False, None)
+
+
+def test_errors_are_not_cached():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 60}})
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise RuntimeError("backend down")
+        return "100"
+
+    with pytest.raises(RuntimeError):
+        cache.call("check_balance", {}, flaky)
+    assert cache.call("check_balance", {}, flaky) == ("100", False)
+
+
+def test_session_entries_are_bounded():
+    cache = ToolResultCache(tools={"check_balance": {"ttl": None}}, max_entries=2)
+    fn, calls = counting()
+    for account in ("A", "B", "C"):
+        cache.call("check_balance", {"account_id": account}, fn)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.call("check_balance", {"account_id": "A"}, fn) == ("ok", False)
+
+
+def test_agent_loop_executes_repeat_tool_calls_once(fake_bedrock):
+    from bedrock_client import CLAUDE_HAIKU, converse_with_tools
+
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_use_response("check_balance", {"account_id": "A"}),
+        fake_bedrock.tool_use_response("check_balance", {"account_id": "A"}),
+        fake_bedrock.text_response("Your balance is 100."),
+    ])
+    cache = ToolResultCache(tools={"check_balance": {"ttl": 60}})
+    fn, calls = counting("100")
+
+    answer, messages = converse_with_tools(fake, CLAUDE_HAIKU, "You are a bank.", [],
+                                           {"check_balance": fn}, "What's my balance?",
+                                           tool_cache=cache)
+
+    assert answer == "Your balance is 100."
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    results = [block["toolResult"] for m in messages for block in m["content"] if "toolResult" in block]
+    assert [r["content"][0]["text"] for r in results] == ["100", "100"]
@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+
+import pytest
+
+from tool_registry import ToolInputError, ToolRegistry, compile_validator, schema_from_function
+
+
+def get_weather(city, days: int = 1, units="celsius", detailed=False):
+    """Get the weather forecast for a city.
+
+    Args:
+        city (str): The city name, e.g. 'London'.
+        days: Number of days to
+            forecast.
+        units (str): "celsius" or "fahrenheit".
+
+    Returns:
+        The forecast text.
+    """
+    return f"{city}/{days}/{units}"
+
+
+def test_schema_is_derived_from_signature_and_docstring():
+    spec = schema_from_function(get_weather, params={"units": {"enum": ["celsius", "fahrenheit"]}})["toolSpec"]
+    schema = spec["inputSchema"]["json"]
+
+    assert spec["name"] == "get_weather"
+    assert spec["description"] == "Get the weather forecast for a city."
+    assert schema["required"] == ["city"]
+    assert schema["additionalProperties"] is False
+    assert schema["properties"]["city"] == {"type": "string", "description": "The city name, e.g. 'London'."}
+    assert schema["properties"]["days"] == {"type": "integer", "description": "Number of days to forecast."}
+    assert schema["properties"]["units"]["enum"] == ["celsius", "fahrenheit"]
+    assert schema["properties"]["detailed"] == {"type": "boolean"}
+
+
+def test_kwargs_leave_the_schema_open():
+    def search(query, **filters):
+        pass
+
+    schema = schema_from_function(search)["toolSpec"]["inputSchema"]["json"]
+    assert "additionalProperties" not in schema
+    assert list(schema["properties"]) == ["query"]
+
+
+def test_validator_reports_every_problem():
+    validate = compile_validator("get_weather", schema_from_function(
+        get_weather, params={"units": {"enum": ["celsius", "fahrenheit"]}})["toolSpec"]["inputSchema"]["json"])
+
+    validate({"city": "Leeds", "days": 3})
+    with pytest.raises(ToolInputError) as error:
+        validate({"days": "3", "units": "kelvin", "country": "UK"})
+
+    message = str(error.value)
+    assert message.startswith("get_weather: ")
+    for problem in ("missing required 'city'", "unexpected 'country'",
+                    "'days' must be integer, got str", "'units' must be one of"):
+        assert problem in message
+
+
+def test_validator_type_edge_cases():
+    validate = compile_validator("t", {"type": "object", "properties": {
+        "n": {"type": "number"}, "i": {"type": "integer"}, "tags": {"type": "array"}}})
+
+    validate({"n": 1, "i": 2, "tags": ["a"], "extra": True})  # open schema allows extras
+    validate({"n": 1.5})
+    with pytest.raises(ToolInputError, match="'i' must be integer, got bool"):
+        validate({"i": True})
+    with pytest.raises(ToolInputError, match="'n' must be number, got str"):
+        validate({"n": "1"})
+    with pytest.raises(ToolInputError, match="input must be an object"):
+        validate(["not", "a", "dict"])
+
+
+def test_registry_dispatch_validates_before_calling():
+    tools = ToolRegistry()
+    calls = []
+
+    @tools.tool(params={"units": {"enum": ["celsius", "fahrenheit"]}})
+    def weather(city, units="celsius"):
+        """Weather for a city."""
+        calls.append(city)
+        return city
+
+    assert weather("Leeds") == "Leeds"  # the decorator returns the function unchanged
+    assert tools.dispatch["weather"](city="York") == "York"
+    with pytest.raises(ToolInputError):
+        tools.dispatch["weather"](city="York", units="kelvin")
+    with pytest.raises(ToolInputError, match="unknown tool 'nope'"):
+        tools.call("nope", {})
+    assert calls == ["Leeds", "York"]
+
+
+def test_async_tools_stay_coroutines():
+    tools = ToolRegistry()
+
+    @tools.tool
+    async def lookup(key):
+        """Look up a key."""
+        return key.upper()
+
+    call = tools.dispatch["lookup"]
+    assert inspect.iscoroutinefunction(call)
+    assert asyncio.run(call(key="a")) == "A"
+    with pytest.raises(ToolInputError):
+        asyncio.run(call())
+
+
+def test_explicit_schema_and_cached_views():
+    tools = ToolRegistry()
+    schema = {"toolSpec": {"name": "calc", "description": "Math.", "inputSchema": {"json": {
+        "type": "object", "properties": {"expression": {"type": "string"}}, "required": ["expression"]}}}}
+    tools.register(lambda expression: expression, schema=schema)
+
+    first = tools.tools
+    assert first == [schema]
+    assert tools.tools is first and tools.tool_config() is tools.tool_config()
+    tools.validate("calc", {"expression": "1+1"})
+
+    tools.register(get_weather)
+    assert tools.tools is not first
+    assert tools.names() == ["calc", "get_weather"]
+    assert "get_weather" in tools and len(tools) == 2
+
+
+def test_invalid_model_input_becomes_a_tool_error_result(fake_bedrock):
+    from bedrock_client import CLAUDE_HAIKU, converse_with_tools
+
+    tools = ToolRegistry()
+    tools.register(get_weather)
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_use_response("get_weather", {"town": "Leeds"}),
+        fake_bedrock.text_response("Sorry."),
+    ])
+
+    _, messages = converse_with_tools(fake, CLAUDE_HAIKU, None, tools.tools, tools.dispatch, "weather?")
+
+    result = messages[2]["content"][0]["toolResult"]
+    assert "missing required 'city'" in result["content"][0]["text"]
@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from logging_utils import (JsonlTraceSink, get_tracer, install_trace_sink, log_tool_call,
+                           uninstall_trace_sink)
+
+
+def read_records(directory):
+    rows = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            rows += [json.loads(line) for line in f]
+    return rows
+
+
+@pytest.fixture
+def sinks():
+    opened = []
+
+    def make(directory, **kwargs):
+        sink = JsonlTraceSink(str(directory), **kwargs)
+        opened.append(sink)
+        return sink
+
+    yield make
+    for sink in opened:
+        sink.close()
+
+
+def test_records_are_written_in_order_to_gzip(tmp_path, sinks):
+    sink = sinks(tmp_path, batch_size=10, flush_interval=0.01)
+    for i in range(95):
+        assert sink.emit({"i": i})
+    sink.close()
+
+    assert [r["i"] for r in read_records(tmp_path)] == list(range(95))
+    stats = sink.stats()
+    assert (stats["emitted"], stats["written"], stats["dropped"]) == (95, 95, 0)
+    assert stats["path"].endswith(".jsonl.gz")
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, sinks):
+    sink = sinks(tmp_path, max_queue=5, batch_size=1000, flush_interval=60)
+
+    accepted = [sink.emit({"i": i}) for i in range(8)]
+    sink.close()
+
+    assert accepted == [True] * 5 + [False] * 3
+    assert (sink.stats()["dropped"], sink.stats()["written"]) == (3, 5)
+
+
+def test_emit_after_close_is_dropped(tmp_path, sinks):
+    sink = sinks(tmp_path)
+    sink.close()
+
+    assert sink.emit({"late": True}) is False
+    assert sink.stats()["dropped"] == 1
+
+
+def test_failed_writes_count_as_dropped(tmp_path, sinks):
+    directory = tmp_path / "traces"
+    sink = sinks(directory, batch_size=4, flush_interval=0.01)
+    shutil.rmtree(directory)  # the first file cannot be opened
+
+    for i in range(4):
+        sink.emit({"i": i})
+    sink.close()
+
+    stats = sink.stats()
+    assert stats["write_errors"] >= 1
+    assert (stats["written"], stats["dropped"]) == (0, 4)
+
+
+def test_rotates_on_size_and_prunes_old_files(tmp_path, sinks):
+    sink = sinks(tmp_path, compress=False, batch_size=1, flush_interval=0.01,
+                 max_bytes=200, max_files=3)
+    for i in range(40):
+        sink.emit({"i": i, "padding": "x" * 40})
+        sink.flush()
+    sink.close()
+
+    names = os.listdir(tmp_path)
+    assert sink.stats()["files"] > 3
+    assert len(names) == 3
+    assert all(n.startswith("trace-") and n.endswith(".jsonl") for n in names)
+    kept = sorted(r["i"] for r in read_records(tmp_path))
+    assert kept == list(range(kept[0], 40))  # the newest records survive
+
+
+def test_rotates_on_age(tmp_path, sinks):
+    sink = sinks(tmp_path, compress=False, batch_size=1, flush_interval=0.01, rotate_seconds=0.05)
+    sink.emit({"i": 0})
+    sink.flush()
+    time.sleep(0.1)
+    sink.emit({"i": 1})
+    sink.close()
+
+    assert sink.stats()["files"] == 2
+    assert [r["i"] for r in read_records(tmp_path)] == [0, 1]
+
+
+def test_installed_sink_receives_log_entries_and_spans(tmp_path, sinks, capsys):
+    sink = install_trace_sink(sinks(tmp_path, flush_interval=0.01))
+    try:
+        log_tool_call("lookup", {"q": "x"}, "found", duration_ms=3)
+        with get_tracer().span("step", kind="tool"):
+            pass
+    finally:
+        uninstall_trace_sink()
+    sink.close()
+
+    assert capsys.readouterr().out == ""
+    rows = read_records(tmp_path)
+    assert rows[0]["tool_name"] == "lookup"
+    assert rows[1]["name"] == "step"
@@ -0,0 +1,159 @@
+import asyncio
+import contextvars
+import json
+import threading
+
+import pytest
+
+from logging_utils import Tracer, get_tracer, spans_to_steps, traced
+
+
+def by_name(spans):
+    return {s.name: s for s in spans}
+
+
+def test_spans_nest_and_share_a_trace():
+    tracer = Tracer()
+    with tracer.span("agent", kind="agent") as root:
+        with tracer.span("llm", kind="llm") as llm:
+            llm.set(input_tokens=10)
+        with tracer.span("tool", kind="tool"):
+            with tracer.span("db"):
+                pass
+    with tracer.span("second"):
+        pass
+
+    spans = by_name(tracer.spans())
+    assert spans["llm"].parent_id == root.span_id
+    assert spans["db"].parent_id == spans["tool"].span_id
+    assert {s.trace_id for n, s in spans.items() if n != "second"} == {root.span_id}
+    assert spans["second"].parent_id is None
+    assert spans["llm"].attrs == {"input_tokens": 10}
+    assert all(s.duration_ms >= 0 for s in spans.values())
+    assert [s.name for s in tracer.last_trace()] == ["second"]
+
+
+def test_threads_with_a_copied_context_attach_to_the_parent():
+    tracer = Tracer()
+    with tracer.span("parent") as parent:
+        def child():
+            with tracer.span("worker"):
+                pass
+
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(child,))
+        thread.start()
+        thread.join()
+
+    worker = by_name(tracer.spans())["worker"]
+    assert worker.parent_id == parent.span_id
+    assert worker.thread_id != parent.thread_id
+
+
+def test_asyncio_tasks_attach_to_the_parent():
+    tracer = Tracer()
+
+    async def tool(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    async def main():
+        with tracer.span("agent") as root:
+            await asyncio.gather(tool("a"), tool("b"))
+        return root
+
+    root = asyncio.run(main())
+    spans = by_name(tracer.spans())
+    assert spans["a"].parent_id == spans["b"].parent_id == root.span_id
+
+
+def test_errors_are_recorded_and_reraised():
+    tracer = Tracer()
+    with pytest.raises(KeyError):
+        with tracer.span("failing"):
+            raise KeyError("x")
+
+    assert tracer.spans()[0].attrs["error"] == "KeyError"
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    tracer.enabled = False
+    with tracer.span("ignored") as current:
+        current.set(anything=1)
+    assert tracer.spans() == []
+
+
+def test_sinks_receive_finished_spans_and_buffer_is_bounded():
+    tracer = Tracer(capacity=2)
+    received = []
+
+    class Sink:
+        def emit(self, span):
+            received.append(span.name)
+
+    sink = Sink()
+    tracer.add_sink(sink)
+    for name in "abc":
+        with tracer.span(name):
+            pass
+    tracer.remove_sink(sink)
+    with tracer.span("d"):
+        pass
+
+    assert received == ["a", "b", "c"]
+    assert [s.name for s in tracer.spans()] == ["c", "d"]
+
+
+def test_traced_decorator_wraps_sync_and_async_functions():
+    tracer = get_tracer()
+
+    @traced(kind="agent")
+    def outer():
+        return inner_sync() + asyncio.run(inner_async())
+
+    @traced()
+    def inner_sync():
+        return 1
+
+    @traced("custom")
+    async def inner_async():
+        return 2
+
+    assert outer() == 3
+    trace = tracer.last_trace()
+    assert [s.name for s in trace] == ["outer", "inner_sync", "custom"]
+    assert trace[0].kind == "agent"
+    assert trace[2].parent_id == trace[0].span_id
+
+
+def test_exports(tmp_path):
+    tracer = Tracer()
+    with tracer.span("agent"):
+        with tracer.span("llm", kind="llm", model_id="haiku"):
+            pass
+
+    assert tracer.export_jsonl(tmp_path / "spans.jsonl") == 2
+    rows = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [r["name"] for r in rows] == ["llm", "agent"]
+
+    assert tracer.export_chrome_trace(tmp_path / "trace.json") == 2
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+
+
+def test_agent_loop_spans(fake_bedrock):
+    from bedrock_client import CLAUDE_HAIKU, converse_with_tools
+
+    fake = fake_bedrock.FakeBedrockClient(script=[
+        fake_bedrock.tool_use_response("lookup", {"q": "x"}),
+        fake_bedrock.text_response("done"),
+    ])
+    converse_with_tools(fake, CLAUDE_HAIKU, None, [], {"lookup": lambda q: "found"}, "go")
+
+    trace = get_tracer().last_trace()
+    assert [(s.name, s.kind) for s in trace] == [
+        ("converse_with_tools", "agent"), ("Converse", "llm"), ("lookup", "tool"), ("Converse", "llm")]
+    assert {s.parent_id for s in trace[1:]} == {trace[0].span_id}
+    steps = spans_to_steps(trace)
+    assert [step["type"] for step in steps] == ["llm", "tool", "llm"]
+    assert steps[1]["output"] == "found"